@@ -0,0 +1,170 @@
+"""
+Almacén append-only del dataset real (positivos/negativos).
+
+Antes, ampliar_dataset reescribía dataset_real_positivos.npy y
+dataset_real_negativos.npy completos cada 5 eventos: I/O O(N²) en
+total, y un corte a mitad de np.save dejaba el archivo corrupto.
+
+Ahora:
+- dataset_real_{positivos,negativos}.npy siguen siendo la BASE (los
+  mismos archivos de siempre, leídos con memory-map).
+- Cada evento nuevo se añade como un fragmento .npy pequeño en
+  data/dataset_real_fragmentos/ (coste O(filas nuevas)).
+- manifiesto.json lista los fragmentos en orden junto con el registro
+  de eventos procesados/excluidos. Reemplazarlo (os.replace) es el
+  commit atómico: un fragmento que no aparece en el manifiesto no
+  existe, así que un corte nunca deja el dataset a medias.
+- Los fragmentos se fusionan como un contador binario (el último se une
+  al anterior cuando es al menos igual de grande): siempre hay
+  O(log N) fragmentos y cada fila se copia O(log N) veces en total.
+- compactar() vuelca todo sobre la base (una sola reescritura, cuando
+  se quiera, p.ej. antes de versionar un snapshot). Con la base
+  compactada, cargar_dataset_real() devuelve vistas memory-mapped sin
+  ninguna copia.
+"""
+import json
+import os
+import numpy as np
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+ETIQUETAS = ("positivos", "negativos")
+
+
+class AlmacenDataset:
+    def __init__(self, directorio=DATASET_DIR):
+        self.directorio = directorio
+        self.dir_fragmentos = os.path.join(directorio, "dataset_real_fragmentos")
+        self.ruta_manifiesto = os.path.join(self.dir_fragmentos, "manifiesto.json")
+        self.manifiesto = self._cargar_manifiesto()
+        self._pendientes = {etiqueta: [] for etiqueta in ETIQUETAS}
+
+    def ruta_base(self, etiqueta):
+        return os.path.join(self.directorio, f"dataset_real_{etiqueta}.npy")
+
+    def _filas_base(self, etiqueta):
+        ruta = self.ruta_base(etiqueta)
+        return np.load(ruta, mmap_mode="r").shape[0] if os.path.exists(ruta) else 0
+
+    def _cargar_manifiesto(self):
+        if not os.path.exists(self.ruta_manifiesto):
+            return {
+                "filas_base": {e: self._filas_base(e) for e in ETIQUETAS},
+                "fragmentos": {e: [] for e in ETIQUETAS},
+                "siguiente_id": 0,
+                "eventos_procesados": None,
+                "eventos_excluidos_por_nan": None,
+            }
+        with open(self.ruta_manifiesto, "r") as f:
+            manifiesto = json.load(f)
+        # Recuperación: si un compactar() se cortó después de reemplazar la
+        # base pero antes de escribir el manifiesto, la base ya contiene
+        # los fragmentos y solo falta olvidarlos.
+        for etiqueta in ETIQUETAS:
+            en_fragmentos = sum(fr["filas"] for fr in manifiesto["fragmentos"][etiqueta])
+            if self._filas_base(etiqueta) == manifiesto["filas_base"][etiqueta] + en_fragmentos and en_fragmentos:
+                manifiesto["filas_base"][etiqueta] += en_fragmentos
+                manifiesto["fragmentos"][etiqueta] = []
+        return manifiesto
+
+    def _guardar_manifiesto(self):
+        os.makedirs(self.dir_fragmentos, exist_ok=True)
+        temporal = self.ruta_manifiesto + ".tmp"
+        with open(temporal, "w") as f:
+            json.dump(self.manifiesto, f, indent=2)
+        os.replace(temporal, self.ruta_manifiesto)
+
+    def _escribir_fragmento(self, etiqueta, filas):
+        os.makedirs(self.dir_fragmentos, exist_ok=True)
+        nombre = f"{etiqueta}_{self.manifiesto['siguiente_id']:06d}.npy"
+        self.manifiesto["siguiente_id"] += 1
+        temporal = os.path.join(self.dir_fragmentos, nombre + ".tmp.npy")
+        np.save(temporal, filas)
+        os.replace(temporal, os.path.join(self.dir_fragmentos, nombre))
+        return {"archivo": nombre, "filas": int(len(filas))}
+
+    def _leer_fragmento(self, fragmento):
+        return np.load(os.path.join(self.dir_fragmentos, fragmento["archivo"]), mmap_mode="r")
+
+    def registro(self):
+        """(eventos_procesados, eventos_excluidos) confirmados en el
+        manifiesto, o (None, None) si el almacén aún no tiene registro."""
+        return self.manifiesto["eventos_procesados"], self.manifiesto["eventos_excluidos_por_nan"]
+
+    def agregar(self, positivos=(), negativos=()):
+        """Añade filas pendientes; no son visibles hasta confirmar()."""
+        self._pendientes["positivos"].extend(positivos)
+        self._pendientes["negativos"].extend(negativos)
+
+    def confirmar(self, procesados, excluidos):
+        """Escribe las filas pendientes como fragmentos y hace el commit
+        atómico del manifiesto (filas + registro de eventos a la vez)."""
+        obsoletos = []
+        for etiqueta in ETIQUETAS:
+            if self._pendientes[etiqueta]:
+                fragmentos = self.manifiesto["fragmentos"][etiqueta]
+                fragmentos.append(self._escribir_fragmento(etiqueta, np.array(self._pendientes[etiqueta])))
+                self._pendientes[etiqueta] = []
+                while len(fragmentos) >= 2 and fragmentos[-1]["filas"] >= fragmentos[-2]["filas"]:
+                    anterior, ultimo = fragmentos[-2], fragmentos[-1]
+                    fusion = np.concatenate([self._leer_fragmento(anterior), self._leer_fragmento(ultimo)])
+                    fragmentos[-2:] = [self._escribir_fragmento(etiqueta, fusion)]
+                    obsoletos += [anterior, ultimo]
+        self.manifiesto["eventos_procesados"] = list(procesados)
+        self.manifiesto["eventos_excluidos_por_nan"] = list(excluidos)
+        self._guardar_manifiesto()
+        self._borrar(obsoletos)
+
+    def _borrar(self, fragmentos):
+        for fragmento in fragmentos:
+            ruta = os.path.join(self.dir_fragmentos, fragmento["archivo"])
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
+    def n_filas(self, etiqueta):
+        return self.manifiesto["filas_base"][etiqueta] + sum(fr["filas"] for fr in self.manifiesto["fragmentos"][etiqueta])
+
+    def cargar(self, etiqueta):
+        """Array (n_filas, n_muestras) confirmado. Si no hay fragmentos
+        (base compactada), es la vista memory-mapped de la base, sin copia."""
+        partes = []
+        if self.manifiesto["filas_base"][etiqueta]:
+            base = np.load(self.ruta_base(etiqueta), mmap_mode="r")
+            partes.append(base[:self.manifiesto["filas_base"][etiqueta]])
+        partes += [self._leer_fragmento(fr) for fr in self.manifiesto["fragmentos"][etiqueta]]
+        if not partes:
+            raise FileNotFoundError(f"No hay filas de {etiqueta}: falta {self.ruta_base(etiqueta)}")
+        if len(partes) == 1:
+            return partes[0]
+        return np.concatenate(partes)
+
+    def compactar(self):
+        """Vuelca los fragmentos sobre la base (escritura atómica)."""
+        obsoletos = []
+        for etiqueta in ETIQUETAS:
+            fragmentos = self.manifiesto["fragmentos"][etiqueta]
+            if not fragmentos:
+                continue
+            completo = self.cargar(etiqueta)
+            temporal = self.ruta_base(etiqueta) + ".tmp.npy"
+            np.save(temporal, completo)
+            os.replace(temporal, self.ruta_base(etiqueta))
+            self.manifiesto["filas_base"][etiqueta] = int(len(completo))
+            obsoletos += fragmentos
+            self.manifiesto["fragmentos"][etiqueta] = []
+        self._guardar_manifiesto()
+        self._borrar(obsoletos)
+
+
+def cargar_dataset_real(directorio=DATASET_DIR):
+    """(positivos, negativos) del dataset real, incluidos los eventos
+    añadidos con ampliar_dataset que aún no se han compactado."""
+    almacen = AlmacenDataset(directorio)
+    return almacen.cargar("positivos"), almacen.cargar("negativos")
+
+
+if __name__ == "__main__":
+    almacen = AlmacenDataset()
+    print(f"📦 Base + {sum(len(almacen.manifiesto['fragmentos'][e]) for e in ETIQUETAS)} fragmentos: "
+          f"{almacen.n_filas('positivos')} positivos, {almacen.n_filas('negativos')} negativos")
+    almacen.compactar()
+    print("✅ Fragmentos compactados en dataset_real_{positivos,negativos}.npy")
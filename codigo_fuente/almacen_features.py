@@ -0,0 +1,126 @@
+"""
+Almacén versionado de matrices de features del dataset real.
+
+Cada experimento (v1, v2, v3, y v4/v6, que añaden la correlación H1-L1
+a columnas del espectrograma) recalculaba su matriz de features desde
+las señales crudas en cada ejecución. Ahora la matriz se guarda en data/cache_features/ con clave
+
+    (conjunto de features + versión, etiqueta, parámetros STFT)
+
+y un .json al lado con la "versión del dataset" con la que se calculó:
+número de filas y huella (sha1) de esas filas. Al pedirla:
+- si el dataset no cambió, se devuelve la matriz memory-mapped;
+- si el dataset CRECIÓ (ampliar_dataset solo añade filas al final y la
+  huella de las primeras filas coincide), se calculan las features de
+  las filas nuevas y se añaden;
+- si las filas guardadas ya no coinciden (dataset reconstruido) o el
+  extractor cambió de versión, se recalcula todo.
+
+    X_pos, X_neg = features_dataset("v1")
+"""
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codigo_fuente.deepwave_preprocessing import calcular_espectrogramas_lote
+from codigo_fuente.registro_features import CONJUNTOS, calcular_features, entradas_externas
+from codigo_fuente.almacen_dataset import DATASET_DIR, AlmacenDataset
+
+FEATURES_DIR = os.path.join(DATASET_DIR, "cache_features")
+FS_REAL = 2048
+FILAS_POR_BLOQUE = 512  # STFT de las filas nuevas por bloques, para acotar memoria
+
+# nombre -> (versión, función por lotes (N, F, T) -> (N, n_features)): los
+# conjuntos del registro que solo dependen del espectrograma (v4/v6 usan
+# además la correlación H1-L1, que no es por fila del dataset).
+# Subir la versión invalida las matrices guardadas de ese conjunto.
+VERSIONES = {"v1": 1, "v2": 1, "v3": 1, "pico_y_energia_media": 1}
+EXTRACTORES = {
+    nombre: (VERSIONES.get(nombre, 1), lambda specs, columnas=tuple(columnas): calcular_features(columnas, specs))
+    for nombre, columnas in CONJUNTOS.items() if not entradas_externas(columnas)
+}
+
+
+def huella_filas(filas):
+    h = hashlib.sha1()
+    for fila in filas:
+        h.update(np.ascontiguousarray(fila, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+class AlmacenFeatures:
+    def __init__(self, directorio=FEATURES_DIR, directorio_dataset=DATASET_DIR):
+        self.directorio = directorio
+        self.directorio_dataset = directorio_dataset
+
+    def _ruta(self, nombre, etiqueta, tasa_muestreo, ventana_s, solapamiento_s):
+        version = EXTRACTORES[nombre][0]
+        base = f"{nombre}@{version}_{etiqueta}_fs{float(tasa_muestreo):g}_v{float(ventana_s):g}_s{float(solapamiento_s):g}"
+        return os.path.join(self.directorio, base)
+
+    def _calcular(self, nombre, senales, tasa_muestreo, ventana_s, solapamiento_s):
+        extractor = EXTRACTORES[nombre][1]
+        bloques = [extractor(calcular_espectrogramas_lote(senales[i:i + FILAS_POR_BLOQUE], tasa_muestreo,
+                                                          ventana_s, solapamiento_s))
+                   for i in range(0, len(senales), FILAS_POR_BLOQUE)]
+        return np.vstack(bloques)
+
+    def features(self, nombre, etiqueta="positivos", tasa_muestreo=FS_REAL, ventana_s=0.1, solapamiento_s=0.05):
+        """Matriz (n_filas, n_features) memory-mapped de `etiqueta`
+        ("positivos"/"negativos"), calculando solo lo que falte."""
+        if nombre not in EXTRACTORES:
+            raise KeyError(f"Extractor desconocido: {nombre} (disponibles: {', '.join(EXTRACTORES)})")
+        senales = AlmacenDataset(self.directorio_dataset).cargar(etiqueta)
+        ruta = self._ruta(nombre, etiqueta, tasa_muestreo, ventana_s, solapamiento_s)
+
+        guardadas, n_guardadas = None, 0
+        if os.path.exists(ruta + ".json") and os.path.exists(ruta + ".npy"):
+            with open(ruta + ".json", "r") as f:
+                meta = json.load(f)
+            matriz = np.load(ruta + ".npy", mmap_mode="r")
+            n = meta["filas"]
+            if (len(matriz) == n and n <= len(senales)
+                    and meta["huella"] == huella_filas(senales[:n])):
+                guardadas, n_guardadas = matriz, n
+
+        if guardadas is not None and n_guardadas == len(senales):
+            return guardadas
+
+        nuevas = self._calcular(nombre, senales[n_guardadas:], tasa_muestreo, ventana_s, solapamiento_s)
+        completa = nuevas if guardadas is None else np.vstack([guardadas, nuevas])
+        os.makedirs(self.directorio, exist_ok=True)
+        np.save(ruta + ".tmp.npy", completa)
+        os.replace(ruta + ".tmp.npy", ruta + ".npy")
+        with open(ruta + ".json.tmp", "w") as f:
+            json.dump({"filas": int(len(senales)), "huella": huella_filas(senales)}, f)
+        os.replace(ruta + ".json.tmp", ruta + ".json")
+        return np.load(ruta + ".npy", mmap_mode="r")
+
+
+_almacen_por_defecto = None
+
+
+def features(nombre, etiqueta="positivos", **parametros_stft):
+    """Atajo para los scripts: usa data/cache_features/ sobre el
+    dataset real de data/."""
+    global _almacen_por_defecto
+    if _almacen_por_defecto is None:
+        _almacen_por_defecto = AlmacenFeatures()
+    return _almacen_por_defecto.features(nombre, etiqueta, **parametros_stft)
+
+
+def features_dataset(nombre, **parametros_stft):
+    """(X_pos, X_neg) del extractor `nombre` sobre todo el dataset real."""
+    return features(nombre, "positivos", **parametros_stft), features(nombre, "negativos", **parametros_stft)
+
+
+if __name__ == "__main__":
+    import time
+    for nombre in EXTRACTORES:
+        inicio = time.time()
+        X_pos, X_neg = features_dataset(nombre)
+        print(f"🧮 {nombre}: {X_pos.shape[0]} positivos, {X_neg.shape[0]} negativos, "
+              f"{X_pos.shape[1]} features ({time.time() - inicio:.3f}s)")
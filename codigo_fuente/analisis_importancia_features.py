@@ -3,16 +3,22 @@ Mide la correlación individual de cada feature (de v1 y v2 combinadas)
 con la etiqueta real (BBH=1, ruido=0), sobre el dataset de 40 eventos.
 Objetivo: saber cuáles features aportan señal real antes de seguir
 añadiendo más a ciegas.
+
+La correlación ignora las interacciones que usa el K-NN, así que además
+se mide la importancia por permutación (caída del AUC leave-one-out al
+barajar cada feature, ver importancia_permutacion.py) con su IC 95%.
 """
 import numpy as np
 import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from codigo_fuente.deepwave_preprocessing import calcular_espectrograma_stub
-from codigo_fuente.deepwave_features_v2 import extraer_features_v2
+from codigo_fuente.almacen_features import features_dataset
+from codigo_fuente.importancia_permutacion import importancia_permutacion
+from codigo_fuente.bootstrap_auc import intervalo_confianza
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 FS_REAL = 2048
+N_PERMUTACIONES = 500
 
 NOMBRES_FEATURES = [
     "energia_baja", "energia_media", "energia_alta", "pendiente",
@@ -28,19 +34,9 @@ if __name__ == "__main__":
     print("🔬 IMPORTANCIA DE FEATURES: correlación individual con la etiqueta real")
     print("=" * 75)
 
-    positivos = np.load(os.path.join(DATA_DIR, "dataset_real_positivos.npy"))
-    negativos = np.load(os.path.join(DATA_DIR, "dataset_real_negativos.npy"))
-
-    X, y = [], []
-    for s in positivos:
-        X.append(extraer_features_v2(calcular_espectrograma_stub(s, FS_REAL)))
-        y.append(1)
-    for s in negativos:
-        X.append(extraer_features_v2(calcular_espectrograma_stub(s, FS_REAL)))
-        y.append(0)
-
-    X = np.array(X)
-    y = np.array(y)
+    X_pos, X_neg = features_dataset("v2")
+    X = np.vstack([X_pos, X_neg])
+    y = np.array([1] * len(X_pos) + [0] * len(X_neg))
 
     print(f"Dataset: {len(y)} muestras ({sum(y)} BBH, {len(y)-sum(y)} ruido)\n")
     print(f"{'Feature':<20} {'Correlación':>12}   Interpretación")
@@ -64,3 +60,15 @@ if __name__ == "__main__":
     print("\n📋 |correlación| > 0.3 = relación notable; < 0.15 = prácticamente ruido")
     print("   (con solo 40 eventos positivos, cualquier correlación es ruidosa,")
     print("    pero sirve para descartar candidatas claramente inútiles)")
+
+    print(f"\n🔀 IMPORTANCIA POR PERMUTACIÓN (caída del AUC LOO, K=15, {N_PERMUTACIONES} permutaciones)")
+    print("=" * 75)
+    auc_base, caidas = importancia_permutacion(X, y, n_permutaciones=N_PERMUTACIONES, workers=os.cpu_count() or 1)
+    print(f"AUC sin barajar: {auc_base:.3f}\n")
+    print(f"{'Feature':<20} {'Caída AUC':>10} {'IC 95%':>18}")
+    print("-" * 75)
+    for i in np.argsort(-caidas.mean(axis=1)):
+        inferior, superior = intervalo_confianza(caidas[i])
+        marca = "🟢" if inferior > 0 else "🔴"
+        print(f"{NOMBRES_FEATURES[i]:<20} {caidas[i].mean():>+10.3f} {inferior:>+8.3f} – {superior:+.3f}  {marca}")
+    print("\n📋 🟢 = el IC no incluye 0: el K-NN pierde AUC sin esa feature")
@@ -0,0 +1,102 @@
+"""
+Bootstrap del AUC vectorizado (y opcionalmente en paralelo).
+
+bootstrap_auc_v1.py llamaba 2000 veces a auc_mann_whitney (rankdata +
+máscaras) en un bucle Python. Aquí:
+- Solo se remuestrean las puntuaciones, así que basta con tabular UNA
+  vez cuántos positivos y negativos de cada grupo tienen cada valor de
+  score (con K=15 hay como mucho 16 valores distintos).
+- Cada remuestreo se reduce a un vector de conteos por grupo; un bloque
+  de remuestreos es una matriz de conteos (B, n_grupos) y sus AUC salen
+  de dos productos matriciales y una suma acumulada sobre los valores
+  ordenados (Mann-Whitney con empates a 0.5, igual que rankdata).
+- Los bloques usan streams aleatorios independientes derivados de la
+  semilla (SeedSequence.spawn): el resultado no depende del número de
+  workers, y con workers > 1 los bloques se reparten en un pool de
+  procesos.
+- grupos=None remuestrea muestras sueltas; con grupos (p.ej. el evento
+  de cada fila, indice_filas) se remuestrean eventos completos: el
+  positivo con sus dos negativos.
+
+    aucs = bootstrap_auc(scores, y_todo, n_bootstrap=100_000, grupos=indice["evento"])
+    ic_inferior, ic_superior = intervalo_confianza(aucs)
+"""
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+REMUESTREOS_POR_BLOQUE = 2000
+
+
+def tablas_por_grupo(scores, etiquetas, grupos=None):
+    """(positivos, negativos): matrices (n_grupos, n_valores) con cuántas
+    muestras de cada clase tiene cada grupo en cada valor distinto de
+    score (columnas en orden creciente de score)."""
+    scores = np.asarray(scores, dtype=np.float64)
+    etiquetas = np.asarray(etiquetas)
+    _, valor = np.unique(scores, return_inverse=True)
+    if grupos is None:
+        grupo = np.arange(len(scores))
+    else:
+        _, grupo = np.unique(np.asarray(grupos), return_inverse=True)
+    forma = (grupo.max() + 1, valor.max() + 1)
+    positivos, negativos = np.zeros(forma), np.zeros(forma)
+    np.add.at(positivos, (grupo[etiquetas == 1], valor[etiquetas == 1]), 1)
+    np.add.at(negativos, (grupo[etiquetas == 0], valor[etiquetas == 0]), 1)
+    return positivos, negativos
+
+
+def auc_por_conteos(positivos, negativos):
+    """AUC de Mann-Whitney para cada fila de conteos (B, n_valores) por
+    valor de score creciente; NaN si falta alguna clase."""
+    negativos_por_debajo = np.cumsum(negativos, axis=1) - negativos
+    u = np.sum(positivos * (negativos_por_debajo + 0.5 * negativos), axis=1)
+    total = positivos.sum(axis=1) * negativos.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, u / total, np.nan)
+
+
+def auc_puntual(scores, etiquetas):
+    """AUC de Mann-Whitney del conjunto completo (sin remuestrear)."""
+    positivos, negativos = tablas_por_grupo(scores, etiquetas)
+    return auc_por_conteos(positivos.sum(axis=0)[np.newaxis], negativos.sum(axis=0)[np.newaxis])[0]
+
+
+def aucs_remuestreos(tabla_positivos, tabla_negativos, elegidos):
+    """AUC de cada remuestreo; `elegidos` (B, n_grupos) son los grupos
+    sorteados (con reemplazo) en cada uno."""
+    n_remuestreos, n_grupos = elegidos.shape
+    desplazados = elegidos + n_grupos * np.arange(n_remuestreos)[:, np.newaxis]
+    conteos = np.bincount(desplazados.ravel(), minlength=n_remuestreos * n_grupos)
+    conteos = conteos.reshape(n_remuestreos, n_grupos).astype(np.float64)
+    return auc_por_conteos(conteos @ tabla_positivos, conteos @ tabla_negativos)
+
+
+def _bloque(argumentos):
+    tabla_positivos, tabla_negativos, n_remuestreos, semilla = argumentos
+    rng = np.random.default_rng(semilla)
+    elegidos = rng.integers(0, len(tabla_positivos), size=(n_remuestreos, len(tabla_positivos)))
+    return aucs_remuestreos(tabla_positivos, tabla_negativos, elegidos)
+
+
+def bootstrap_auc(scores, etiquetas, n_bootstrap=2000, semilla=42, grupos=None, workers=1,
+                  remuestreos_por_bloque=REMUESTREOS_POR_BLOQUE):
+    """AUC de `n_bootstrap` remuestreos con reemplazo (de muestras, o de
+    grupos completos si se pasa `grupos`). Devuelve solo los válidos
+    (se descartan los remuestreos sin positivos o sin negativos)."""
+    tabla_positivos, tabla_negativos = tablas_por_grupo(scores, etiquetas, grupos)
+    tamanos = [min(remuestreos_por_bloque, n_bootstrap - i) for i in range(0, n_bootstrap, remuestreos_por_bloque)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    tareas = [(tabla_positivos, tabla_negativos, n, s) for n, s in zip(tamanos, semillas)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            bloques = list(pool.map(_bloque, tareas))
+    else:
+        bloques = [_bloque(t) for t in tareas]
+    aucs = np.concatenate(bloques) if bloques else np.zeros(0)
+    return aucs[~np.isnan(aucs)]
+
+
+def intervalo_confianza(aucs, nivel=0.95):
+    """Percentiles (1-nivel)/2 y 1-(1-nivel)/2 de la distribución bootstrap."""
+    cola = 100 * (1 - nivel) / 2
+    return np.percentile(aucs, cola), np.percentile(aucs, 100 - cola)
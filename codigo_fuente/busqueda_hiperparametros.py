@@ -0,0 +1,220 @@
+"""
+Búsqueda de hiperparámetros del K-NN: K, métrica (euclídea, Manhattan,
+Mahalanobis), normalización (min-max, z-score, rango) y ponderación de
+los votos (uniforme o por 1/distancia), todo con leave-one-out exacto.
+
+DeepWaveKNNReal, DeepWaveKNNTotalmenteReal y DeepWaveKNNReferencia
+fijan min-max + euclídea + voto mayoritario con K=1/3/5. Aquí:
+- cada fold normaliza con las N-1 muestras de entrenamiento, como
+  loo_knn, pero sin re-ajustar N veces: los parámetros de cada fold
+  salen en forma cerrada (min/max: solo cambian en los folds extremos;
+  media/desviación: quitando la fila de las sumas; rango: el puesto de
+  cada muestra baja 1 si la muestra excluida era menor) y las
+  distancias se calculan por bloques de filas;
+- Mahalanobis usa la covarianza del entrenamiento de cada fold (ya
+  normalizado; con min-max y z-score da lo mismo, es invariante a
+  escalar columnas);
+- por cada (métrica, normalización) se ordenan UNA vez los vecinos
+  hasta max(K): todos los K y ponderaciones salen de esa lista, como
+  en loo_knn.evaluar_ks_loo;
+- los pares (métrica, normalización) se reparten en un pool de procesos
+  y sus resultados se guardan en data/busqueda_hiperparametros.json con
+  la versión del dataset: al repetir solo se calcula lo que falte.
+
+    python codigo_fuente/busqueda_hiperparametros.py
+"""
+from itertools import product
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codigo_fuente.knn_lote import EPSILON_RANGO, k_menores
+from codigo_fuente.bootstrap_auc import auc_puntual
+from codigo_fuente.cache_resultados import version_dataset, cargar_resultados, guardar_resultados
+from codigo_fuente.pool_tareas import mapear
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+RUTA_CACHE = os.path.join(DATA_DIR, "busqueda_hiperparametros.json")
+METRICAS = ("euclidea", "manhattan", "mahalanobis")
+NORMALIZACIONES = ("minmax", "zscore", "rango")
+PONDERACIONES = ("uniforme", "distancia")
+KS = tuple(range(1, 32))
+ELEMENTOS_POR_BLOQUE = 2 ** 22  # filas * N * n_features por bloque de distancias
+
+
+def _extremos_por_fold(ordenados, X):
+    """Primer valor de `ordenados` (columnas ordenadas) en cada fold: el
+    segundo en el fold que quita la fila que tenía el primero, si era
+    la única con ese valor."""
+    unico = ordenados[0] != ordenados[1]
+    return np.where((X == ordenados[0]) & unico, ordenados[1], ordenados[0])
+
+
+def puestos(X):
+    """Cuántas muestras de X son estrictamente menores que cada una, por
+    columna (en el fold que deja fuera la fila i, el puesto de las filas
+    mayores que ella baja en 1)."""
+    return np.column_stack([np.searchsorted(np.sort(c), c, side="left") for c in X.T])
+
+
+def parametros_folds(X, normalizacion):
+    """(centro, escala), de forma (N, n_features): la fila i normaliza
+    el fold que deja fuera la fila i como (x - centro[i]) / escala[i]."""
+    X = np.asarray(X, dtype=np.float64)
+    n = len(X)
+    if normalizacion == "minmax":
+        ordenados = np.sort(X, axis=0)
+        centro = _extremos_por_fold(ordenados, X)
+        tope = _extremos_por_fold(ordenados[::-1], X)
+        return centro, tope - centro + EPSILON_RANGO
+    if normalizacion == "zscore":
+        # sumas centradas en la media global para no perder precisión
+        media = X.mean(axis=0)
+        centrado = X - media
+        media_fold = -centrado / (n - 1)
+        varianza = (np.sum(centrado ** 2, axis=0) - centrado ** 2) / (n - 1) - media_fold ** 2
+        return media + media_fold, np.sqrt(np.maximum(varianza, 0)) + EPSILON_RANGO
+    raise ValueError(f"Normalización sin parámetros por fold: {normalizacion}")
+
+
+def _normalizar_bloque(X, filas, normalizacion, parametros):
+    """(consultas, entrenamiento): las filas del bloque normalizadas con
+    su fold (b, n_features) y el dataset completo normalizado con el
+    fold de cada fila del bloque (b, N, n_features)."""
+    if normalizacion == "rango":
+        # puesto = cuántas muestras de entrenamiento son menores, escalado a [0, 1]
+        menores, escala = parametros
+        consultas = menores[filas] / escala
+        entrenamiento = (menores[np.newaxis] - (X[filas, np.newaxis, :] < X[np.newaxis])) / escala
+        return consultas, entrenamiento
+    centro, escala = parametros
+    consultas = (X[filas] - centro[filas]) / escala[filas]
+    entrenamiento = (X[np.newaxis] - centro[filas, np.newaxis, :]) / escala[filas, np.newaxis, :]
+    return consultas, entrenamiento
+
+
+def _distancias_bloque(consultas, entrenamiento, filas, metrica):
+    diferencias = entrenamiento - consultas[:, np.newaxis, :]
+    if metrica == "euclidea":
+        return np.sum(diferencias ** 2, axis=2)  # al cuadrado: el orden es el mismo
+    if metrica == "manhattan":
+        return np.sum(np.abs(diferencias), axis=2)
+    if metrica == "mahalanobis":
+        # covarianza de cada fold sin su propia fila (pinv: columnas constantes)
+        n = entrenamiento.shape[1]
+        fuera = np.ones(entrenamiento.shape[:2])
+        fuera[np.arange(len(filas)), filas] = 0
+        media = np.einsum("bn,bnd->bd", fuera, entrenamiento) / (n - 1)
+        centrado = (entrenamiento - media[:, np.newaxis, :]) * fuera[:, :, np.newaxis]
+        precision = np.linalg.pinv(np.transpose(centrado, (0, 2, 1)) @ centrado / (n - 2), hermitian=True)
+        return np.sum((diferencias @ precision) * diferencias, axis=2)  # al cuadrado
+    raise ValueError(f"Métrica desconocida: {metrica}")
+
+
+def vecinos_loo_configuracion(X, k, metrica="euclidea", normalizacion="minmax"):
+    """(vecinos, distancias), de forma (N, min(k, N-1)), ordenados: para
+    cada fila, sus vecinos leave-one-out con la métrica y la
+    normalización del fold. Las distancias euclídea y de Mahalanobis se
+    devuelven sin elevar al cuadrado."""
+    X = np.asarray(X, dtype=np.float64)
+    n = len(X)
+    k = min(k, n - 1)
+    if normalizacion == "rango":
+        parametros = (puestos(X), max(n - 2, 1))
+    else:
+        parametros = parametros_folds(X, normalizacion)
+
+    vecinos = np.empty((n, k), dtype=np.int64)
+    distancias_k = np.empty((n, k))
+    filas_por_bloque = max(1, ELEMENTOS_POR_BLOQUE // (n * X.shape[1]))
+    for inicio in range(0, n, filas_por_bloque):
+        filas = np.arange(inicio, min(inicio + filas_por_bloque, n))
+        consultas, entrenamiento = _normalizar_bloque(X, filas, normalizacion, parametros)
+        distancias = _distancias_bloque(consultas, entrenamiento, filas, metrica)
+        distancias[np.arange(len(filas)), filas] = np.inf  # la muestra no es vecina de sí misma
+        vecinos[filas], distancias_k[filas] = k_menores(distancias, k)
+    if metrica != "manhattan":
+        distancias_k = np.sqrt(np.maximum(distancias_k, 0))
+    return vecinos, distancias_k
+
+
+def scores_por_k(y, vecinos, distancias, ks, ponderacion="uniforme"):
+    """{k: score} con la proporción (ponderada) de votos BBH entre los k
+    primeros vecinos de cada lista ordenada."""
+    if ponderacion == "uniforme":
+        pesos = np.ones(vecinos.shape)
+    elif ponderacion == "distancia":
+        pesos = 1.0 / (distancias + EPSILON_RANGO)
+    else:
+        raise ValueError(f"Ponderación desconocida: {ponderacion}")
+    votos = np.cumsum(pesos * (np.asarray(y)[vecinos] == 1), axis=1)
+    totales = np.cumsum(pesos, axis=1)
+    return {k: votos[:, min(k, vecinos.shape[1]) - 1] / totales[:, min(k, vecinos.shape[1]) - 1] for k in ks}
+
+
+def evaluar_configuraciones(X, y, metrica, normalizacion, ks=KS, ponderaciones=PONDERACIONES):
+    """Una fila por (K, ponderación) con Recall+/Recall-/global (voto
+    mayoritario; el empate va a la clase 0) y AUC del score, todas
+    desde una única lista ordenada de vecinos."""
+    y = np.asarray(y)
+    vecinos, distancias = vecinos_loo_configuracion(X, max(ks), metrica, normalizacion)
+    filas = []
+    for ponderacion in ponderaciones:
+        for k, scores in scores_por_k(y, vecinos, distancias, ks, ponderacion).items():
+            correctos = (scores > 0.5) == (y == 1)
+            filas.append({"metrica": metrica, "normalizacion": normalizacion, "ponderacion": ponderacion,
+                          "k": int(k), "recall_pos": float(correctos[y == 1].mean()),
+                          "recall_neg": float(correctos[y == 0].mean()), "global": float(correctos.mean()),
+                          "auc": float(auc_puntual(scores, y))})
+    return filas
+
+
+def buscar(X, y, metricas=METRICAS, normalizaciones=NORMALIZACIONES, ks=KS, ponderaciones=PONDERACIONES,
+           workers=1, ruta_cache=RUTA_CACHE):
+    """Lista de todas las configuraciones ordenada por AUC (y Recall+ en
+    empate)."""
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y)
+    version = version_dataset(X, y, ks=list(ks), ponderaciones=list(ponderaciones))
+    resultados = cargar_resultados(ruta_cache, version)
+
+    tareas = [(metrica, normalizacion, tuple(ks), tuple(ponderaciones))
+              for metrica, normalizacion in product(metricas, normalizaciones)
+              if f"{metrica}|{normalizacion}" not in resultados]
+    for (metrica, normalizacion, _, _), filas in mapear(evaluar_configuraciones, (X, y), tareas, workers):
+        resultados[f"{metrica}|{normalizacion}"] = filas
+        if ruta_cache:
+            guardar_resultados(ruta_cache, version, resultados)  # progreso parcial
+
+    ranking = [fila for t in product(metricas, normalizaciones) for fila in resultados["|".join(t)]]
+    ranking.sort(key=lambda r: (-r["auc"], -r["recall_pos"], r["k"]))
+    return ranking
+
+
+if __name__ == "__main__":
+    from codigo_fuente.almacen_features import features_dataset
+
+    print("🎛️  BÚSQUEDA DE HIPERPARÁMETROS K-NN (K × métrica × normalización × ponderación, LOO)")
+    print("=" * 85)
+    X_pos, X_neg = features_dataset("v1")
+    X_todo = np.vstack([X_pos, X_neg])
+    y_todo = np.array([1] * len(X_pos) + [0] * len(X_neg))
+    print(f"Dataset: {len(y_todo)} muestras ({len(X_pos)} BBH, {len(X_neg)} ruido)")
+
+    inicio = time.time()
+    ranking = buscar(X_todo, y_todo, workers=os.cpu_count() or 1)
+    print(f"{len(ranking)} configuraciones evaluadas en {time.time() - inicio:.1f}s\n")
+
+    print(f"{'#':>3} {'Métrica':<12} {'Normaliz.':<9} {'Pesos':<10} {'K':>3} {'AUC':>6} {'Recall+':>8} "
+          f"{'Recall-':>8} {'Global':>7}")
+    for posicion, r in enumerate(ranking[:20], 1):
+        print(f"{posicion:>3} {r['metrica']:<12} {r['normalizacion']:<9} {r['ponderacion']:<10} {r['k']:>3} "
+              f"{r['auc']:>6.3f} {r['recall_pos']:>7.1%} {r['recall_neg']:>7.1%} {r['global']:>6.1%}")
+
+    print("\n📋 Configuración actual (min-max, euclídea, voto mayoritario):")
+    for posicion, r in enumerate(ranking, 1):
+        if (r["metrica"], r["normalizacion"], r["ponderacion"]) == ("euclidea", "minmax", "uniforme") \
+                and r["k"] in (1, 3, 5, 15):
+            print(f"   K={r['k']:<3} puesto {posicion}/{len(ranking)}: AUC {r['auc']:.3f}, "
+                  f"Recall+ {r['recall_pos']:.1%}")
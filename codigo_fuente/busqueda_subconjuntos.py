@@ -0,0 +1,117 @@
+"""
+Búsqueda exhaustiva de subconjuntos de features para el K-NN.
+
+Las features de v1→v6 se eligieron a mano porque cada subconjunto
+necesitaba su propio leave-one-out. Con las diferencias al cuadrado por
+feature precalculadas (distancias_por_feature), la distancia de
+cualquier subconjunto es la suma de sus términos (la misma que en
+loo_knn, bit a bit: mismos vecinos y mismos empates), así que se pueden
+evaluar los 511 subconjuntos no vacíos de las 8 features de
+extraer_features_v2 + la correlación H1-L1:
+- Recall+/Recall-/global con voto mayoritario (K=1, el del clasificador
+  de referencia) y AUC con el score continuo (K=15), del mismo ranking
+  de vecinos;
+- los subconjuntos se reparten en un pool de procesos;
+- los resultados se guardan en data/busqueda_subconjuntos.json con la
+  versión del dataset: al repetir la búsqueda solo se evalúa lo que
+  falte, y si el dataset cambió se empieza de cero.
+
+    python codigo_fuente/busqueda_subconjuntos.py
+"""
+from itertools import combinations
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codigo_fuente.distancias_por_feature import diferencias_cuadradas, vecinos_loo_columnas
+from codigo_fuente.loo_knn import votos_por_k
+from codigo_fuente.bootstrap_auc import auc_puntual
+from codigo_fuente.registro_features import CONJUNTOS
+from codigo_fuente.cache_resultados import version_dataset, cargar_resultados, guardar_resultados
+from codigo_fuente.pool_tareas import mapear
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+RUTA_CACHE = os.path.join(DATA_DIR, "busqueda_subconjuntos.json")
+NOMBRES = CONJUNTOS["v2"] + ["correlacion_hl"]
+K_VOTO = 1
+K_SCORE = 15
+SUBCONJUNTOS_POR_TAREA = 32
+
+
+def subconjuntos(n_features, tamano_max=None):
+    """Todas las combinaciones no vacías de columnas, de menor a mayor tamaño."""
+    tamano_max = n_features if tamano_max is None else tamano_max
+    return [c for r in range(1, tamano_max + 1) for c in combinations(range(n_features), r)]
+
+
+def evaluar_subconjunto(diferencias, X, y, columnas, k_voto=K_VOTO, k_score=K_SCORE):
+    vecinos = vecinos_loo_columnas(diferencias, X, max(k_voto, k_score), list(columnas))
+    votos = votos_por_k(y, vecinos, [k_voto, k_score])
+    votos_bbh, n_vecinos = votos[k_voto]
+    correctos = (votos_bbh > n_vecinos - votos_bbh) == (y == 1)
+    votos_score, n_score = votos[k_score]
+    return {"recall_pos": float(correctos[y == 1].mean()), "recall_neg": float(correctos[y == 0].mean()),
+            "global": float(correctos.mean()), "auc": float(auc_puntual(votos_score / n_score, y))}
+
+
+def evaluar_lote(diferencias, X, y, k_voto, k_score, lote):
+    return [(columnas, evaluar_subconjunto(diferencias, X, y, columnas, k_voto, k_score)) for columnas in lote]
+
+
+def buscar(X, y, nombres=NOMBRES, k_voto=K_VOTO, k_score=K_SCORE, workers=1, ruta_cache=RUTA_CACHE,
+           tamano_max=None):
+    """Lista de resultados de todos los subconjuntos, ordenada por AUC (y
+    Recall+ en empate), cada uno con sus features y métricas."""
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y)
+    version = version_dataset(X, y, k_voto=k_voto, k_score=k_score)
+    resultados = cargar_resultados(ruta_cache, version)
+
+    clave = lambda columnas: ",".join(map(str, columnas))
+    pendientes = [c for c in subconjuntos(X.shape[1], tamano_max) if clave(c) not in resultados]
+    lotes = [(pendientes[i:i + SUBCONJUNTOS_POR_TAREA],)
+             for i in range(0, len(pendientes), SUBCONJUNTOS_POR_TAREA)]
+    if lotes:
+        comunes = (diferencias_cuadradas(X), X, y, k_voto, k_score)
+        for _, evaluados in mapear(evaluar_lote, comunes, lotes, workers):
+            resultados.update((clave(c), r) for c, r in evaluados)
+            if ruta_cache:
+                guardar_resultados(ruta_cache, version, resultados)  # progreso parcial
+
+    ranking = [dict(features=[nombres[int(j)] for j in c.split(",")], **r) for c, r in resultados.items()
+               if tamano_max is None or len(c.split(",")) <= tamano_max]
+    ranking.sort(key=lambda r: (-r["auc"], -r["recall_pos"], len(r["features"])))
+    return ranking
+
+
+if __name__ == "__main__":
+    from codigo_fuente.almacen_features import features_dataset
+    from codigo_fuente.indice_filas import cargar_indice_filas, extraer_filas, extraer_correlaciones_hl
+
+    print("🔎 BÚSQUEDA EXHAUSTIVA: 511 subconjuntos de features v2 + correlación H1-L1")
+    print("=" * 75)
+    indice = cargar_indice_filas(DATA_DIR)
+    X_pos_v2, X_neg_v2 = extraer_filas(indice, indice["tiene_hl"], *features_dataset("v2"))
+    corr_pos, corr_neg = extraer_correlaciones_hl(indice, indice["tiene_hl"],
+                                                  np.load(os.path.join(DATA_DIR, "correlacion_hl_positivos.npy")),
+                                                  np.load(os.path.join(DATA_DIR, "correlacion_hl_negativos.npy")))
+    X_todo = np.vstack([np.hstack([X_pos_v2, corr_pos.reshape(-1, 1)]),
+                        np.hstack([X_neg_v2, corr_neg.reshape(-1, 1)])])
+    y_todo = np.array([1] * len(X_pos_v2) + [0] * len(X_neg_v2))
+    print(f"Subconjunto con H1+L1: {len(X_pos_v2)} positivos, {len(X_neg_v2)} negativos")
+
+    inicio = time.time()
+    ranking = buscar(X_todo, y_todo, workers=os.cpu_count() or 1)
+    print(f"{len(ranking)} subconjuntos evaluados en {time.time() - inicio:.1f}s\n")
+
+    print(f"{'#':>3} {'AUC':>6} {'Recall+':>8} {'Recall-':>8} {'Global':>7}  Features")
+    for posicion, r in enumerate(ranking[:20], 1):
+        print(f"{posicion:>3} {r['auc']:>6.3f} {r['recall_pos']:>7.1%} {r['recall_neg']:>7.1%} "
+              f"{r['global']:>6.1%}  {', '.join(r['features'])}")
+
+    for nombre in ("v1", "v3", "v4", "v6"):
+        columnas = sorted(NOMBRES.index(f) for f in CONJUNTOS[nombre])
+        puesto = next(i for i, r in enumerate(ranking, 1)
+                      if sorted(NOMBRES.index(f) for f in r["features"]) == columnas)
+        print(f"📋 {nombre} ({', '.join(CONJUNTOS[nombre])}): puesto {puesto}/{len(ranking)}")
@@ -0,0 +1,147 @@
+"""
+Descargas de GWOSC reanudables y verificadas.
+
+Problema (TODO.md): cuando una descarga se cortaba con `truncated file`,
+el .hdf5 corrupto quedaba en data/eventos_reales/ y descargar_evento lo
+reutilizaba para siempre, hasta borrarlo a mano con `rm -f`.
+
+Ahora:
+- Se descarga a `<destino>.part` y solo se renombra (atómico) al
+  destino final cuando el archivo está completo y verificado.
+- Si la conexión se corta, el siguiente intento (o la siguiente
+  ejecución) continúa desde donde quedó con una petición HTTP Range,
+  en vez de bajar el archivo entero otra vez.
+- Verificación: tamaño declarado por el servidor, SHA-256 si se
+  conoce, y que h5py pueda abrir el archivo y leer el strain completo.
+- Un índice (indice_descargas.json, junto a los archivos) recuerda los
+  archivos ya verificados (tamaño + fecha de modificación), así que las
+  ejecuciones siguientes no repiten la verificación.
+- Un archivo final que no está en el índice y no pasa la verificación
+  (p.ej. uno truncado de antes de este módulo) se trata como descarga
+  parcial y se reanuda automáticamente.
+"""
+import hashlib
+import http.client
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+import h5py
+
+TAM_BLOQUE = 1 << 20  # 1 MB
+_lock_indice = threading.Lock()  # ampliar_dataset --workers descarga desde varios hilos
+
+
+def _ruta_indice(destino):
+    return os.path.join(os.path.dirname(os.path.abspath(destino)), "indice_descargas.json")
+
+
+def _leer_indice(ruta_indice):
+    if os.path.exists(ruta_indice):
+        with open(ruta_indice, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def _registrar(destino, sha256):
+    ruta_indice = _ruta_indice(destino)
+    info = os.stat(destino)
+    with _lock_indice:
+        indice = _leer_indice(ruta_indice)
+        indice[os.path.basename(destino)] = {"bytes": info.st_size, "mtime_ns": info.st_mtime_ns, "sha256": sha256}
+        temporal = ruta_indice + ".tmp"
+        with open(temporal, "w") as f:
+            json.dump(indice, f, indent=2)
+        os.replace(temporal, ruta_indice)
+
+
+def _ya_verificado(destino):
+    if not os.path.exists(destino):
+        return False
+    with _lock_indice:
+        entrada = _leer_indice(_ruta_indice(destino)).get(os.path.basename(destino))
+    info = os.stat(destino)
+    return entrada is not None and entrada["bytes"] == info.st_size and entrada["mtime_ns"] == info.st_mtime_ns
+
+
+def sha256_archivo(ruta):
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(TAM_BLOQUE), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def hdf5_legible(ruta):
+    """True si h5py abre el archivo y puede leer el final del strain
+    (un archivo truncado falla al abrir o al leer el último bloque)."""
+    try:
+        with h5py.File(ruta, "r") as f:
+            strain = f["strain"]["Strain"]
+            if strain.shape[0] > 0:
+                strain[-1]
+        return True
+    except Exception:
+        return False
+
+
+def _bajar_a_parcial(url, parcial):
+    """Una petición: continúa `parcial` con Range si ya tiene bytes.
+    Devuelve el tamaño total anunciado por el servidor (o None)."""
+    ya_bajado = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+    peticion = urllib.request.Request(url)
+    if ya_bajado:
+        peticion.add_header("Range", f"bytes={ya_bajado}-")
+    try:
+        respuesta = urllib.request.urlopen(peticion)
+    except urllib.error.HTTPError as e:
+        if e.code == 416:  # el .part ya estaba completo (corte antes de verificar)
+            return ya_bajado
+        raise
+    with respuesta:
+        if respuesta.status == 206:
+            total = int(respuesta.headers["Content-Range"].rsplit("/", 1)[1])
+            modo = "ab"
+        else:  # el servidor ignoró el Range: se empieza de cero
+            total = int(respuesta.headers["Content-Length"]) if respuesta.headers.get("Content-Length") else None
+            modo = "wb"
+        with open(parcial, modo) as f:
+            for bloque in iter(lambda: respuesta.read(TAM_BLOQUE), b""):
+                f.write(bloque)
+    return total
+
+
+def descargar_verificado(url, destino, sha256=None, intentos=3):
+    """Garantiza que `destino` existe, está completo y es un HDF5 legible.
+    Devuelve la ruta. Lanza IOError si tras `intentos` no lo consigue."""
+    if _ya_verificado(destino):
+        return destino
+
+    parcial = destino + ".part"
+    if os.path.exists(destino):
+        digest = sha256_archivo(destino)
+        if (sha256 is None or digest == sha256) and hdf5_legible(destino):
+            _registrar(destino, digest)
+            return destino
+        os.replace(destino, parcial)  # truncado de una ejecución antigua: se reanuda
+
+    ultimo_error = None
+    for _ in range(intentos):
+        try:
+            total = _bajar_a_parcial(url, parcial)
+        except (OSError, http.client.HTTPException) as e:
+            ultimo_error = e  # corte de red: el siguiente intento reanuda con Range
+            continue
+        if total is not None and os.path.getsize(parcial) != total:
+            ultimo_error = IOError(f"tamaño {os.path.getsize(parcial)} != {total} anunciado por el servidor")
+            continue
+        digest = sha256_archivo(parcial)
+        if (sha256 is not None and digest != sha256) or not hdf5_legible(parcial):
+            os.remove(parcial)  # completo pero corrupto: reanudar no sirve
+            ultimo_error = IOError(f"{os.path.basename(destino)}: checksum o HDF5 inválido")
+            continue
+        os.replace(parcial, destino)
+        _registrar(destino, digest)
+        return destino
+    raise IOError(f"No se pudo descargar {url} tras {intentos} intentos: {ultimo_error}")
@@ -0,0 +1,157 @@
+"""
+Caché persistente en disco de espectrogramas STFT, direccionada por
+contenido: cada fila del dataset se identifica por el hash de sus
+muestras + los parámetros de la STFT (fs, ventana_s, solapamiento_s).
+
+- Los espectrogramas se guardan en bloques .npy que se leen con
+  memory-map (sin cargar el bloque entero en RAM).
+- Un índice JSON (indice.json) registra qué filas contiene cada
+  bloque y cuándo se usó por última vez.
+- Una ejecución "en caliente" no recalcula ninguna STFT. Si el dataset
+  crece (construir_dataset_real.ampliar_dataset), solo las filas nuevas
+  se calculan y se guardan en un bloque nuevo.
+- Expulsión LRU por tamaño total: cuando la caché supera el límite se
+  borran primero los bloques usados hace más tiempo (versiones viejas
+  del dataset que ya nadie pide).
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codigo_fuente.deepwave_preprocessing import calcular_espectrogramas_lote
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache_espectrogramas")
+LIMITE_BYTES = 1024 ** 3  # 1 GB
+
+
+def hash_filas(senales, tasa_muestreo, ventana_s, solapamiento_s):
+    """Un hash por fila, que incluye los parámetros de la STFT: la
+    misma señal con otra ventana es otra entrada de la caché."""
+    senales = np.ascontiguousarray(np.atleast_2d(senales), dtype=np.float64)
+    prefijo = f"{float(tasa_muestreo)}|{float(ventana_s)}|{float(solapamiento_s)}|{senales.shape[1]}|".encode()
+    return [hashlib.sha1(prefijo + fila.tobytes()).hexdigest() for fila in senales]
+
+
+class CacheEspectrogramas:
+    def __init__(self, directorio=CACHE_DIR, limite_bytes=LIMITE_BYTES):
+        self.directorio = directorio
+        self.limite_bytes = limite_bytes
+        self.ruta_indice = os.path.join(directorio, "indice.json")
+        self.bloques = self._cargar_indice()
+
+    def _cargar_indice(self):
+        if os.path.exists(self.ruta_indice):
+            with open(self.ruta_indice, "r") as f:
+                return json.load(f)["bloques"]
+        return {}
+
+    def _guardar_indice(self):
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = self.ruta_indice + ".tmp"
+        with open(temporal, "w") as f:
+            json.dump({"bloques": self.bloques}, f)
+        os.replace(temporal, self.ruta_indice)
+
+    def _ubicaciones(self):
+        """hash de fila -> (bloque, posición dentro del bloque)."""
+        ubicaciones = {}
+        for nombre, info in self.bloques.items():
+            for pos, h in enumerate(info["filas"]):
+                ubicaciones[h] = (nombre, pos)
+        return ubicaciones
+
+    def _leer_bloque(self, nombre):
+        return np.load(os.path.join(self.directorio, nombre + ".npy"), mmap_mode="r")
+
+    def _escribir_bloque(self, specs, hashes):
+        os.makedirs(self.directorio, exist_ok=True)
+        nombre = hashlib.sha1("".join(hashes).encode()).hexdigest()[:16]
+        ruta = os.path.join(self.directorio, nombre + ".npy")
+        temporal = ruta + ".tmp.npy"
+        np.save(temporal, specs)
+        os.replace(temporal, ruta)
+        self.bloques[nombre] = {"filas": hashes, "bytes": int(specs.nbytes), "ultimo_acceso": time.time()}
+        return nombre
+
+    def _expulsar(self, protegidos):
+        """LRU por tamaño total, sin tocar los bloques de esta consulta."""
+        total = sum(info["bytes"] for info in self.bloques.values())
+        por_antiguedad = sorted(self.bloques, key=lambda b: self.bloques[b]["ultimo_acceso"])
+        for nombre in por_antiguedad:
+            if total <= self.limite_bytes:
+                break
+            if nombre in protegidos:
+                continue
+            total -= self.bloques[nombre]["bytes"]
+            del self.bloques[nombre]
+            ruta = os.path.join(self.directorio, nombre + ".npy")
+            if os.path.exists(ruta):
+                os.remove(ruta)
+
+    def obtener(self, senales, tasa_muestreo, ventana_s=0.1, solapamiento_s=0.05):
+        """Devuelve el tensor (N, n_freq, n_tiempo) de espectrogramas de
+        `senales`, calculando solo las filas que no estén en caché.
+        Si todas las filas están, en orden, en un único bloque, se
+        devuelve directamente la vista memory-mapped (solo lectura)."""
+        senales = np.atleast_2d(senales)
+        hashes = hash_filas(senales, tasa_muestreo, ventana_s, solapamiento_s)
+        ubicaciones = self._ubicaciones()
+
+        faltantes = [i for i, h in enumerate(hashes) if h not in ubicaciones]
+        if faltantes:
+            # filas repetidas dentro del propio lote se calculan una vez
+            unicos = list(dict.fromkeys(hashes[i] for i in faltantes))
+            primera = {h: i for i, h in reversed(list(enumerate(hashes)))}
+            nuevos = calcular_espectrogramas_lote(senales[[primera[h] for h in unicos]], tasa_muestreo,
+                                                  ventana_s, solapamiento_s)
+            nombre = self._escribir_bloque(nuevos, unicos)
+            for pos, h in enumerate(unicos):
+                ubicaciones[h] = (nombre, pos)
+
+        usados = {ubicaciones[h][0] for h in hashes}
+        ahora = time.time()
+        for nombre in usados:
+            self.bloques[nombre]["ultimo_acceso"] = ahora
+        self._expulsar(usados)
+        self._guardar_indice()
+
+        if len(usados) == 1:
+            nombre = usados.pop()
+            posiciones = [ubicaciones[h][1] for h in hashes]
+            if posiciones == list(range(posiciones[0], posiciones[0] + len(posiciones))):
+                return self._leer_bloque(nombre)[posiciones[0]:posiciones[0] + len(posiciones)]
+            usados = {nombre}
+
+        resultado = None
+        for nombre in usados:
+            bloque = self._leer_bloque(nombre)
+            if resultado is None:
+                resultado = np.empty((len(hashes),) + bloque.shape[1:], dtype=bloque.dtype)
+            filas = [i for i, h in enumerate(hashes) if ubicaciones[h][0] == nombre]
+            resultado[filas] = bloque[[ubicaciones[hashes[i]][1] for i in filas]]
+        return resultado
+
+
+_cache_por_defecto = None
+
+
+def espectrogramas_cacheados(senales, tasa_muestreo, ventana_s=0.1, solapamiento_s=0.05):
+    """Atajo para los scripts de experimentos: usa la caché compartida
+    en data/cache_espectrogramas/."""
+    global _cache_por_defecto
+    if _cache_por_defecto is None:
+        _cache_por_defecto = CacheEspectrogramas()
+    return _cache_por_defecto.obtener(senales, tasa_muestreo, ventana_s, solapamiento_s)
+
+
+if __name__ == "__main__":
+    from codigo_fuente.almacen_dataset import cargar_dataset_real
+    positivos, _ = cargar_dataset_real()
+    inicio = time.time()
+    specs = espectrogramas_cacheados(positivos, 2048)
+    print(f"🗂️  {specs.shape[0]} espectrogramas {specs.shape[1:]} en {time.time() - inicio:.3f}s "
+          f"(ejecutar de nuevo para ver el tiempo con la caché caliente)")
@@ -0,0 +1,44 @@
+"""
+Caché JSON de resultados de búsquedas largas (busqueda_subconjuntos,
+busqueda_hiperparametros), versionada por dataset.
+
+El archivo guarda {"version": ..., "resultados": {clave: resultado}}:
+- la versión es un hash de X, y y los parámetros que cambian los
+  resultados, así que si el dataset cambia la caché se descarta entera;
+- se reescribe de forma atómica (temporal + os.replace) después de cada
+  lote, y una búsqueda interrumpida continúa donde se quedó.
+
+    version = version_dataset(X, y, k_voto=1, k_score=15)
+    resultados = cargar_resultados(ruta, version)
+    ...
+    guardar_resultados(ruta, version, resultados)
+"""
+import hashlib
+import json
+import os
+import numpy as np
+
+
+def version_dataset(X, y, **parametros):
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    h.update(np.ascontiguousarray(y, dtype=np.int64).tobytes())
+    h.update(",".join(f"{nombre}={valor!r}" for nombre, valor in sorted(parametros.items())).encode())
+    return h.hexdigest()
+
+
+def cargar_resultados(ruta, version):
+    """Resultados guardados en `ruta` si son de `version`; {} si no hay
+    caché (o ruta es None) o es de otro dataset."""
+    if not ruta or not os.path.exists(ruta):
+        return {}
+    with open(ruta, "r") as f:
+        cache = json.load(f)
+    return cache["resultados"] if cache.get("version") == version else {}
+
+
+def guardar_resultados(ruta, version, resultados):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w") as f:
+        json.dump({"version": version, "resultados": resultados}, f)
+    os.replace(temporal, ruta)
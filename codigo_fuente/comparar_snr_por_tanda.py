@@ -6,9 +6,13 @@ debe a que los nuevos eventos son sistemáticamente más difíciles.
 """
 import json
 import warnings
-from gwosc.api import fetch_event_json
 from scipy.stats import mannwhitneyu
 import numpy as np
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codigo_fuente.indice_metadatos import snrs_eventos
 
 warnings.filterwarnings("ignore")
 
@@ -23,34 +27,10 @@ print(f"Eventos originales (GWTC-1/2.1/3): {len(originales)}")
 print(f"Eventos nuevos (GWTC-4/5): {len(nuevos)}\n")
 
 
-def obtener_snr(nombre_evento):
-    try:
-        data = fetch_event_json(nombre_evento)
-        for version, info in data.get("events", {}).items():
-            snr = info.get("network_matched_filter_snr")
-            if snr is not None:
-                return float(snr)
-    except Exception:
-        return None
-    return None
-
-
-print("Consultando SNR de eventos originales...")
-snr_originales = []
-for e in originales:
-    snr = obtener_snr(e)
-    if snr is not None:
-        snr_originales.append(snr)
-
-print("Consultando SNR de eventos nuevos...")
-snr_nuevos = []
-for e in nuevos:
-    snr = obtener_snr(e)
-    if snr is not None:
-        snr_nuevos.append(snr)
-
-snr_originales = np.array(snr_originales)
-snr_nuevos = np.array(snr_nuevos)
+print("Leyendo SNR de los eventos (índice local de metadatos)...")
+snrs = snrs_eventos(eventos)
+snr_originales = np.array([snrs[e] for e in originales if e in snrs])
+snr_nuevos = np.array([snrs[e] for e in nuevos if e in snrs])
 
 print(f"\n📊 SNR originales: n={len(snr_originales)}, media={snr_originales.mean():.2f}, mediana={np.median(snr_originales):.2f}")
 print(f"📊 SNR nuevos:      n={len(snr_nuevos)}, media={snr_nuevos.mean():.2f}, mediana={np.median(snr_nuevos):.2f}")
@@ -5,47 +5,53 @@ más se aproxima al método real de confirmación de LIGO/Virgo
 (coincidencia entre detectores), ausente en el pipeline solo-H1.
 """
 import numpy as np
-import h5py
 import os
 import json
 import warnings
-from scipy.signal import welch, butter, filtfilt, correlate
-from scipy.signal.windows import tukey
-from scipy.interpolate import interp1d
-from gwosc.locate import get_event_urls
-from gwosc.datasets import event_gps
-import urllib.request
+from collections import OrderedDict
+from scipy.signal import correlate
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from deepwave_whitening_real import blanquear, PARAMETROS_BLANQUEO
+from lector_strain import metadatos_strain, leer_region
+from cache_descargas import descargar_verificado
+from indice_metadatos import gps_evento, url_evento
 
 warnings.filterwarnings("ignore")
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "eventos_reales")
 DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 FS_OBJETIVO = 2048
+OFFSETS_VENTANAS_S = (-12, 0, 12)  # negativo1, positivo, negativo2
+PADDING_BLANQUEO_S = 4
+
+# Caché del strain ya blanqueado + pasa-banda por (evento, detector):
+# procesar_evento_dual extrae 3 ventanas por detector y antes repetía
+# lectura HDF5 + Welch + whitening + filtro (y la consulta de GPS) en
+# cada una. En memoria se guardan los últimos MAX_BLANQUEADOS_EN_MEMORIA;
+# con USAR_CACHE_DISCO=True también persisten en data/cache_blanqueo/
+# para que mejora_correlacion_hl.py y reejecuciones no repitan nada. Cada
+# .npz guarda la versión de lo que lo produjo (tamaño y fecha del .hdf5,
+# GPS, padding, offsets y parámetros de whitening) y se descarta si no
+# coincide con la actual.
+MAX_BLANQUEADOS_EN_MEMORIA = 4
+CACHE_BLANQUEO_DIR = os.path.join(DATASET_DIR, "cache_blanqueo")
+USAR_CACHE_DISCO = False
+_blanqueados = OrderedDict()
+
+def _ruta_archivo(nombre_evento, detector):
+    return os.path.join(DATA_DIR, f"{nombre_evento}_{detector}.hdf5")
 
 def descargar_evento(nombre_evento, detector):
     os.makedirs(DATA_DIR, exist_ok=True)
-    urls = get_event_urls(nombre_evento, detector=detector)
-    url = urls[0]
-    nombre_archivo = os.path.join(DATA_DIR, f"{nombre_evento}_{detector}.hdf5")
+    url = url_evento(nombre_evento, detector)
+    if url is None:
+        raise ValueError(f"GWOSC no tiene strain {detector} para {nombre_evento}")
+    nombre_archivo = _ruta_archivo(nombre_evento, detector)
     if not os.path.exists(nombre_archivo):
         print(f"  ⬇️  Descargando {nombre_evento} ({detector})...")
-        urllib.request.urlretrieve(url, nombre_archivo)
-    return nombre_archivo
-
-def whitening_completo(segmento, fs):
-    nperseg = min(int(fs * 4), len(segmento))
-    freqs, psd = welch(segmento, fs=fs, nperseg=nperseg, window="hann")
-    interp_psd = interp1d(freqs, psd, bounds_error=False, fill_value="extrapolate")
-    n = len(segmento)
-    ventana = tukey(n, alpha=0.2)
-    hf = np.fft.rfft(segmento * ventana)
-    freqs_full = np.fft.rfftfreq(n, 1/fs)
-    norm = 1.0 / np.sqrt(fs / 2)
-    hf_blanco = hf / np.sqrt(interp_psd(freqs_full)) * norm
-    blanco = np.fft.irfft(hf_blanco, n=n)
-    nyq = fs / 2
-    b, a = butter(4, [35 / nyq, 350 / nyq], btype="band")
-    return filtfilt(b, a, blanco)
+    # reanuda descargas cortadas y repara archivos truncados (ver cache_descargas.py)
+    return descargar_verificado(url, nombre_archivo)
 
 def extraer_ventana(señal_blanca, fs, centro_s, duracion_s=1):
     centro_muestra = int(centro_s * fs)
@@ -56,22 +62,103 @@ def remuestrear(segmento, fs_orig, fs_obj):
     factor = int(fs_orig) // fs_obj
     return segmento[::factor]
 
-def procesar_un_detector(nombre_evento, detector, offset_extra_s=0):
-    """offset_extra_s permite extraer negativos igual que antes."""
+def _offset_ventana(offset_evento, offset_extra_s, duracion_s):
+    """Centro de la ventana: la positiva siempre en el evento; los
+    negativos a más de 2 s de los bordes del archivo (como en
+    construir_dataset_real: en los de 32 s, 2 y 30 s; en los de 4096 s
+    el evento está hacia la mitad)."""
+    if offset_extra_s < 0:
+        return max(2, offset_evento + offset_extra_s)
+    if offset_extra_s > 0:
+        return min(duracion_s - 2, offset_evento + offset_extra_s)
+    return offset_evento
+
+def _blanquear_desde_archivo(nombre_evento, detector):
     archivo = descargar_evento(nombre_evento, detector)
-    gps_evento = event_gps(nombre_evento)
-    with h5py.File(archivo, "r") as f:
-        strain = f["strain"]["Strain"][:]
-        dt = f["strain"]["Strain"].attrs.get("Xspacing", 1/4096)
-        gps_inicio = f["meta"]["GPSstart"][()]
+    fs_archivo, gps_inicio, n_muestras = metadatos_strain(archivo)
+    duracion_s = n_muestras / fs_archivo
+    offset_evento = gps_evento(nombre_evento) - gps_inicio
+    # Solo el tramo que cubre las ventanas de OFFSETS_VENTANAS_S + margen
+    centros = [_offset_ventana(offset_evento, extra, duracion_s) for extra in OFFSETS_VENTANAS_S]
+    strain, fs, inicio_s = leer_region(archivo, min(centros) - 0.5 - PADDING_BLANQUEO_S,
+                                       max(centros) + 0.5 + PADDING_BLANQUEO_S)
     if np.isnan(strain).any():
         return None  # dato incompleto, igual que GW190425
-    fs = 1.0 / dt
-    señal_blanca = whitening_completo(strain, fs)
-    offset = (gps_evento - gps_inicio) + offset_extra_s
-    offset = max(2, min(30, offset))
-    ventana = extraer_ventana(señal_blanca, fs, offset)
-    return remuestrear(ventana, fs, FS_OBJETIVO)
+    return blanquear(strain, fs), fs, offset_evento, inicio_s, duracion_s
+
+def _version_blanqueo(nombre_evento, detector):
+    """Todo lo que determina el strain blanqueado de (evento, detector),
+    como texto, o None si el archivo aún no está descargado."""
+    archivo = _ruta_archivo(nombre_evento, detector)
+    if not os.path.exists(archivo):
+        return None
+    info = os.stat(archivo)
+    return json.dumps({"bytes": info.st_size, "mtime_ns": info.st_mtime_ns, "gps": gps_evento(nombre_evento),
+                       "padding_s": PADDING_BLANQUEO_S, "offsets_s": list(OFFSETS_VENTANAS_S),
+                       "blanqueo": PARAMETROS_BLANQUEO}, sort_keys=True)
+
+def _leer_cache_disco(ruta, version):
+    """(True, entrada) si hay caché en disco de esta versión (entrada None
+    si el dato era incompleto); (False, None) si falta o es de otra."""
+    if version is None or not os.path.exists(ruta):
+        return False, None
+    with np.load(ruta) as d:
+        if "version" not in d or str(d["version"]) != version:
+            return False, None
+        if d["incompleto"]:
+            return True, None
+        return True, (d["senal"], float(d["fs"]), float(d["offset_evento"]), float(d["inicio"]),
+                      float(d["duracion"]))
+
+def _guardar_cache_disco(ruta, version, entrada):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = ruta + ".tmp.npz"
+    if entrada is None:
+        np.savez(temporal, version=version, incompleto=True)
+    else:
+        np.savez(temporal, version=version, incompleto=False, senal=entrada[0], fs=entrada[1],
+                 offset_evento=entrada[2], inicio=entrada[3], duracion=entrada[4])
+    os.replace(temporal, ruta)
+
+def strain_blanqueado(nombre_evento, detector):
+    """Devuelve (señal_blanca, fs, offset_evento_s, inicio_s, duracion_s)
+    del tramo leído del detector (offsets en segundos desde el comienzo
+    del archivo; inicio_s es donde empieza señal_blanca y duracion_s la
+    del archivo entero), o None
+    si el dato tiene NaN. Se calcula una sola vez por (evento, detector)
+    y se reutiliza para todas las ventanas."""
+    clave = (nombre_evento, detector)
+    if clave in _blanqueados:
+        _blanqueados.move_to_end(clave)
+        return _blanqueados[clave]
+
+    ruta_disco = os.path.join(CACHE_BLANQUEO_DIR, f"{nombre_evento}_{detector}.npz")
+    encontrada, entrada = False, None
+    if USAR_CACHE_DISCO:
+        encontrada, entrada = _leer_cache_disco(ruta_disco, _version_blanqueo(nombre_evento, detector))
+    if not encontrada:
+        entrada = _blanquear_desde_archivo(nombre_evento, detector)
+        if USAR_CACHE_DISCO:
+            _guardar_cache_disco(ruta_disco, _version_blanqueo(nombre_evento, detector), entrada)
+
+    _blanqueados[clave] = entrada
+    if len(_blanqueados) > MAX_BLANQUEADOS_EN_MEMORIA:
+        _blanqueados.popitem(last=False)
+    return entrada
+
+def procesar_un_detector(nombre_evento, detector, offset_extra_s=0):
+    """offset_extra_s permite extraer negativos igual que antes."""
+    entrada = strain_blanqueado(nombre_evento, detector)
+    if entrada is None:
+        return None
+    señal_blanca, fs, offset_evento, inicio_s, duracion_s = entrada
+    offset = _offset_ventana(offset_evento, offset_extra_s, duracion_s)
+    ventana = remuestrear(extraer_ventana(señal_blanca, fs, offset - inicio_s), fs, FS_OBJETIVO)
+    # una ventana fuera del tramo leído sale vacía o recortada (y sin NaN)
+    if len(ventana) != FS_OBJETIVO:
+        raise ValueError(f"Ventana incompleta ({len(ventana)} muestras) de {nombre_evento} {detector}: "
+                         f"el evento cae fuera del archivo o demasiado cerca del borde")
+    return ventana
 
 def correlacion_cruzada_normalizada(h1, l1):
     """Máximo de correlación cruzada normalizada entre H1 y L1 — una
@@ -100,12 +187,14 @@ def procesar_evento_dual(nombre_evento):
     }
 
 if __name__ == "__main__":
+    USAR_CACHE_DISCO = "--cache-disco" in sys.argv
     with open(os.path.join(DATASET_DIR, "eventos_procesados.json")) as f:
         registro = json.load(f)
     eventos = registro["eventos_procesados"]
 
     resultados_corr_positivo = []
     resultados_corr_negativo = []
+    eventos_con_hl = []
     exitosos, fallidos = 0, 0
 
     for i, evento in enumerate(eventos, 1):
@@ -115,6 +204,7 @@ if __name__ == "__main__":
             resultados_corr_positivo.append(r["positivo"][2])
             resultados_corr_negativo.append(r["negativo1"][2])
             resultados_corr_negativo.append(r["negativo2"][2])
+            eventos_con_hl.append(evento)
             exitosos += 1
             print(f"  ✅ Correlación H1-L1 (evento): {r['positivo'][2]:.3f}")
         except Exception as e:
@@ -127,4 +217,7 @@ if __name__ == "__main__":
 
     np.save(os.path.join(DATASET_DIR, "correlacion_hl_positivos.npy"), np.array(resultados_corr_positivo))
     np.save(os.path.join(DATASET_DIR, "correlacion_hl_negativos.npy"), np.array(resultados_corr_negativo))
+    # qué eventos tienen correlación (para indice_filas, en vez de listas de exclusión a mano)
+    with open(os.path.join(DATASET_DIR, "correlacion_hl_eventos.json"), "w") as f:
+        json.dump(eventos_con_hl, f, indent=2)
     print("\n💾 Correlaciones guardadas en data/correlacion_hl_*.npy")
@@ -1,19 +1,23 @@
 """
 Construye/amplía un dataset 100% REAL para entrenar el K-NN.
 Acepta una lista de eventos, evita reprocesar los ya guardados,
-y AÑADE al dataset existente en vez de sobrescribirlo.
+y AÑADE al dataset existente en vez de sobrescribirlo (fragmentos
+append-only, ver almacen_dataset.py).
 """
 import numpy as np
-import h5py
 import os
 import json
+import argparse
 import warnings
-from scipy.signal import welch, butter, filtfilt
-from scipy.signal.windows import tukey
-from scipy.interpolate import interp1d
-from gwosc.locate import get_event_urls
-from gwosc.datasets import event_gps
-import urllib.request
+import multiprocessing
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from deepwave_whitening_real import blanquear
+from lector_strain import metadatos_strain, leer_region
+from cache_descargas import descargar_verificado
+from indice_metadatos import gps_evento, url_evento
+from almacen_dataset import AlmacenDataset
 
 warnings.filterwarnings("ignore")
 
@@ -21,6 +25,9 @@ DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__
 DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 REGISTRO_PATH = os.path.join(DATASET_DIR, "eventos_procesados.json")
 FS_OBJETIVO = 2048
+# Margen de strain que se lee a cada lado de las ventanas a extraer:
+# Welch usa tramos de 4 s y la ventana Tukey atenúa los bordes.
+PADDING_BLANQUEO_S = 4
 
 def cargar_registro():
     """Devuelve (lista_procesados, lista_excluidos). Compatible con
@@ -35,35 +42,21 @@ def cargar_registro():
     return [], []
 
 def guardar_registro(procesados, excluidos):
-    with open(REGISTRO_PATH, "w") as f:
+    temporal = REGISTRO_PATH + ".tmp"
+    with open(temporal, "w") as f:
         json.dump({"eventos_procesados": procesados, "eventos_excluidos_por_nan": excluidos}, f, indent=2)
+    os.replace(temporal, REGISTRO_PATH)
 
 def descargar_evento(nombre_evento):
     os.makedirs(DATA_DIR, exist_ok=True)
-    urls = get_event_urls(nombre_evento, detector="H1")
-    if not urls:
-        urls = get_event_urls(nombre_evento, detector="L1")
-    url = urls[0]
+    url = url_evento(nombre_evento, "H1") or url_evento(nombre_evento, "L1")
+    if url is None:
+        raise ValueError(f"GWOSC no tiene strain H1 ni L1 para {nombre_evento}")
     nombre_archivo = os.path.join(DATA_DIR, f"{nombre_evento}.hdf5")
     if not os.path.exists(nombre_archivo):
         print(f"  ⬇️  Descargando {nombre_evento}...")
-        urllib.request.urlretrieve(url, nombre_archivo)
-    return nombre_archivo
-
-def whitening_completo(segmento, fs):
-    nperseg = min(int(fs * 4), len(segmento))
-    freqs, psd = welch(segmento, fs=fs, nperseg=nperseg, window="hann")
-    interp_psd = interp1d(freqs, psd, bounds_error=False, fill_value="extrapolate")
-    n = len(segmento)
-    ventana = tukey(n, alpha=0.2)
-    hf = np.fft.rfft(segmento * ventana)
-    freqs_full = np.fft.rfftfreq(n, 1/fs)
-    norm = 1.0 / np.sqrt(fs / 2)
-    hf_blanco = hf / np.sqrt(interp_psd(freqs_full)) * norm
-    blanco = np.fft.irfft(hf_blanco, n=n)
-    nyq = fs / 2
-    b, a = butter(4, [35 / nyq, 350 / nyq], btype="band")
-    return filtfilt(b, a, blanco)
+    # reanuda descargas cortadas y repara archivos truncados (ver cache_descargas.py)
+    return descargar_verificado(url, nombre_archivo)
 
 def extraer_ventana(señal_blanca, fs, centro_s, duracion_s=1):
     centro_muestra = int(centro_s * fs)
@@ -74,72 +67,128 @@ def remuestrear(segmento, fs_orig, fs_obj):
     factor = int(fs_orig) // fs_obj
     return segmento[::factor]
 
-def procesar_evento(nombre_evento):
-    archivo = descargar_evento(nombre_evento)
-    gps_evento = event_gps(nombre_evento)
-    with h5py.File(archivo, "r") as f:
-        strain = f["strain"]["Strain"][:]
-        dt = f["strain"]["Strain"].attrs.get("Xspacing", 1/4096)
-        gps_inicio = f["meta"]["GPSstart"][()]
-    fs = 1.0 / dt
-    señal_blanca = whitening_completo(strain, fs)
+def preparar_evento(nombre_evento):
+    """Parte de red/disco: descarga (si falta) y GPS del índice local."""
+    return descargar_evento(nombre_evento), gps_evento(nombre_evento)
+
+def extraer_ventanas_evento(archivo, gps_evento):
+    """Parte de CPU: lectura, whitening y extracción de las 3 ventanas."""
+    fs_archivo, gps_inicio, n_muestras = metadatos_strain(archivo)
+    duracion_s = n_muestras / fs_archivo
     offset_evento = gps_evento - gps_inicio
-    positivo = remuestrear(extraer_ventana(señal_blanca, fs, offset_evento), fs, FS_OBJETIVO)
+    # negativos a ±12 s del evento, a más de 2 s de los bordes del archivo
+    # (en los de 32 s: 2 y 30 s, como siempre; en los de 4096 s el evento
+    # está hacia la mitad)
     offset_neg1 = max(2, offset_evento - 12)
-    offset_neg2 = min(30, offset_evento + 12)
-    negativo1 = remuestrear(extraer_ventana(señal_blanca, fs, offset_neg1), fs, FS_OBJETIVO)
-    negativo2 = remuestrear(extraer_ventana(señal_blanca, fs, offset_neg2), fs, FS_OBJETIVO)
-    return positivo, negativo1, negativo2
+    offset_neg2 = min(duracion_s - 2, offset_evento + 12)
+    offsets = (offset_evento, offset_neg1, offset_neg2)
+    # Solo se lee el tramo que cubre las 3 ventanas + margen de whitening
+    # (en los archivos de 32 s eso es el archivo entero; en los de 4096 s
+    # evita cargar 128 MB para usar unos segundos).
+    strain, fs, inicio_s = leer_region(archivo, min(offsets) - 0.5 - PADDING_BLANQUEO_S,
+                                       max(offsets) + 0.5 + PADDING_BLANQUEO_S)
+    señal_blanca = blanquear(strain, fs)
+    ventanas = [remuestrear(extraer_ventana(señal_blanca, fs, offset - inicio_s), fs, FS_OBJETIVO)
+                for offset in offsets]
+    # una ventana fuera del tramo leído sale vacía o recortada (y sin NaN)
+    if any(len(v) != FS_OBJETIVO for v in ventanas):
+        raise ValueError(f"Ventanas incompletas ({[len(v) for v in ventanas]} muestras): "
+                         f"el evento cae fuera del archivo o demasiado cerca del borde")
+    return tuple(ventanas)
 
-def ampliar_dataset(nuevos_eventos):
-    procesados, excluidos = cargar_registro()
+def procesar_evento(nombre_evento):
+    return extraer_ventanas_evento(*preparar_evento(nombre_evento))
 
-    ruta_pos = os.path.join(DATASET_DIR, "dataset_real_positivos.npy")
-    ruta_neg = os.path.join(DATASET_DIR, "dataset_real_negativos.npy")
-    positivos = list(np.load(ruta_pos)) if os.path.exists(ruta_pos) else []
-    negativos = list(np.load(ruta_neg)) if os.path.exists(ruta_neg) else []
+def _encadenar(futuro_descarga, pool_cpu):
+    """Futuro del resultado final de un evento: en cuanto termina su
+    descarga (pool de hilos), lanza el whitening en el pool de procesos."""
+    resultado = Future()
+
+    def al_terminar_cpu(futuro_cpu):
+        if futuro_cpu.exception() is not None:
+            resultado.set_exception(futuro_cpu.exception())
+        else:
+            resultado.set_result(futuro_cpu.result())
+
+    def al_terminar_descarga(futuro):
+        try:
+            pool_cpu.submit(extraer_ventanas_evento, *futuro.result()).add_done_callback(al_terminar_cpu)
+        except Exception as e:
+            resultado.set_exception(e)
+
+    futuro_descarga.add_done_callback(al_terminar_descarga)
+    return resultado
+
+def resultados_en_orden(eventos, workers=1):
+    """Genera (evento, obtener_resultado) en el orden ORIGINAL de
+    `eventos`; obtener_resultado() devuelve (positivo, negativo1,
+    negativo2) o lanza la excepción del evento.
+
+    Con workers > 1 funciona como pipeline: un pool de hilos acotado
+    descarga (red/disco) mientras un pool de procesos hace el whitening
+    (CPU) de los eventos ya descargados. Los resultados que llegan
+    desordenados esperan a su turno, así que el dataset queda igual
+    que en modo secuencial."""
+    if workers <= 1:
+        for evento in eventos:
+            yield evento, lambda evento=evento: procesar_evento(evento)
+        return
+    # spawn: los procesos se arrancan desde los callbacks de descarga, con
+    # otros hilos vivos (h5py, índice sqlite): un fork podría heredar
+    # sus locks cogidos y bloquearse
+    pool_cpu = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    pool_io = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futuros = [_encadenar(pool_io.submit(preparar_evento, e), pool_cpu) for e in eventos]
+        for evento, futuro in zip(eventos, futuros):
+            yield evento, futuro.result
+    finally:
+        # con Ctrl-C o un error no se espera a las descargas en cola
+        pool_io.shutdown(cancel_futures=True)
+        pool_cpu.shutdown(cancel_futures=True)
+
+def ampliar_dataset(nuevos_eventos, workers=1):
+    almacen = AlmacenDataset(DATASET_DIR)
+    # el manifiesto del almacén es la fuente de verdad: se confirma en el
+    # mismo commit atómico que las filas
+    procesados, excluidos = almacen.registro()
+    if procesados is None:
+        procesados, excluidos = cargar_registro()
 
     eventos_a_procesar = [e for e in nuevos_eventos if e not in procesados and e not in excluidos]
     print(f"📋 {len(eventos_a_procesar)} eventos nuevos de {len(nuevos_eventos)} solicitados (resto ya procesado)")
 
     exitosos, fallidos = 0, 0
-    for i, evento in enumerate(eventos_a_procesar, 1):
+    for i, (evento, obtener_resultado) in enumerate(resultados_en_orden(eventos_a_procesar, workers), 1):
         print(f"\n[{i}/{len(eventos_a_procesar)}] Procesando {evento}...")
         try:
-            pos, neg1, neg2 = procesar_evento(evento)
+            pos, neg1, neg2 = obtener_resultado()
             if np.isnan(pos).any() or np.isnan(neg1).any() or np.isnan(neg2).any():
                 excluidos.append(evento)
                 fallidos += 1
                 print(f"  ⚠️  Excluido: contiene NaN (dato real incompleto)")
-                continue
-            positivos.append(pos)
-            negativos.append(neg1)
-            negativos.append(neg2)
-            procesados.append(evento)
-            exitosos += 1
-            print(f"  ✅ 1 positivo + 2 negativos extraídos")
+            else:
+                almacen.agregar(positivos=[pos], negativos=[neg1, neg2])
+                procesados.append(evento)
+                exitosos += 1
+                print(f"  ✅ 1 positivo + 2 negativos extraídos")
         except Exception as e:
             fallidos += 1
             print(f"  ❌ Error: {e}")
 
-        # Guardado incremental cada 5 eventos: si la sesión se corta,
-        # como máximo se pierden 4 eventos ya procesados, no todos.
-        if i % 5 == 0:
-            np.save(ruta_pos, np.array(positivos))
-            np.save(ruta_neg, np.array(negativos))
-            guardar_registro(procesados, excluidos)
-            print(f"  💾 Guardado incremental ({len(positivos)} positivos hasta ahora)")
-
-    np.save(ruta_pos, np.array(positivos))
-    np.save(ruta_neg, np.array(negativos))
-    guardar_registro(procesados, excluidos)
+        # Commit atómico tras CADA evento: solo se escriben sus 3 filas
+        # (no el dataset entero), así que un corte no pierde nada ya
+        # procesado ni puede dejar un .npy a medio escribir.
+        almacen.confirmar(procesados, excluidos)
+        guardar_registro(procesados, excluidos)
 
-    print(f"\n📊 Dataset TOTAL ahora: {len(positivos)} positivos, {len(negativos)} negativos")
+    print(f"\n📊 Dataset TOTAL ahora: {almacen.n_filas('positivos')} positivos, {almacen.n_filas('negativos')} negativos")
     print(f"   ({exitosos} exitosos, {fallidos} fallidos en esta ronda)")
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) < 2:
-        print("Uso: python construir_dataset_real.py evento1 evento2 ...")
-        sys.exit(1)
-    ampliar_dataset(sys.argv[1:])
+    parser = argparse.ArgumentParser(description="Amplía el dataset real con nuevos eventos GWOSC")
+    parser.add_argument("eventos", nargs="+", help="nombres de evento, p.ej. GW150914-v3")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="descargas y whitening en paralelo (1 = secuencial, como antes)")
+    args = parser.parse_args()
+    ampliar_dataset(args.eventos, workers=args.workers)
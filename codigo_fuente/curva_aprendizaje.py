@@ -0,0 +1,142 @@
+"""
+Seguimiento incremental de la curva de aprendizaje: AUC condicionado por
+SNR (alto/bajo respecto a la mediana) en cada checkpoint del dataset
+(TODO.md: n≈150, 200, 250, 300, 350).
+
+auc_condicionado_por_snr.py volvía a pedir los SNR, recalculaba todos
+los espectrogramas y features y repetía el leave-one-out completo de
+cada grupo en cada checkpoint. Aquí:
+- SNR y features salen del índice de metadatos y del almacén de
+  features (solo se calculan los eventos nuevos);
+- las listas de vecinos leave-one-out de cada grupo se guardan en
+  data/curva_aprendizaje_estado.npz junto con la versión del dataset;
+  al ampliar el dataset solo se actualizan las listas afectadas
+  (loo_knn.vecinos_loo_incremental);
+- cada checkpoint (AUC alto/bajo + IC 95% bootstrap por evento) se
+  añade a data/curva_aprendizaje.json para comparar versiones.
+
+    python codigo_fuente/curva_aprendizaje.py      # checkpoint del dataset actual
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codigo_fuente.loo_knn import vecinos_loo_incremental
+from codigo_fuente.bootstrap_auc import auc_puntual, bootstrap_auc, intervalo_confianza
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+RUTA_ESTADO = os.path.join(DATA_DIR, "curva_aprendizaje_estado.npz")
+RUTA_HISTORIAL = os.path.join(DATA_DIR, "curva_aprendizaje.json")
+K_SCORE = 15
+N_BOOTSTRAP = 20_000
+SEMILLA = 42
+GRUPOS = ("alto", "bajo")
+CAMPOS_ESTADO = ("claves", "k", "X_min", "X_max", "vecinos", "distancias", "extremos")
+
+
+def claves_filas(indice):
+    """Identificador estable de cada fila del índice (evento|etiqueta|offset),
+    que no cambia al añadir eventos aunque cambie su posición."""
+    return np.array([f"{e}|{et}|{off:g}" for e, et, off in
+                     zip(indice["evento"], indice["etiqueta"], indice["offset_ventana_s"])])
+
+
+def version_dataset(X, claves):
+    h = hashlib.sha1()
+    h.update("\n".join(claves).encode())
+    h.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+class CurvaAprendizaje:
+    def __init__(self, ruta_estado=RUTA_ESTADO, ruta_historial=RUTA_HISTORIAL, k=K_SCORE,
+                 n_bootstrap=N_BOOTSTRAP, semilla=SEMILLA):
+        self.ruta_estado = ruta_estado
+        self.ruta_historial = ruta_historial
+        self.k = k
+        self.n_bootstrap = n_bootstrap
+        self.semilla = semilla
+
+    def _cargar_estado(self):
+        if not os.path.exists(self.ruta_estado):
+            return {}
+        with np.load(self.ruta_estado) as datos:
+            return {g: {c: datos[f"{g}_{c}"] for c in CAMPOS_ESTADO}
+                    for g in GRUPOS if f"{g}_claves" in datos}
+
+    def _guardar_estado(self, estados, version):
+        arrays = {f"{g}_{c}": np.asarray(estado[c]) for g, estado in estados.items() for c in CAMPOS_ESTADO}
+        temporal = self.ruta_estado + ".tmp"
+        with open(temporal, "wb") as f:
+            np.savez(f, version=version, **arrays)
+        os.replace(temporal, self.ruta_estado)
+
+    def historial(self):
+        if not os.path.exists(self.ruta_historial):
+            return []
+        with open(self.ruta_historial, "r") as f:
+            return json.load(f)
+
+    def _guardar_historial(self, historial):
+        temporal = self.ruta_historial + ".tmp"
+        with open(temporal, "w") as f:
+            json.dump(historial, f, indent=2, ensure_ascii=False)
+        os.replace(temporal, self.ruta_historial)
+
+    def checkpoint(self, X, y, claves, eventos, snr):
+        """Evalúa el dataset actual (filas alineadas con `claves`), guarda
+        el estado para el siguiente checkpoint y añade (o reemplaza, si
+        la versión ya estaba) la entrada del historial."""
+        X, y, claves = np.asarray(X, dtype=np.float64), np.asarray(y), np.asarray(claves)
+        eventos, snr = np.asarray(eventos), np.asarray(snr, dtype=np.float64)
+        version = version_dataset(X, claves)
+        mediana = float(np.median(snr[(y == 1) & ~np.isnan(snr)]))
+        previos = self._cargar_estado()
+
+        entrada = {"version": version, "n_eventos": int(np.sum(y == 1)), "fecha": time.strftime("%Y-%m-%d %H:%M"),
+                   "mediana_snr": mediana}
+        estados = {}
+        # SNR desconocido (NaN) no entra en ningún grupo
+        for grupo, mascara in (("alto", snr >= mediana), ("bajo", snr < mediana)):
+            filas = np.flatnonzero(mascara)
+            # K como en auc_condicionado_por_snr: como mucho n - 2 vecinos
+            vecinos, _, estados[grupo], reutilizado = vecinos_loo_incremental(
+                X[filas], claves[filas], min(self.k, len(filas) - 2), previos.get(grupo))
+            scores = np.mean(y[filas][vecinos] == 1, axis=1)
+            aucs = bootstrap_auc(scores, y[filas], self.n_bootstrap, self.semilla, grupos=eventos[filas])
+            entrada[grupo] = {"n": int(np.sum(y[filas] == 1)), "auc": float(auc_puntual(scores, y[filas])),
+                              "ic95": [float(v) for v in intervalo_confianza(aucs)],
+                              "vecinos_reutilizados": bool(reutilizado)}
+
+        self._guardar_estado(estados, version)
+        historial = [e for e in self.historial() if e["version"] != version] + [entrada]
+        historial.sort(key=lambda e: e["n_eventos"])
+        self._guardar_historial(historial)
+        return entrada
+
+
+if __name__ == "__main__":
+    from codigo_fuente.almacen_features import features_dataset
+    from codigo_fuente.indice_metadatos import snrs_eventos
+    from codigo_fuente.indice_filas import cargar_indice_filas, eventos_del_dataset
+
+    inicio = time.time()
+    snrs_eventos(eventos_del_dataset(DATA_DIR))  # indexa antes los SNR que falten
+    indice = cargar_indice_filas(DATA_DIR)
+    X_pos, X_neg = features_dataset("v1")
+    X_todo = np.vstack([X_pos, X_neg])
+    y_todo = np.array([1] * len(X_pos) + [0] * len(X_neg))
+
+    curva = CurvaAprendizaje()
+    entrada = curva.checkpoint(X_todo, y_todo, claves_filas(indice), indice["evento"], indice["snr"])
+    print(f"📈 Checkpoint n={entrada['n_eventos']} (mediana SNR {entrada['mediana_snr']:.2f}, "
+          f"{time.time() - inicio:.1f}s)")
+
+    print(f"\n{'n eventos':>10} {'SNR alto':>22} {'SNR bajo':>22}")
+    for e in curva.historial():
+        celdas = [f"{e[g]['auc']:.3f} ({e[g]['ic95'][0]:.3f}–{e[g]['ic95'][1]:.3f})" for g in GRUPOS]
+        print(f"{e['n_eventos']:>10} {celdas[0]:>22} {celdas[1]:>22}")
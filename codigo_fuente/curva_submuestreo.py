@@ -0,0 +1,141 @@
+"""
+Curva AUC-vs-n por submuestreo: ¿sigue mejorando el AUC al crecer el
+dataset? Para cada tamaño n se sortean muchas submuestras de n eventos
+(cada evento con su positivo y sus 2 negativos), estratificadas por SNR
+(la proporción alto/bajo respecto a la mediana se mantiene), y se
+calcula el AUC leave-one-out (K=15, score continuo) de cada una, en la
+línea de bootstrap_auc_v1.py y auc_condicionado_por_snr.py.
+
+Repetir el LOO por submuestra con los scripts actuales (un re-ajuste y
+un argsort por fold) era inviable. Aquí cada submuestra usa el LOO
+exacto de loo_knn (una matriz de distancias por bloques; solo los folds
+extremos se renormalizan), y las submuestras se reparten en un pool de
+procesos.
+
+No se comparte un tensor (n_features, N, N) de diferencias al cuadrado
+entre submuestras (como en distancias_por_feature): cada submuestra
+tiene su propio rango min-max, así que habría que extraer su submatriz
+(n_features, n, n) y ponderarla, y esa extracción cuesta más que
+recalcular las distancias desde las n filas (con 4 features, N=1110 y
+n=600: ~9-20 ms frente a ~4.5 ms por submuestra). Además, así los
+vecinos son los de vecinos_loo bit a bit, empates incluidos.
+
+    python codigo_fuente/curva_submuestreo.py
+"""
+import json
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codigo_fuente.loo_knn import vecinos_loo
+from codigo_fuente.bootstrap_auc import auc_puntual, intervalo_confianza
+from codigo_fuente.pool_tareas import mapear
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+K_SCORE = 15
+REPETICIONES = 200
+REPETICIONES_POR_TAREA = 20
+SEMILLA = 42
+
+
+class MotorSubmuestreo:
+    def __init__(self, X, y, eventos, k=K_SCORE):
+        self.X = np.asarray(X, dtype=np.float64)
+        self.y = np.asarray(y)
+        self.k = k
+        self.nombres_eventos, self.evento_de_fila = np.unique(np.asarray(eventos), return_inverse=True)
+        # filas de cada evento (su positivo y sus negativos)
+        orden = np.argsort(self.evento_de_fila, kind="stable")
+        cortes = np.cumsum(np.bincount(self.evento_de_fila, minlength=len(self.nombres_eventos)))[:-1]
+        self.filas_por_evento = np.split(orden, cortes)
+
+    def auc_loo(self, filas):
+        """AUC leave-one-out del K-NN entrenado solo con `filas` (K como en
+        auc_condicionado_por_snr: como mucho n - 2 vecinos)."""
+        filas = np.sort(np.asarray(filas))
+        vecinos, _ = vecinos_loo(self.X[filas], min(self.k, len(filas) - 2))
+        y = self.y[filas]
+        return auc_puntual(np.mean(y[vecinos] == 1, axis=1), y)
+
+    def sortear(self, n_eventos, estratos, rng):
+        """Filas de n_eventos eventos sorteados sin reemplazo dentro de cada
+        estrato, en proporción al tamaño del estrato. `estratos` es un
+        dict {estrato: [índices de evento en nombres_eventos]}."""
+        total = sum(len(e) for e in estratos.values())
+        cupos = {nombre: int(round(n_eventos * len(e) / total)) for nombre, e in estratos.items()}
+        # el redondeo puede descuadrar en 1: se ajusta en el estrato más grande
+        mayor = max(estratos, key=lambda nombre: len(estratos[nombre]))
+        cupos[mayor] += n_eventos - sum(cupos.values())
+        elegidos = np.concatenate([rng.choice(estratos[nombre], size=cupos[nombre], replace=False)
+                                   for nombre in estratos])
+        return np.concatenate([self.filas_por_evento[e] for e in elegidos])
+
+    def _aucs_tamano(self, n_eventos, estratos, repeticiones, semilla):
+        rng = np.random.default_rng(semilla)
+        return np.array([self.auc_loo(self.sortear(n_eventos, estratos, rng)) for _ in range(repeticiones)])
+
+    def curva(self, tamanos, estratos, repeticiones=REPETICIONES, semilla=SEMILLA, workers=1,
+              repeticiones_por_tarea=REPETICIONES_POR_TAREA):
+        """[{n, media, ic95, aucs}] para cada n de `tamanos`. Las
+        repeticiones de cada tamaño se reparten en tareas de
+        `repeticiones_por_tarea`, cada una con su propio stream aleatorio
+        (SeedSequence.spawn): el resultado no depende de `workers`. Un
+        tamaño que abarca todos los eventos de los estratos solo tiene
+        una submuestra posible: se evalúa una vez y su ic95 es None."""
+        total = sum(len(e) for e in estratos.values())
+        tareas, tareas_por_tamano = [], []
+        for n, semilla_n in zip(tamanos, np.random.SeedSequence(semilla).spawn(len(tamanos))):
+            repeticiones_n = 1 if n >= total else repeticiones
+            bloques = [min(repeticiones_por_tarea, repeticiones_n - i)
+                       for i in range(0, repeticiones_n, repeticiones_por_tarea)]
+            tareas += [(n, estratos, r, s) for r, s in zip(bloques, semilla_n.spawn(len(bloques)))]
+            tareas_por_tamano.append(len(bloques))
+        resultados = [aucs for _, aucs in mapear(MotorSubmuestreo._aucs_tamano, (self,), tareas, workers)]
+
+        curva, inicio = [], 0
+        for n, n_tareas in zip(tamanos, tareas_por_tamano):
+            aucs = np.concatenate(resultados[inicio:inicio + n_tareas])
+            inicio += n_tareas
+            curva.append({"n": int(n), "media": float(np.nanmean(aucs)),
+                          "ic95": ([float(v) for v in intervalo_confianza(aucs[~np.isnan(aucs)])]
+                                   if len(aucs) > 1 else None),
+                          "aucs": aucs})
+        return curva
+
+
+def estratos_por_snr(nombres_eventos, snr_por_evento):
+    """{"alto": [...], "bajo": [...]} (índices en nombres_eventos) respecto
+    a la mediana del SNR; los eventos sin SNR no entran en ningún estrato."""
+    snr = np.array([snr_por_evento.get(e, np.nan) for e in nombres_eventos], dtype=np.float64)
+    mediana = np.nanmedian(snr)
+    return {"alto": np.flatnonzero(snr >= mediana), "bajo": np.flatnonzero(snr < mediana)}
+
+
+if __name__ == "__main__":
+    from codigo_fuente.almacen_features import features_dataset
+    from codigo_fuente.indice_filas import cargar_indice_filas
+
+    print("📈 CURVA AUC vs n (submuestreo estratificado por SNR, LOO K=15)")
+    print("=" * 65)
+    indice = cargar_indice_filas(DATA_DIR)
+    X_pos, X_neg = features_dataset("v1")
+    motor = MotorSubmuestreo(np.vstack([X_pos, X_neg]), np.array([1] * len(X_pos) + [0] * len(X_neg)),
+                             indice["evento"])
+    positivos = indice[indice["etiqueta"] == 1]
+    estratos = estratos_por_snr(motor.nombres_eventos, dict(zip(positivos["evento"], positivos["snr"])))
+    n_con_snr = sum(len(e) for e in estratos.values())
+
+    # el último punto (todos los eventos con SNR) es una sola submuestra: sin IC
+    tamanos = [n for n in (25, 50, 75, 100, 150, 200, 250, 300, 350) if n < n_con_snr] + [n_con_snr]
+    curva = motor.curva(tamanos, estratos, workers=os.cpu_count() or 1)
+
+    print(f"{'n eventos':>10} {'AUC medio':>10} {'IC 95%':>16}")
+    for punto in curva:
+        ic95 = (f"{punto['ic95'][0]:>7.3f}–{punto['ic95'][1]:.3f}" if punto["ic95"] is not None
+                else f"{'(dataset completo)':>16}")
+        print(f"{punto['n']:>10} {punto['media']:>10.3f} {ic95}")
+
+    with open(os.path.join(DATA_DIR, "curva_submuestreo_v1.json"), "w") as f:
+        json.dump([{k: v for k, v in p.items() if k != "aucs"} for p in curva], f, indent=2)
+    print("\n💾 Curva guardada en data/curva_submuestreo_v1.json")
@@ -5,13 +5,11 @@ whitening + K-NN. Si el clasificador también dice "BBH" aquí, el
 resultado anterior era un falso positivo del modelo, no una detección real.
 """
 import numpy as np
-import h5py
-from scipy.signal import welch, butter, filtfilt
-from scipy.signal.windows import tukey
-from scipy.interpolate import interp1d
 import sys
 sys.path.insert(0, "codigo_fuente")
 from deepwave_preprocessing import calcular_espectrograma_stub
+from deepwave_whitening_real import blanquear
+from lector_strain import leer_muestras
 from deepwave_knn_real import DeepWaveKNNReal, extraer_features
 
 ARCHIVO_LOCAL = "data/GW150914_H1_4096s.hdf5"
@@ -21,29 +19,11 @@ FS_ORIGINAL = 4096
 FS_OBJETIVO = 2048
 
 def procesar_segmento(centro_offset_s, duracion_analisis_s=32, duracion_final_s=1):
-    with h5py.File(ARCHIVO_LOCAL, "r") as f:
-        strain = f["strain"]["Strain"][:]
-        dt = f["strain"]["Strain"].attrs.get("Xspacing", 1.0 / FS_ORIGINAL)
-    fs = 1.0 / dt
     centro = int(centro_offset_s * FS_ORIGINAL)
     mitad = int((duracion_analisis_s / 2) * FS_ORIGINAL)
-    segmento = strain[centro - mitad: centro + mitad]
-
-    nperseg = int(fs * 4)
-    freqs, psd = welch(segmento, fs=fs, nperseg=nperseg, window="hann")
-    interp_psd = interp1d(freqs, psd, bounds_error=False, fill_value="extrapolate")
-
-    n = len(segmento)
-    ventana = tukey(n, alpha=0.2)
-    hf = np.fft.rfft(segmento * ventana)
-    freqs_full = np.fft.rfftfreq(n, dt)
-    norm = 1.0 / np.sqrt(1.0 / (dt * 2))
-    hf_blanco = hf / np.sqrt(interp_psd(freqs_full)) * norm
-    blanco = np.fft.irfft(hf_blanco, n=n)
-
-    nyq = fs / 2
-    b, a = butter(4, [35 / nyq, 350 / nyq], btype="band")
-    filtrado = filtfilt(b, a, blanco)
+    # lectura parcial del archivo de 4096 s: solo el tramo de análisis
+    segmento, fs, _ = leer_muestras(ARCHIVO_LOCAL, centro - mitad, centro + mitad)
+    filtrado = blanquear(segmento, fs)
 
     centro_v = len(filtrado) // 2
     mitad_v = int((duracion_final_s / 2) * fs)
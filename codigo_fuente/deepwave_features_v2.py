@@ -55,6 +55,53 @@ def extraer_features_v2(espectrograma):
         pico_max, varianza_total, entropia_espectral, float(num_picos)
     ])
 
+def pendiente_lote(curvas):
+    """Pendiente de mínimos cuadrados de cada fila de `curvas` (N, T)
+    frente a 0..T-1: la forma cerrada de np.polyfit(x, y, 1)[0], con el
+    eje de tiempo centrado (coincide con polyfit a ~1e-14 relativo)."""
+    curvas = np.asarray(curvas)
+    t = np.arange(curvas.shape[1]) - (curvas.shape[1] - 1) / 2
+    return (curvas - curvas.mean(axis=1, keepdims=True)) @ t / np.dot(t, t)
+
+def contar_picos_lote(curvas):
+    """num_picos de extraer_features_v2 para cada fila de `curvas` (N, T)."""
+    signos = np.sign(np.diff(curvas, axis=1))
+    return np.sum(np.diff(signos, axis=1) < 0, axis=1)
+
+def energias_por_banda_lote(espectrogramas):
+    """(energia_baja, energia_media, energia_alta), cada una de forma (N,),
+    para un tensor (N, n_freq, n_tiempo)."""
+    n, n_freq = espectrogramas.shape[:2]
+    corte_baja = min(10, n_freq)
+    corte_media = min(30, n_freq)
+    energia_baja = espectrogramas[:, :corte_baja, :].mean(axis=(1, 2))
+    energia_media = (espectrogramas[:, corte_baja:corte_media, :].mean(axis=(1, 2))
+                     if corte_media > corte_baja else np.zeros(n))
+    energia_alta = espectrogramas[:, corte_media:, :].mean(axis=(1, 2)) if n_freq > corte_media else np.zeros(n)
+    return energia_baja, energia_media, energia_alta
+
+def extraer_features_v2_lote(espectrogramas):
+    """Versión por lotes de extraer_features_v2: tensor (N, n_freq,
+    n_tiempo) -> matriz (N, 8), con unas pocas reducciones de NumPy en
+    vez de un bucle por espectrograma. Mismos valores que la versión
+    escalar (idénticos bit a bit salvo la pendiente, ver pendiente_lote)."""
+    espectrogramas = np.asarray(espectrogramas)
+    n = espectrogramas.shape[0]
+    planos = espectrogramas.reshape(n, -1)
+
+    energia_baja, energia_media, energia_alta = energias_por_banda_lote(espectrogramas)
+    energia_por_tiempo = espectrogramas.mean(axis=1)
+
+    energia_positiva = planos - planos.min(axis=1, keepdims=True) + 1e-10
+    p = energia_positiva / energia_positiva.sum(axis=1, keepdims=True)
+    entropia_espectral = -np.sum(p * np.log(p + 1e-10), axis=1)
+
+    return np.column_stack([
+        energia_baja, energia_media, energia_alta, pendiente_lote(energia_por_tiempo),
+        planos.max(axis=1), planos.var(axis=1), entropia_espectral,
+        contar_picos_lote(energia_por_tiempo).astype(float)
+    ])
+
 if __name__ == "__main__":
     # Verificación rápida con una señal sintética
     import os, sys
@@ -4,6 +4,7 @@ en analisis_importancia_features.py, descartando las 4 que eran ruido
 (entropía espectral, varianza, pendiente, num_picos).
 """
 import numpy as np
+from codigo_fuente.deepwave_features_v2 import energias_por_banda_lote
 
 def extraer_features_v3(espectrograma):
     n_freq = espectrograma.shape[0]
@@ -16,3 +17,9 @@ def extraer_features_v3(espectrograma):
     pico_max = np.max(espectrograma)
 
     return np.array([energia_baja, energia_media, energia_alta, pico_max])
+
+def extraer_features_v3_lote(espectrogramas):
+    """Versión por lotes: tensor (N, n_freq, n_tiempo) -> matriz (N, 4)."""
+    espectrogramas = np.asarray(espectrogramas)
+    pico_max = espectrogramas.reshape(espectrogramas.shape[0], -1).max(axis=1)
+    return np.column_stack([*energias_por_banda_lote(espectrogramas), pico_max])
@@ -8,6 +8,8 @@ import numpy as np
 from codigo_fuente.deepwave_preprocessing import (
     generar_senal_bbh, generar_senal_glitch, calcular_espectrograma_stub
 )
+from codigo_fuente.deepwave_features_v2 import pendiente_lote
+from codigo_fuente.knn_lote import KNNMinMax
 
 def extraer_features(espectrograma):
     energia_baja = np.mean(espectrograma[:10, :])
@@ -16,13 +18,98 @@ def extraer_features(espectrograma):
     pico_max = np.max(espectrograma)
     return np.array([energia_baja, pendiente, pico_max])
 
-class DeepWaveKNNReal:
+def extraer_features_lote(espectrogramas):
+    """Versión por lotes de extraer_features: tensor (N, n_freq, n_tiempo)
+    -> matriz (N, 3). La pendiente usa la forma cerrada de mínimos
+    cuadrados en vez de un np.polyfit por muestra."""
+    espectrogramas = np.asarray(espectrogramas)
+    energia_baja = espectrogramas[:, :10, :].mean(axis=(1, 2))
+    pendiente = pendiente_lote(espectrogramas.mean(axis=1))
+    pico_max = espectrogramas.reshape(espectrogramas.shape[0], -1).max(axis=1)
+    return np.column_stack([energia_baja, pendiente, pico_max])
+
+BANDA_BAJA = 10  # filas de frecuencia de energia_baja
+TRAMAS_POR_BLOQUE = 2048  # tramas STFT transformadas a la vez en la vía fusionada
+
+def _reducir_tramas(tramas, buffer):
+    """rfft + dB de un bloque de tramas (..., puntos_ventana), reducido en
+    el momento a (suma dB de la banda baja, media dB, máximo dB) por
+    trama. `buffer` (..., n_freq) se reutiliza entre bloques."""
+    np.abs(np.fft.rfft(tramas, axis=-1), out=buffer)
+    # mismo orden de operaciones que calcular_espectrograma_stub: **2, +1e-10, log10, *10
+    np.square(buffer, out=buffer)
+    np.add(buffer, 1e-10, out=buffer)
+    np.log10(buffer, out=buffer)
+    np.multiply(buffer, 10, out=buffer)
+    return buffer[..., :BANDA_BAJA].sum(axis=-1), buffer.mean(axis=-1), buffer.max(axis=-1)
+
+def _geometria_stft(tasa_muestreo, ventana_s, solapamiento_s):
+    puntos_ventana = int(tasa_muestreo * ventana_s)
+    paso = puntos_ventana - int(tasa_muestreo * solapamiento_s)
+    return puntos_ventana, paso, puntos_ventana // 2 + 1
+
+def extraer_features_fusionadas(senales, tasa_muestreo, ventana_s=0.1, solapamiento_s=0.05):
+    """extraer_features_lote(calcular_espectrogramas_lote(senales, ...))
+    sin materializar el tensor de espectrogramas: cada bloque de tramas
+    se transforma, se pasa a dB y se reduce en el acto, y solo quedan
+    acumuladores O(N * n_tiempo). Coincide con la vía en dos pasos a
+    ~1e-13 relativo (cambia el orden de las sumas; pico_max es exacto)."""
+    senales = np.atleast_2d(np.asarray(senales, dtype=np.float64))
+    puntos_ventana, paso, n_freq = _geometria_stft(tasa_muestreo, ventana_s, solapamiento_s)
+    n_tiempo = int((senales.shape[1] - puntos_ventana) / paso) + 1
+    ventanas = np.lib.stride_tricks.sliding_window_view(senales, puntos_ventana, axis=1)[:, ::paso][:, :n_tiempo]
+
+    suma_baja = np.empty((len(senales), n_tiempo))
+    media = np.empty((len(senales), n_tiempo))
+    maximo = np.empty((len(senales), n_tiempo))
+    filas_por_bloque = max(1, TRAMAS_POR_BLOQUE // n_tiempo)
+    buffer = np.empty((filas_por_bloque, n_tiempo, n_freq))
+    for i in range(0, len(senales), filas_por_bloque):
+        bloque = ventanas[i:i + filas_por_bloque]
+        suma_baja[i:i + len(bloque)], media[i:i + len(bloque)], maximo[i:i + len(bloque)] = \
+            _reducir_tramas(bloque, buffer[:len(bloque)])
+
+    energia_baja = suma_baja.sum(axis=1) / (min(BANDA_BAJA, n_freq) * n_tiempo)
+    return np.column_stack([energia_baja, pendiente_lote(media), maximo.max(axis=1)])
+
+def escanear_features(strain, tasa_muestreo, duracion_ventana_s=1.0, paso_tramas=1,
+                      ventana_s=0.1, solapamiento_s=0.05):
+    """Features v1 de cada ventana deslizante de `duracion_ventana_s` sobre
+    un strain largo, avanzando `paso_tramas` tramas STFT (paso_tramas * 50 ms
+    con los parámetros por defecto). Las ventanas consecutivas comparten
+    casi todas sus tramas, así que cada trama se transforma y se reduce
+    UNA vez para todo el strain, en vez de una vez por ventana que la
+    contiene. Devuelve (inicios_muestra, X) con X de forma (n_ventanas, 3);
+    la fila j coincide con extraer_features() del espectrograma de
+    strain[inicios_muestra[j]:inicios_muestra[j] + duracion_ventana_s * fs]."""
+    strain = np.asarray(strain, dtype=np.float64)
+    puntos_ventana, paso, n_freq = _geometria_stft(tasa_muestreo, ventana_s, solapamiento_s)
+    muestras_ventana = int(tasa_muestreo * duracion_ventana_s)
+    n_tiempo = int((muestras_ventana - puntos_ventana) / paso) + 1
+    n_tramas = (len(strain) - puntos_ventana) // paso + 1 if len(strain) >= puntos_ventana else 0
+    # solo ventanas completas: la última puede no usar todas sus muestras
+    # en tramas, pero sí deben existir en el strain
+    n_ventanas = (len(strain) - muestras_ventana) // (paso_tramas * paso) + 1 if len(strain) >= muestras_ventana else 0
+    if n_ventanas <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+    tramas = np.lib.stride_tricks.sliding_window_view(strain, puntos_ventana)[::paso][:n_tramas]
+
+    suma_baja, media, maximo = np.empty(n_tramas), np.empty(n_tramas), np.empty(n_tramas)
+    buffer = np.empty((TRAMAS_POR_BLOQUE, n_freq))
+    for i in range(0, n_tramas, TRAMAS_POR_BLOQUE):
+        bloque = tramas[i:i + TRAMAS_POR_BLOQUE]
+        suma_baja[i:i + len(bloque)], media[i:i + len(bloque)], maximo[i:i + len(bloque)] = \
+            _reducir_tramas(bloque, buffer[:len(bloque)])
+
+    def por_ventana(por_trama):  # (n_ventanas, n_tiempo) como vista
+        return np.lib.stride_tricks.sliding_window_view(por_trama, n_tiempo)[::paso_tramas][:n_ventanas]
+    energia_baja = por_ventana(suma_baja).sum(axis=1) / (min(BANDA_BAJA, n_freq) * n_tiempo)
+    X = np.column_stack([energia_baja, pendiente_lote(por_ventana(media)), por_ventana(maximo).max(axis=1)])
+    return np.arange(n_ventanas, dtype=np.int64) * paso_tramas * paso, X
+
+class DeepWaveKNNReal(KNNMinMax):
     def __init__(self, k=5):
-        self.k = k
-        self.X_train = None
-        self.y_train = None
-        self.X_min = None
-        self.X_max = None
+        super().__init__(k)
 
     def entrenar(self, n_samples=200):
         X, y = [], []
@@ -35,23 +122,16 @@ class DeepWaveKNNReal:
             spec = calcular_espectrograma_stub(señal, fs)
             X.append(extraer_features(spec))
             y.append(0)
-        self.X_train = np.array(X)
-        self.y_train = np.array(y)
-        self.X_min = self.X_train.min(axis=0)
-        self.X_max = self.X_train.max(axis=0)
-
-    def _normalizar(self, X):
-        return (X - self.X_min) / (self.X_max - self.X_min + 1e-10)
+        self.ajustar(np.array(X), np.array(y))
 
-    def predecir(self, features):
-        X_norm = self._normalizar(self.X_train)
-        f_norm = self._normalizar(features)
-        distancias = np.sum((X_norm - f_norm) ** 2, axis=1)
-        k_cercanos = np.argsort(distancias)[:self.k]
-        conteo = np.bincount(self.y_train[k_cercanos])
-        prediccion = np.argmax(conteo)
-        confianza = conteo[prediccion] / self.k
-        return prediccion, confianza
+    def escanear(self, strain, tasa_muestreo, paso_tramas=1):
+        """Clasifica cada ventana de 1 s de un strain largo (ver
+        escanear_features): (inicios_muestra, predicciones, confianzas)."""
+        inicios, X = escanear_features(strain, tasa_muestreo, paso_tramas=paso_tramas)
+        if len(X) == 0:
+            return inicios, np.zeros(0, dtype=np.int64), np.zeros(0)
+        predicciones, confianzas, _ = self.predecir_lote(X)
+        return inicios, predicciones, confianzas
 
 if __name__ == "__main__":
     print("🧠 DEEPWAVE K-NN NATIVO: Entrenamiento (sintético) + Clasificación (REAL)")
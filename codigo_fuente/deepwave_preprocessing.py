@@ -35,6 +35,87 @@ def calcular_espectrograma_stub(senal, tasa_muestreo, ventana_s=0.1, solapamient
     espectrograma_log = 10 * np.log10(espectrograma_matriz + 1e-10)
     return espectrograma_log
 
+def calcular_espectrogramas_lote(senales, tasa_muestreo, ventana_s=0.1, solapamiento_s=0.05,
+                                 dtype=np.float64, out=None):
+    """Versión por lotes de calcular_espectrograma_stub(): recibe una
+    matriz (N, n_muestras) y devuelve un tensor (N, n_freq, n_tiempo),
+    (N, 103, 19) para ventanas de 1 s a 2048 Hz.
+
+    Todas las ventanas de todas las señales se obtienen con una sola
+    vista con strides (sin copiar datos) y se transforman con UNA
+    llamada a rfft, en vez del bucle Python por ventana y por señal.
+    En float64 el resultado es idéntico bit a bit al de la versión
+    individual. dtype=np.float32 reduce a la mitad la memoria del
+    tensor de salida; `out` permite escribir en un buffer ya reservado
+    (p.ej. un .npy memory-mapped) de forma (N, n_freq, n_tiempo).
+    """
+    senales = np.atleast_2d(np.asarray(senales, dtype=np.float64))
+    puntos_ventana = int(tasa_muestreo * ventana_s)
+    puntos_solapamiento = int(tasa_muestreo * solapamiento_s)
+    paso = puntos_ventana - puntos_solapamiento
+    n_ventanas = int((senales.shape[1] - puntos_ventana) / paso) + 1
+    n_freq = puntos_ventana // 2 + 1
+
+    forma = (senales.shape[0], n_freq, n_ventanas)
+    if out is None:
+        out = np.empty(forma, dtype=dtype)
+    elif out.shape != forma:
+        raise ValueError(f"out tiene forma {out.shape}, se esperaba {forma}")
+
+    # (N, n_ventanas, puntos_ventana) como vista, sin copiar la señal
+    ventanas = np.lib.stride_tricks.sliding_window_view(senales, puntos_ventana, axis=1)
+    ventanas = ventanas[:, ::paso][:, :n_ventanas]
+    energia = np.abs(np.fft.rfft(ventanas, axis=-1)) ** 2
+    # mismo orden de operaciones que la versión individual: +1e-10, log10, *10
+    np.add(energia.transpose(0, 2, 1), 1e-10, out=out)
+    np.log10(out, out=out)
+    np.multiply(out, 10, out=out)
+    return out
+
+class EspectrogramaStreaming:
+    """STFT incremental para strain continuo (p.ej. archivos GWOSC de
+    4096 s leídos por trozos): recibe trozos de cualquier tamaño con
+    agregar() y devuelve las columnas del espectrograma en cuanto están
+    completas. Entre trozos solo se conserva la cola de solapamiento
+    (menos de una ventana), así que la memoria no crece con la duración.
+
+    np.hstack de todas las columnas emitidas es idéntico a
+    calcular_espectrograma_stub() sobre la serie completa.
+    """
+
+    def __init__(self, tasa_muestreo, ventana_s=0.1, solapamiento_s=0.05):
+        self.puntos_ventana = int(tasa_muestreo * ventana_s)
+        self.paso = self.puntos_ventana - int(tasa_muestreo * solapamiento_s)
+        self.n_freq = self.puntos_ventana // 2 + 1
+        self._cola = np.zeros(0)
+        self._descartar = 0  # solo > 0 si paso > ventana (sin solapamiento)
+        self.columnas_emitidas = 0
+
+    def agregar(self, trozo):
+        """Devuelve una matriz (n_freq, n_columnas_nuevas) en dB; puede
+        tener 0 columnas si el trozo no completa ninguna ventana."""
+        trozo = np.asarray(trozo, dtype=np.float64)
+        if self._descartar:
+            saltadas = min(self._descartar, len(trozo))
+            trozo = trozo[saltadas:]
+            self._descartar -= saltadas
+        datos = np.concatenate([self._cola, trozo])
+        n_ventanas = (len(datos) - self.puntos_ventana) // self.paso + 1 if len(datos) >= self.puntos_ventana else 0
+        if n_ventanas == 0:
+            self._cola = datos
+            return np.zeros((self.n_freq, 0))
+
+        ventanas = np.lib.stride_tricks.sliding_window_view(datos, self.puntos_ventana)[::self.paso][:n_ventanas]
+        energia = np.abs(np.fft.rfft(ventanas, axis=-1)) ** 2
+        columnas = 10 * np.log10(energia.T + 1e-10)
+
+        siguiente = n_ventanas * self.paso
+        self._cola = datos[siguiente:].copy()
+        self._descartar = max(0, siguiente - len(datos))
+        self.columnas_emitidas += n_ventanas
+        return columnas
+
+
 if __name__ == "__main__":
     print("🧠 DEEPWAVE: Verificación del Módulo de Pre-Procesamiento")
     print("=====================================================")
@@ -4,10 +4,14 @@ por GWOSC/LOSC para datos públicos: PSD por Welch + normalización
 espectral + filtro pasa-banda Butterworth.
 """
 import numpy as np
-import h5py
-from scipy.signal import welch, butter, filtfilt
+import os
+import sys
+from functools import lru_cache
+from scipy.signal import welch, butter, sosfiltfilt
 from scipy.signal.windows import tukey
-from scipy.interpolate import interp1d
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from lector_strain import leer_muestras
 
 ARCHIVO_LOCAL = "data/GW150914_H1_4096s.hdf5"
 GPS_EVENTO = 1126259462.4
@@ -16,36 +20,80 @@ FS_ORIGINAL = 4096
 FS_OBJETIVO = 2048
 DURACION_ANALISIS_S = 32
 DURACION_EXTRACCION_S = 1
+VENTANA_WELCH_S = 4
+ALPHA_TUKEY = 0.2
+F_BAJO_HZ, F_ALTO_HZ, ORDEN_BUTTERWORTH = 35, 350, 4
+# todo lo que (además del strain) determina la salida de blanquear(): las
+# cachés de strain blanqueado lo guardan para invalidarse si cambia
+PARAMETROS_BLANQUEO = {"ventana_welch_s": VENTANA_WELCH_S, "alpha_tukey": ALPHA_TUKEY, "f_bajo_hz": F_BAJO_HZ,
+                       "f_alto_hz": F_ALTO_HZ, "orden_butterworth": ORDEN_BUTTERWORTH}
+
+# Este módulo es el ÚNICO camino de whitening del proyecto (dataset
+# builders, control negativo, este script). Ventana Tukey, rejilla de
+# interpolación de la PSD y coeficientes del Butterworth solo dependen
+# de (n, fs, banda): se calculan una vez y se reutilizan entre eventos.
+
+@lru_cache(maxsize=16)
+def _ventana_tukey(n, alpha=ALPHA_TUKEY):
+    ventana = tukey(n, alpha=alpha)
+    ventana.flags.writeable = False
+    return ventana
+
+@lru_cache(maxsize=16)
+def _interpolacion_psd(n, fs, nperseg):
+    """Índice y peso para interpolar linealmente (con extrapolación en
+    los bordes, como interp1d(fill_value="extrapolate")) la PSD de Welch,
+    definida en rfftfreq(nperseg), sobre la rejilla rfftfreq(n)."""
+    posicion = np.fft.rfftfreq(n, 1 / fs) * nperseg / fs
+    indice = np.clip(np.floor(posicion).astype(np.intp), 0, nperseg // 2 - 1)
+    peso = posicion - indice
+    indice.flags.writeable = False
+    peso.flags.writeable = False
+    return indice, peso
+
+@lru_cache(maxsize=16)
+def _sos_bandpass(fs, f_bajo, f_alto, orden):
+    nyq = fs / 2
+    return butter(orden, [f_bajo / nyq, f_alto / nyq], btype="band", output="sos")
 
 def cargar_segmento_amplio(duracion_s=DURACION_ANALISIS_S):
-    with h5py.File(ARCHIVO_LOCAL, "r") as f:
-        strain = f["strain"]["Strain"][:]
-        dt = f["strain"]["Strain"].attrs.get("Xspacing", 1.0 / FS_ORIGINAL)
     offset_s = GPS_EVENTO - GPS_INICIO_ARCHIVO
     centro = int(offset_s * FS_ORIGINAL)
     mitad = int((duracion_s / 2) * FS_ORIGINAL)
-    segmento = strain[centro - mitad: centro + mitad]
-    return segmento, dt
+    # lectura parcial: solo los duracion_s segundos, no los 4096 s del archivo
+    segmento, fs, _ = leer_muestras(ARCHIVO_LOCAL, centro - mitad, centro + mitad)
+    return segmento, 1.0 / fs
 
-def estimar_psd_welch(segmento, fs):
-    nperseg = int(fs * 4)
-    freqs, psd = welch(segmento, fs=fs, nperseg=nperseg, window="hann")
-    return interp1d(freqs, psd, bounds_error=False, fill_value="extrapolate")
+def estimar_psd_welch(segmentos, fs):
+    """PSD de Welch (ventanas de 4 s, o el segmento entero si es más
+    corto) evaluada en la rejilla rfftfreq del propio segmento.
+    Acepta un segmento (n,) o un lote (M, n)."""
+    n = segmentos.shape[-1]
+    nperseg = min(int(fs * VENTANA_WELCH_S), n)
+    _, psd = welch(segmentos, fs=fs, nperseg=nperseg, window="hann", axis=-1)
+    indice, peso = _interpolacion_psd(n, float(fs), nperseg)
+    return psd[..., indice] * (1 - peso) + psd[..., indice + 1] * peso
 
-def whiten(segmento, interp_psd, dt):
-    n = len(segmento)
-    ventana = tukey(n, alpha=0.2)
-    segmento_ventaneado = segmento * ventana
-    freqs = np.fft.rfftfreq(n, dt)
-    hf = np.fft.rfft(segmento_ventaneado)
-    norm = 1.0 / np.sqrt(1.0 / (dt * 2))
-    hf_blanco = hf / np.sqrt(interp_psd(freqs)) * norm
-    return np.fft.irfft(hf_blanco, n=n)
+def whiten(segmentos, fs, psd=None):
+    """Normalización espectral por la PSD (estimada de los propios
+    segmentos si no se pasa). Acepta (n,) o (M, n)."""
+    n = segmentos.shape[-1]
+    if psd is None:
+        psd = estimar_psd_welch(segmentos, fs)
+    hf = np.fft.rfft(segmentos * _ventana_tukey(n), axis=-1)
+    norm = 1.0 / np.sqrt(fs / 2)
+    hf_blanco = hf / np.sqrt(psd) * norm
+    return np.fft.irfft(hf_blanco, n=n, axis=-1)
 
-def filtro_bandpass(segmento, fs, f_bajo=35, f_alto=350, orden=4):
-    nyq = fs / 2
-    b, a = butter(orden, [f_bajo / nyq, f_alto / nyq], btype="band")
-    return filtfilt(b, a, segmento)
+def filtro_bandpass(segmentos, fs, f_bajo=F_BAJO_HZ, f_alto=F_ALTO_HZ, orden=ORDEN_BUTTERWORTH):
+    return sosfiltfilt(_sos_bandpass(float(fs), f_bajo, f_alto, orden), segmentos, axis=-1)
+
+def blanquear(segmentos, fs, f_bajo=F_BAJO_HZ, f_alto=F_ALTO_HZ, orden=ORDEN_BUTTERWORTH):
+    """Whitening completo (PSD Welch + normalización espectral +
+    pasa-banda Butterworth en secciones de segundo orden) de un
+    segmento (n,) o de un lote de segmentos de igual longitud (M, n)."""
+    segmentos = np.asarray(segmentos, dtype=np.float64)
+    return filtro_bandpass(whiten(segmentos, fs), fs, f_bajo, f_alto, orden)
 
 def extraer_ventana_final(segmento_procesado, fs, duracion_s=DURACION_EXTRACCION_S):
     centro = len(segmento_procesado) // 2
@@ -64,9 +112,9 @@ if __name__ == "__main__":
     print(f"📡 Segmento cargado: {len(segmento_crudo)} muestras, fs={fs:.1f} Hz")
     print(f"   Amplitud cruda -> min={segmento_crudo.min():.3e}, max={segmento_crudo.max():.3e}")
     print("\n⚙️  Estimando PSD real por método de Welch (nperseg=4s)...")
-    interp_psd = estimar_psd_welch(segmento_crudo, fs)
+    psd = estimar_psd_welch(segmento_crudo, fs)
     print("⚙️  Aplicando whitening espectral...")
-    segmento_blanco = whiten(segmento_crudo, interp_psd, dt)
+    segmento_blanco = whiten(segmento_crudo, fs, psd)
     print("⚙️  Aplicando filtro pasa-banda 35-350 Hz...")
     segmento_filtrado = filtro_bandpass(segmento_blanco, fs)
     print("⚙️  Extrayendo ventana de 1s centrada en el evento...")
@@ -7,9 +7,8 @@ import numpy as np
 import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from deepwave_preprocessing import calcular_espectrograma_stub
-from deepwave_knn_real import extraer_features
-from experimentar_knn_real import cargar_features_reales, knn_predecir
+from experimentar_knn_real import cargar_features_reales
+from loo_knn import vecinos_loo, votos_por_k
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 
@@ -24,17 +23,20 @@ if __name__ == "__main__":
     print(f"{'Evento':<12} {'K=1':>6} {'K=3':>6} {'K=5':>6}  Features (energía_baja, pendiente, pico)")
     print("-" * 65)
 
-    for i, evento in enumerate(EVENTOS):
-        X_train_base = np.vstack([np.delete(X_pos, i, axis=0), X_neg])
-        y_train_base = np.array([1]*(len(X_pos)-1) + [0]*len(X_neg))
-        features_test = X_pos[i]
+    # Evento i fuera del entrenamiento (con todos los negativos dentro) es
+    # el fold i del leave-one-out: un ranking de vecinos sirve para K=1, 3 y 5
+    X_todo = np.vstack([X_pos, X_neg])
+    y_todo = np.array([1]*len(X_pos) + [0]*len(X_neg))
+    vecinos, _ = vecinos_loo(X_todo, 5)
+    votos = votos_por_k(y_todo, vecinos[:len(EVENTOS)], [1, 3, 5])
 
+    for i, evento in enumerate(EVENTOS):
         resultados = []
         for k in [1, 3, 5]:
-            pred, _ = knn_predecir(X_train_base, y_train_base, features_test, k)
-            resultados.append("✅BBH" if pred == 1 else "❌ruido")
+            votos_bbh, n_vecinos = votos[k][0][i], votos[k][1]
+            resultados.append("✅BBH" if votos_bbh > n_vecinos - votos_bbh else "❌ruido")
 
-        print(f"{evento:<12} {resultados[0]:>6} {resultados[1]:>6} {resultados[2]:>6}  {features_test}")
+        print(f"{evento:<12} {resultados[0]:>6} {resultados[1]:>6} {resultados[2]:>6}  {X_pos[i]}")
 
     print("\n📋 Eventos consistentemente mal clasificados (❌ en las 3 columnas)")
     print("   son candidatos a tener SNR real bajo, no un bug del pipeline.")
@@ -0,0 +1,52 @@
+"""
+Distancias del K-NN min-max descompuestas por feature.
+
+La distancia euclídea al cuadrado entre dos filas normalizadas es una
+suma de términos independientes por feature:
+
+    d(a, b) = sum_j (x_norm[a, j] - x_norm[b, j])²
+
+Con la normalización global cada término se calcula UNA vez para todo
+el dataset (tensor (n_features, N, N)) y cualquier subconjunto de
+features se reduce a sumar sus términos:
+- en el mismo orden que loo_knn (knn_lote.sumar_terminos), así que las
+  distancias son las mismas bit a bit y los empates exactos se
+  desempatan igual (por índice);
+- los pocos folds "extremos" (ver loo_knn) se calculan con su propia
+  normalización, como en loo_knn.vecinos_fold.
+
+Memoria: n_features * N² * 8 bytes (p.ej. 9 features y 741 filas: 40 MB).
+"""
+import numpy as np
+from codigo_fuente.knn_lote import normalizar_minmax, k_menores, sumar_terminos
+from codigo_fuente.loo_knn import folds_extremos, vecinos_fold
+
+
+def diferencias_cuadradas(X):
+    """Tensor (n_features, N, N) con (x_norm[a, j] - x_norm[b, j])², con
+    la normalización min-max de todo X."""
+    X = np.asarray(X, dtype=np.float64)
+    X_norm = normalizar_minmax(X, X.min(axis=0), X.max(axis=0))
+    return (X_norm.T[:, np.newaxis, :] - X_norm.T[:, :, np.newaxis]) ** 2
+
+
+def distancias_columnas(diferencias, columnas):
+    """Matriz (N, N) de distancias al cuadrado del subconjunto `columnas`
+    (con la normalización global)."""
+    return sumar_terminos([diferencias[j] for j in columnas])
+
+
+def vecinos_loo_columnas(diferencias, X, k, columnas=None):
+    """Vecinos leave-one-out del K-NN min-max restringido a `columnas`:
+    lo mismo que loo_knn.vecinos_loo(X[:, columnas], k)[0]."""
+    X = np.asarray(X, dtype=np.float64)
+    columnas = np.arange(X.shape[1]) if columnas is None else np.asarray(columnas)
+    X_sub = X[:, columnas]
+    k = min(k, len(X_sub) - 1)
+
+    distancias = distancias_columnas(diferencias, columnas)
+    np.fill_diagonal(distancias, np.inf)  # la muestra no es vecina de sí misma
+    vecinos, _ = k_menores(distancias, k)
+    for i in folds_extremos(X_sub):
+        vecinos[i] = vecinos_fold(X_sub, i, k)[0]
+    return vecinos
@@ -6,59 +6,32 @@ import numpy as np
 import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from deepwave_preprocessing import calcular_espectrograma_stub
-from deepwave_knn_real import extraer_features
+from deepwave_preprocessing import calcular_espectrogramas_lote
+from deepwave_knn_real import extraer_features_lote
+from almacen_dataset import cargar_dataset_real
+from knn_lote import KNNMinMax
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 FS_REAL = 2048
 
-class DeepWaveKNNTotalmenteReal:
+class DeepWaveKNNTotalmenteReal(KNNMinMax):
     def __init__(self, k=3):
-        self.k = k
-        self.X_train = None
-        self.y_train = None
-        self.X_min = None
-        self.X_max = None
+        super().__init__(k)
 
     def entrenar_con_datos_reales(self):
-        positivos = np.load(os.path.join(DATA_DIR, "dataset_real_positivos.npy"))
-        negativos = np.load(os.path.join(DATA_DIR, "dataset_real_negativos.npy"))
+        positivos, negativos = cargar_dataset_real(DATA_DIR)
 
-        X, y = [], []
-        for señal in positivos:
-            spec = calcular_espectrograma_stub(señal, FS_REAL)
-            X.append(extraer_features(spec))
-            y.append(1)
-        for señal in negativos:
-            spec = calcular_espectrograma_stub(señal, FS_REAL)
-            X.append(extraer_features(spec))
-            y.append(0)
+        specs = calcular_espectrogramas_lote(np.vstack([positivos, negativos]), FS_REAL)
+        y = [1] * len(positivos) + [0] * len(negativos)
 
-        self.X_train = np.array(X)
-        self.y_train = np.array(y)
-        self.X_min = self.X_train.min(axis=0)
-        self.X_max = self.X_train.max(axis=0)
+        self.ajustar(extraer_features_lote(specs), np.array(y))
         print(f"✅ Entrenado con {len(y)} muestras 100% reales ({sum(y)} positivos, {len(y)-sum(y)} negativos)")
 
-    def _normalizar(self, X):
-        return (X - self.X_min) / (self.X_max - self.X_min + 1e-10)
-
-    def predecir(self, features):
-        X_norm = self._normalizar(self.X_train)
-        f_norm = self._normalizar(features)
-        distancias = np.sum((X_norm - f_norm) ** 2, axis=1)
-        k_cercanos = np.argsort(distancias)[:self.k]
-        conteo = np.bincount(self.y_train[k_cercanos], minlength=2)
-        prediccion = np.argmax(conteo)
-        confianza = conteo[prediccion] / self.k
-        return prediccion, confianza
-
 def validacion_leave_one_out(clasificador_cls, k=3):
     """Validación honesta: para cada evento, entrena con TODOS los demás
     y prueba contra el que se dejó fuera. Esto evita el sesgo de
     'probar contra datos que ya viste en entrenamiento'."""
-    positivos = np.load(os.path.join(DATA_DIR, "dataset_real_positivos.npy"))
-    negativos = np.load(os.path.join(DATA_DIR, "dataset_real_negativos.npy"))
+    positivos, negativos = cargar_dataset_real(DATA_DIR)
 
     aciertos, total = 0, 0
     print("\n🔬 VALIDACIÓN LEAVE-ONE-OUT (cada evento probado sin haberlo visto)")
@@ -66,25 +39,15 @@ def validacion_leave_one_out(clasificador_cls, k=3):
 
     todas_señales = list(positivos) + list(negativos)
     todas_etiquetas = [1]*len(positivos) + [0]*len(negativos)
+    # Espectrogramas y features no dependen del fold: se calculan una vez, en lote
+    X_todo = extraer_features_lote(calcular_espectrogramas_lote(np.vstack([positivos, negativos]), FS_REAL))
+    y_todo = np.array(todas_etiquetas)
 
     for i in range(len(todas_señales)):
-        X_train, y_train = [], []
-        for j in range(len(todas_señales)):
-            if j == i:
-                continue
-            spec = calcular_espectrograma_stub(todas_señales[j], FS_REAL)
-            X_train.append(extraer_features(spec))
-            y_train.append(todas_etiquetas[j])
-
         clf = clasificador_cls(k=k)
-        clf.X_train = np.array(X_train)
-        clf.y_train = np.array(y_train)
-        clf.X_min = clf.X_train.min(axis=0)
-        clf.X_max = clf.X_train.max(axis=0)
+        clf.ajustar(np.delete(X_todo, i, axis=0), np.delete(y_todo, i))
 
-        spec_test = calcular_espectrograma_stub(todas_señales[i], FS_REAL)
-        features_test = extraer_features(spec_test)
-        pred, conf = clf.predecir(features_test)
+        pred, conf = clf.predecir(X_todo[i])
 
         correcto = (pred == todas_etiquetas[i])
         aciertos += correcto
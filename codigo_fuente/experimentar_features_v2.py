@@ -11,13 +11,13 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from codigo_fuente.deepwave_preprocessing import calcular_espectrograma_stub
 from codigo_fuente.deepwave_knn_real import extraer_features as extraer_features_v1
 from codigo_fuente.deepwave_features_v2 import extraer_features_v2
+from codigo_fuente.almacen_dataset import cargar_dataset_real
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 FS_REAL = 2048
 
 def cargar_features(funcion_extractora):
-    positivos = np.load(os.path.join(DATA_DIR, "dataset_real_positivos.npy"))
-    negativos = np.load(os.path.join(DATA_DIR, "dataset_real_negativos.npy"))
+    positivos, negativos = cargar_dataset_real(DATA_DIR)
     X_pos = [funcion_extractora(calcular_espectrograma_stub(s, FS_REAL)) for s in positivos]
     X_neg = [funcion_extractora(calcular_espectrograma_stub(s, FS_REAL)) for s in negativos]
     return np.array(X_pos), np.array(X_neg)
@@ -7,20 +7,16 @@ import numpy as np
 import os
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from deepwave_preprocessing import calcular_espectrograma_stub
-from deepwave_knn_real import extraer_features
+from almacen_features import features_dataset
+from loo_knn import evaluar_ks_loo
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
 FS_REAL = 2048
 
 def cargar_features_reales():
-    """Pre-calcula features una sola vez (evita recomputar STFT miles de veces)."""
-    positivos = np.load(os.path.join(DATA_DIR, "dataset_real_positivos.npy"))
-    negativos = np.load(os.path.join(DATA_DIR, "dataset_real_negativos.npy"))
-
-    features_pos = [extraer_features(calcular_espectrograma_stub(s, FS_REAL)) for s in positivos]
-    features_neg = [extraer_features(calcular_espectrograma_stub(s, FS_REAL)) for s in negativos]
-    return np.array(features_pos), np.array(features_neg)
+    """Pre-calcula features una sola vez (evita recomputar STFT miles de
+    veces); el almacén de features las guarda entre ejecuciones."""
+    return features_dataset("v1")
 
 def knn_predecir(X_train, y_train, features_test, k):
     X_min, X_max = X_train.min(axis=0), X_train.max(axis=0)
@@ -33,9 +29,10 @@ def knn_predecir(X_train, y_train, features_test, k):
     confianza = conteo[prediccion] / k
     return prediccion, confianza
 
-def leave_one_out(X_pos, X_neg, k, balancear, semilla=42):
-    """balancear=True usa solo tantos negativos como positivos hay,
-    elegidos aleatoriamente con semilla fija (reproducible)."""
+def leave_one_out_multi_k(X_pos, X_neg, ks, balancear, semilla=42):
+    """leave_one_out para varios K a la vez: un solo ranking de vecinos
+    por muestra (hasta max(ks)) sirve para todos. Devuelve
+    {k: (precision_global, recall_pos, recall_neg, total_pos, total_neg)}."""
     rng = np.random.RandomState(semilla)
 
     if balancear:
@@ -47,23 +44,25 @@ def leave_one_out(X_pos, X_neg, k, balancear, semilla=42):
     X_todo = np.vstack([X_pos, X_neg_usado])
     y_todo = np.array([1]*len(X_pos) + [0]*len(X_neg_usado))
 
-    aciertos_pos, aciertos_neg = 0, 0
-    total_pos, total_neg = len(X_pos), len(X_neg_usado)
+    # mismo resultado que knn_predecir con np.delete por fold, sin re-entrenar N veces
+    resultados = evaluar_ks_loo(X_todo, y_todo, ks)
+    return {k: (r["global"], r["recall_pos"], r["recall_neg"], len(X_pos), len(X_neg_usado))
+            for k, r in resultados.items()}
 
-    for i in range(len(X_todo)):
-        X_train = np.delete(X_todo, i, axis=0)
-        y_train = np.delete(y_todo, i)
-        pred, _ = knn_predecir(X_train, y_train, X_todo[i], k)
-        correcto = (pred == y_todo[i])
-        if y_todo[i] == 1:
-            aciertos_pos += correcto
-        else:
-            aciertos_neg += correcto
+def leave_one_out(X_pos, X_neg, k, balancear, semilla=42):
+    """balancear=True usa solo tantos negativos como positivos hay,
+    elegidos aleatoriamente con semilla fija (reproducible)."""
+    return leave_one_out_multi_k(X_pos, X_neg, [k], balancear, semilla)[k]
 
-    precision_global = (aciertos_pos + aciertos_neg) / len(X_todo)
-    recall_pos = aciertos_pos / total_pos
-    recall_neg = aciertos_neg / total_neg
-    return precision_global, recall_pos, recall_neg, total_pos, total_neg
+def barrido_configuraciones(X_pos, X_neg, configuraciones, semilla=42):
+    """{(k, balancear): resultado de leave_one_out}, con un único LOO
+    multi-K por valor de balancear."""
+    resultados = {}
+    for balancear in dict.fromkeys(bal for _, bal in configuraciones):
+        ks = [k for k, bal in configuraciones if bal == balancear]
+        for k, r in leave_one_out_multi_k(X_pos, X_neg, ks, balancear, semilla).items():
+            resultados[(k, balancear)] = r
+    return resultados
 
 if __name__ == "__main__":
     print("🔬 EXPERIMENTO: K-NN real, distintas configuraciones (leave-one-out)")
@@ -80,10 +79,11 @@ if __name__ == "__main__":
         (5, True,  "K=5, balanceado (1:1)"),
     ]
 
+    resultados = barrido_configuraciones(X_pos, X_neg, [(k, bal) for k, bal, _ in configuraciones])
     print(f"{'Configuración':<45} {'Global':>8} {'Recall+':>9} {'Recall-':>9}")
     print("-" * 75)
     for k, balancear, nombre in configuraciones:
-        precision, recall_pos, recall_neg, n_pos, n_neg = leave_one_out(X_pos, X_neg, k, balancear)
+        precision, recall_pos, recall_neg, n_pos, n_neg = resultados[(k, balancear)]
         print(f"{nombre:<45} {precision:>7.1%} {recall_pos:>8.1%} {recall_neg:>8.1%}")
 
     print("\n📋 Recall+ = % de eventos reales detectados correctamente (lo que más importa)")
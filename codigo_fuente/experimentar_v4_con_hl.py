@@ -4,43 +4,27 @@ Solo sobre los 37 eventos que tienen ambos detectores disponibles
 (excluye los 3 sin H1).
 """
 import numpy as np
-import json, os, sys
+import os, sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from codigo_fuente.deepwave_preprocessing import calcular_espectrograma_stub
-from codigo_fuente.deepwave_knn_real import extraer_features
-from codigo_fuente.experimentar_knn_real import knn_predecir, leave_one_out
+from codigo_fuente.almacen_features import features_dataset
+from codigo_fuente.experimentar_knn_real import barrido_configuraciones
+from codigo_fuente.indice_filas import cargar_indice_filas, extraer_filas, extraer_correlaciones_hl
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
-FS_REAL = 2048
 
 if __name__ == "__main__":
-    with open(os.path.join(DATA_DIR, "eventos_procesados.json")) as f:
-        registro = json.load(f)
-    eventos_todos = registro["eventos_procesados"]
-    eventos_con_hl = [e for e in eventos_todos if e not in
-                      ["GW190620_030421-v2", "GW190630_185205-v2", "GW190708_232457-v2"]]
+    indice = cargar_indice_filas(DATA_DIR)
 
-    positivos = np.load(os.path.join(DATA_DIR, "dataset_real_positivos.npy"))
-    negativos = np.load(os.path.join(DATA_DIR, "dataset_real_negativos.npy"))
-    corr_pos = np.load(os.path.join(DATA_DIR, "correlacion_hl_positivos.npy"))
-    corr_neg = np.load(os.path.join(DATA_DIR, "correlacion_hl_negativos.npy"))
+    # Features v1 (3) del subconjunto de eventos con H1+L1; las
+    # correlaciones quedan alineadas fila a fila con ellas
+    X_pos_v1, X_neg_v1 = extraer_filas(indice, indice["tiene_hl"], *features_dataset("v1"))
+    corr_pos, corr_neg = extraer_correlaciones_hl(indice, indice["tiene_hl"],
+                                                  np.load(os.path.join(DATA_DIR, "correlacion_hl_positivos.npy")),
+                                                  np.load(os.path.join(DATA_DIR, "correlacion_hl_negativos.npy")))
 
-    # Las correlaciones se guardaron en el mismo orden que eventos_con_hl (37 eventos)
-    # positivos/negativos tienen 40/80 — hay que tomar el subconjunto correspondiente
-    indices_con_hl = [i for i, e in enumerate(eventos_todos) if e in eventos_con_hl]
-    positivos_sub = positivos[indices_con_hl]
-    # negativos: 2 por evento, mismo orden
-    indices_neg = []
-    for i in indices_con_hl:
-        indices_neg.extend([2*i, 2*i+1])
-    negativos_sub = negativos[indices_neg]
-
-    print(f"Subconjunto: {len(positivos_sub)} positivos, {len(negativos_sub)} negativos")
+    print(f"Subconjunto: {len(X_pos_v1)} positivos, {len(X_neg_v1)} negativos")
 
     # Features v1 (3) + correlación H1-L1 (1) = 4 features
-    X_pos_v1 = np.array([extraer_features(calcular_espectrograma_stub(s, FS_REAL)) for s in positivos_sub])
-    X_neg_v1 = np.array([extraer_features(calcular_espectrograma_stub(s, FS_REAL)) for s in negativos_sub])
-
     X_pos_v4 = np.hstack([X_pos_v1, corr_pos.reshape(-1, 1)])
     X_neg_v4 = np.hstack([X_neg_v1, corr_neg.reshape(-1, 1)])
 
@@ -50,8 +34,10 @@ if __name__ == "__main__":
     configuraciones = [(1, False), (3, False), (1, True), (3, True), (5, True)]
     print(f"{'Config':<20} {'v1 Global':>10} {'v1 R+':>8}   {'v4 Global':>10} {'v4 R+':>8}")
     print("-" * 65)
+    resultados_v1 = barrido_configuraciones(X_pos_v1, X_neg_v1, configuraciones)
+    resultados_v4 = barrido_configuraciones(X_pos_v4, X_neg_v4, configuraciones)
     for k, bal in configuraciones:
-        g1, r1p, _, _, _ = leave_one_out(X_pos_v1, X_neg_v1, k, bal)
-        g4, r4p, _, _, _ = leave_one_out(X_pos_v4, X_neg_v4, k, bal)
+        g1, r1p, _, _, _ = resultados_v1[(k, bal)]
+        g4, r4p, _, _, _ = resultados_v4[(k, bal)]
         nombre = f"K={k}, {'bal' if bal else 'sin bal'}"
         print(f"{nombre:<20} {g1:>9.1%} {r1p:>7.1%}   {g4:>9.1%} {r4p:>7.1%}")
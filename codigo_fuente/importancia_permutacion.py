@@ -0,0 +1,87 @@
+"""
+Importancia por permutación del K-NN: cuánto cae el AUC leave-one-out
+(score continuo, K=15) al barajar una columna, con muchas permutaciones
+por feature para tener un intervalo y no solo un número.
+
+La correlación punto-biserial de analisis_importancia_features.py mira
+cada feature por separado; la permutación mide lo que el K-NN pierde
+sin ella, interacciones incluidas. Repetir el LOO completo por
+permutación no escala, pero barajar la columna j no cambia su min/max,
+así que sus valores normalizados solo cambian de fila y su término de
+la distancia (distancias_por_feature) es el ya calculado, reindexado:
+
+    d'(a, b) = ... + (x_norm[π(a), j] - x_norm[π(b), j])² + ...
+
+- los términos de todas las features se calculan UNA vez, y por feature
+  se suman una sola vez los de las demás; cada permutación solo añade
+  el término reindexado de j, al final. Es la distancia de loo_knn con
+  la columna j en última posición: los vecinos, empates incluidos, son
+  los de vecinos_loo sobre la matriz barajada con j al final (bit a bit
+  mientras n_features no sea múltiplo de 8: ahí np.sum agrupa los
+  términos por pares y la diferencia es de redondeo);
+- solo los folds extremos de cada permutación (como mucho 2 por
+  feature) se renormalizan, como en loo_knn;
+- las permutaciones se procesan por lotes (P, N, N) y las features se
+  reparten en un pool de procesos, cada una con su stream aleatorio
+  (SeedSequence.spawn): el resultado no depende de `workers`.
+
+    auc_base, caidas = importancia_permutacion(X_todo, y_todo, n_permutaciones=500)
+"""
+import numpy as np
+from codigo_fuente.distancias_por_feature import diferencias_cuadradas, vecinos_loo_columnas
+from codigo_fuente.knn_lote import k_menores, sumar_terminos
+from codigo_fuente.loo_knn import folds_extremos, vecinos_fold
+from codigo_fuente.bootstrap_auc import auc_puntual
+from codigo_fuente.pool_tareas import mapear
+
+K_SCORE = 15
+N_PERMUTACIONES = 200
+SEMILLA = 42
+ELEMENTOS_POR_LOTE = 2 ** 25  # distancias (P, N, N) por lote: ~256 MB en float64
+
+
+def aucs_permutadas(diferencias, X, y, j, permutaciones, k=K_SCORE):
+    """AUC leave-one-out con la columna j barajada según cada fila de
+    `permutaciones` (P, N): X[:, j] pasa a ser X[π, j] (y se suma la
+    última, ver el docstring del módulo)."""
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y)
+    n = len(y)
+    k = min(k, n - 1)
+    orden = [c for c in range(X.shape[1]) if c != j] + [j]
+    resto = sumar_terminos([diferencias[c] for c in orden[:-1]]) if len(orden) > 1 else np.zeros((n, n))
+    por_lote = max(1, ELEMENTOS_POR_LOTE // (n * n))
+    aucs = []
+    for inicio in range(0, len(permutaciones), por_lote):
+        lote = np.asarray(permutaciones[inicio:inicio + por_lote])
+        distancias = resto + diferencias[j][lote[:, :, np.newaxis], lote[:, np.newaxis, :]]
+        distancias[:, np.arange(n), np.arange(n)] = np.inf  # la muestra no es vecina de sí misma
+        vecinos, _ = k_menores(distancias.reshape(-1, n), k)
+        vecinos = vecinos.reshape(len(lote), n, k)
+        for p, permutacion in enumerate(lote):
+            X_barajada = X[:, orden]
+            X_barajada[:, -1] = X[permutacion, j]
+            for i in folds_extremos(X_barajada):
+                vecinos[p, i] = vecinos_fold(X_barajada, i, k)[0]
+            aucs.append(auc_puntual(np.mean(y[vecinos[p]] == 1, axis=1), y))
+    return np.array(aucs)
+
+
+def _aucs_feature(diferencias, X, y, j, n_permutaciones, k, semilla):
+    rng = np.random.default_rng(semilla)
+    permutaciones = np.array([rng.permutation(len(y)) for _ in range(n_permutaciones)])
+    return aucs_permutadas(diferencias, X, y, j, permutaciones, k)
+
+
+def importancia_permutacion(X, y, k=K_SCORE, n_permutaciones=N_PERMUTACIONES, semilla=SEMILLA, workers=1,
+                            diferencias=None):
+    """(auc_base, caidas): AUC leave-one-out sin barajar y matriz
+    (n_features, n_permutaciones) con auc_base - AUC de cada permutación."""
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y)
+    diferencias = diferencias_cuadradas(X) if diferencias is None else diferencias
+    vecinos = vecinos_loo_columnas(diferencias, X, k)
+    auc_base = auc_puntual(np.mean(y[vecinos] == 1, axis=1), y)
+
+    semillas = np.random.SeedSequence(semilla).spawn(X.shape[1])
+    tareas = [(j, n_permutaciones, k, s) for j, s in enumerate(semillas)]
+    aucs = [a for _, a in mapear(_aucs_feature, (diferencias, X, y), tareas, workers)]
+    return auc_base, auc_base - np.array(aucs)
@@ -0,0 +1,155 @@
+"""
+Índice columnar evento -> filas del dataset real (sidecar
+data/dataset_real_indice.npy), para seleccionar subconjuntos con una
+máscara booleana en vez de reconstruirlos en cada script con bucles,
+listas de exclusión copiadas a mano y la suposición `2*i, 2*i+1`.
+
+Cada fila del índice describe una fila de dataset_real_positivos o
+dataset_real_negativos (mismo orden: primero todos los positivos, luego
+todos los negativos), con las columnas:
+
+    evento            nombre GWOSC del evento
+    etiqueta          1 = positivo (ventana del evento), 0 = negativo
+    fila              posición dentro de su array (positivos o negativos)
+    offset_ventana_s  0 para el positivo, -12/+12 para los negativos
+    tiene_hl          el evento tiene correlación H1-L1 calculada
+    fila_hl           posición en correlacion_hl_{positivos,negativos}.npy (-1 si no)
+    snr               SNR de red del índice de metadatos (NaN si no se conoce)
+
+    idx = cargar_indice_filas()
+    pos, neg = extraer_filas(idx, idx["tiene_hl"], positivos, negativos)
+"""
+import json
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codigo_fuente.almacen_dataset import AlmacenDataset
+from codigo_fuente.indice_metadatos import RUTA_INDICE as RUTA_METADATOS, snrs_eventos
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+OFFSETS_NEGATIVOS_S = (-12, 12)  # negativo1, negativo2 de cada evento (construir_dataset_real)
+
+# Eventos sin correlación H1-L1 según la última validación de v6, para
+# datos generados antes de que construir_dataset_l1 guardara
+# correlacion_hl_eventos.json con la lista real.
+SIN_HL_LEGADO = ["GW190620_030421-v2", "GW190630_185205-v2", "GW190708_232457-v2",
+                 "GW191216_213338-v1", "GW200112_155838-v1", "GW200202_154313-v1",
+                 "GW200302_015811-v1"]
+
+DTYPE = np.dtype([
+    ("evento", "U40"),
+    ("etiqueta", np.int8),
+    ("fila", np.int64),
+    ("offset_ventana_s", np.float64),
+    ("tiene_hl", np.bool_),
+    ("fila_hl", np.int64),
+    ("snr", np.float64),
+])
+
+
+def _ruta_indice(directorio):
+    return os.path.join(directorio, "dataset_real_indice.npy")
+
+
+def eventos_del_dataset(directorio=DATA_DIR):
+    """Eventos en el orden de sus filas (el del registro de procesados)."""
+    procesados, _ = AlmacenDataset(directorio).registro()
+    if procesados is None:
+        with open(os.path.join(directorio, "eventos_procesados.json")) as f:
+            registro = json.load(f)
+        procesados = registro["eventos_procesados"] if isinstance(registro, dict) else registro
+    return list(procesados)
+
+
+def eventos_con_hl(directorio=DATA_DIR):
+    eventos = eventos_del_dataset(directorio)
+    ruta = os.path.join(directorio, "correlacion_hl_eventos.json")
+    if os.path.exists(ruta):
+        with open(ruta, "r") as f:
+            con_hl = set(json.load(f))
+        return [e for e in eventos if e in con_hl]
+    return [e for e in eventos if e not in SIN_HL_LEGADO]
+
+
+def construir_indice_filas(directorio=DATA_DIR, ruta_metadatos=RUTA_METADATOS):
+    eventos = eventos_del_dataset(directorio)
+    n = len(eventos)
+    con_hl = set(eventos_con_hl(directorio))
+    snrs = snrs_eventos(eventos, ruta=ruta_metadatos, consultar_faltantes=False)
+
+    nombres = np.array(eventos, dtype=DTYPE["evento"])
+    tiene_hl = np.array([e in con_hl for e in eventos], dtype=bool)
+    fila_hl = np.where(tiene_hl, np.cumsum(tiene_hl) - 1, -1)
+    snr = np.array([snrs.get(e, np.nan) for e in eventos], dtype=np.float64)
+
+    indice = np.zeros(3 * n, dtype=DTYPE)
+    pos, neg = indice[:n], indice[n:]
+    pos["evento"], pos["etiqueta"], pos["fila"] = nombres, 1, np.arange(n)
+    pos["tiene_hl"], pos["fila_hl"], pos["snr"] = tiene_hl, fila_hl, snr
+    # 2 negativos por evento, contiguos: filas 2*i y 2*i+1
+    neg["evento"], neg["etiqueta"], neg["fila"] = np.repeat(nombres, 2), 0, np.arange(2 * n)
+    neg["offset_ventana_s"] = np.tile(OFFSETS_NEGATIVOS_S, n)
+    neg["tiene_hl"] = np.repeat(tiene_hl, 2)
+    neg["fila_hl"] = np.where(neg["tiene_hl"], 2 * np.repeat(fila_hl, 2) + np.tile([0, 1], n), -1)
+    neg["snr"] = np.repeat(snr, 2)
+    return indice
+
+
+def _fuentes(directorio, ruta_metadatos):
+    almacen = AlmacenDataset(directorio)
+    return [os.path.join(directorio, "eventos_procesados.json"), almacen.ruta_manifiesto,
+            os.path.join(directorio, "correlacion_hl_eventos.json"), ruta_metadatos]
+
+
+def guardar_indice_filas(directorio=DATA_DIR, ruta_metadatos=RUTA_METADATOS):
+    indice = construir_indice_filas(directorio, ruta_metadatos)
+    ruta = _ruta_indice(directorio)
+    temporal = ruta + ".tmp.npy"
+    np.save(temporal, indice)
+    os.replace(temporal, ruta)
+    return indice
+
+
+def cargar_indice_filas(directorio=DATA_DIR, ruta_metadatos=RUTA_METADATOS):
+    """Índice del dataset; se regenera si falta o si alguna de sus
+    fuentes (registro, manifiesto, eventos H1-L1, metadatos) es más
+    reciente que él."""
+    ruta = _ruta_indice(directorio)
+    if os.path.exists(ruta):
+        fecha = os.path.getmtime(ruta)
+        if all(not os.path.exists(f) or os.path.getmtime(f) <= fecha for f in _fuentes(directorio, ruta_metadatos)):
+            return np.load(ruta)
+    return guardar_indice_filas(directorio, ruta_metadatos)
+
+
+def extraer_filas(indice, mascara, positivos, negativos):
+    """(positivos_sub, negativos_sub) de las filas de `indice` que
+    cumplen `mascara`, con un único gather por array (también sobre
+    arrays memory-mapped), en el orden del dataset."""
+    seleccion = indice[mascara]
+    return (positivos[seleccion["fila"][seleccion["etiqueta"] == 1]],
+            negativos[seleccion["fila"][seleccion["etiqueta"] == 0]])
+
+
+def extraer_correlaciones_hl(indice, mascara, corr_pos, corr_neg):
+    """Correlaciones H1-L1 alineadas con extraer_filas(indice, mascara, ...).
+    Todas las filas seleccionadas deben tener tiene_hl."""
+    seleccion = indice[mascara]
+    if not seleccion["tiene_hl"].all():
+        raise ValueError("La selección incluye eventos sin correlación H1-L1")
+    esperado_pos = int(np.sum(indice["tiene_hl"] & (indice["etiqueta"] == 1)))
+    if len(corr_pos) != esperado_pos or len(corr_neg) != 2 * esperado_pos:
+        raise ValueError(f"correlacion_hl tiene {len(corr_pos)}/{len(corr_neg)} valores pero el índice espera "
+                         f"{esperado_pos}/{2 * esperado_pos}: vuelve a ejecutar construir_dataset_l1.py")
+    return (corr_pos[seleccion["fila_hl"][seleccion["etiqueta"] == 1]],
+            corr_neg[seleccion["fila_hl"][seleccion["etiqueta"] == 0]])
+
+
+if __name__ == "__main__":
+    indice = guardar_indice_filas()
+    n_pos = int(np.sum(indice["etiqueta"] == 1))
+    print(f"🗂️  Índice de filas: {n_pos} eventos ({len(indice)} filas), "
+          f"{int(np.sum(indice['tiene_hl'] & (indice['etiqueta'] == 1)))} con H1-L1, "
+          f"{int(np.sum(~np.isnan(indice['snr']) & (indice['etiqueta'] == 1)))} con SNR")
@@ -0,0 +1,216 @@
+"""
+Índice local (SQLite) de metadatos GWOSC por evento: tiempo GPS, URL
+del strain por detector, SNR de red y masas de las componentes.
+
+Antes, cada ejecución llamaba a event_gps / get_event_urls /
+fetch_event_json por la red, evento a evento (obtener_snr hacía 247
+peticiones HTTP secuenciales). Ahora:
+- `poblar(eventos)` consulta GWOSC UNA vez, en paralelo (pool de
+  hilos), solo para los eventos que aún no están en el índice
+  (`refrescar=True` los vuelve a pedir todos).
+- Las funciones de consulta (gps_evento, url_evento, snr_evento,
+  masas_evento) leen data/metadatos_gwosc.sqlite sin red; si un evento
+  aún no está indexado lo consultan en ese momento y lo guardan.
+
+    python codigo_fuente/indice_metadatos.py            # eventos del registro
+    python codigo_fuente/indice_metadatos.py GW150914-v3 --workers 16
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+RUTA_INDICE = os.path.join(DATA_DIR, "metadatos_gwosc.sqlite")
+DETECTORES = ("H1", "L1")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS eventos (
+    nombre TEXT PRIMARY KEY,
+    gps REAL,
+    snr REAL,
+    masa1 REAL,
+    masa2 REAL,
+    actualizado REAL
+);
+CREATE TABLE IF NOT EXISTS urls (
+    nombre TEXT,
+    detector TEXT,
+    url TEXT,
+    PRIMARY KEY (nombre, detector)
+);
+"""
+_rutas_con_esquema = set()
+_lock_esquema = threading.Lock()
+
+
+def _crear_esquema(ruta):
+    """Crea las tablas si faltan, una sola vez por ruta en cada proceso."""
+    with _lock_esquema:
+        if ruta in _rutas_con_esquema and os.path.exists(ruta):
+            return
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with closing(sqlite3.connect(ruta, timeout=30)) as conexion:
+            conexion.executescript(_ESQUEMA)
+        _rutas_con_esquema.add(ruta)
+
+
+@contextmanager
+def _conectar(ruta=RUTA_INDICE):
+    """Conexión dentro de una transacción (commit al salir sin error,
+    rollback si no) que se cierra siempre al terminar el bloque."""
+    # una conexión por llamada: sqlite3 no comparte conexiones entre hilos
+    # y ampliar_dataset --workers consulta el índice desde varios hilos
+    _crear_esquema(ruta)
+    with closing(sqlite3.connect(ruta, timeout=30)) as conexion, conexion:
+        yield conexion
+
+
+def _primer_valor(eventos_json, clave):
+    """Primer valor no nulo de `clave` entre las versiones del evento
+    (mismo criterio que el antiguo obtener_snr)."""
+    for info in eventos_json.values():
+        valor = info.get(clave)
+        if valor is not None:
+            return float(valor)
+    return None
+
+
+def consultar_gwosc(nombre_evento):
+    """Metadatos de un evento pedidos a GWOSC (red). Devuelve un dict
+    con gps, snr, masa1, masa2 y urls {detector: url}."""
+    from gwosc.api import fetch_event_json
+    from gwosc.locate import get_event_urls
+
+    eventos_json = fetch_event_json(nombre_evento).get("events", {})
+    urls = {}
+    for detector in DETECTORES:
+        try:
+            encontradas = get_event_urls(nombre_evento, detector=detector)
+        except Exception:
+            encontradas = []
+        if encontradas:
+            urls[detector] = encontradas[0]
+    return {
+        "gps": _primer_valor(eventos_json, "GPS"),
+        "snr": _primer_valor(eventos_json, "network_matched_filter_snr"),
+        "masa1": _primer_valor(eventos_json, "mass_1_source"),
+        "masa2": _primer_valor(eventos_json, "mass_2_source"),
+        "urls": urls,
+    }
+
+
+def _guardar(conexion, nombre_evento, metadatos):
+    conexion.execute("INSERT OR REPLACE INTO eventos VALUES (?, ?, ?, ?, ?, ?)",
+                     (nombre_evento, metadatos["gps"], metadatos["snr"], metadatos["masa1"],
+                      metadatos["masa2"], time.time()))
+    conexion.execute("DELETE FROM urls WHERE nombre = ?", (nombre_evento,))
+    conexion.executemany("INSERT INTO urls VALUES (?, ?, ?)",
+                         [(nombre_evento, det, url) for det, url in metadatos["urls"].items()])
+
+
+def eventos_indexados(ruta=RUTA_INDICE):
+    with _conectar(ruta) as conexion:
+        return {fila[0] for fila in conexion.execute("SELECT nombre FROM eventos")}
+
+
+def poblar(eventos, workers=8, refrescar=False, ruta=RUTA_INDICE):
+    """Indexa los eventos que falten (todos si `refrescar`), con
+    `workers` consultas concurrentes. Devuelve {evento: error} de los
+    que no se pudieron consultar."""
+    pendientes = list(eventos) if refrescar else [e for e in eventos if e not in eventos_indexados(ruta)]
+    pendientes = list(dict.fromkeys(pendientes))
+    errores = {}
+    if not pendientes:
+        return errores
+
+    def consultar(evento):
+        try:
+            return evento, consultar_gwosc(evento), None
+        except Exception as e:
+            return evento, None, e
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool, _conectar(ruta) as conexion:
+        # las escrituras se hacen aquí, en un solo hilo, según llegan
+        for evento, metadatos, error in pool.map(consultar, pendientes):
+            if error is not None:
+                errores[evento] = error
+            else:
+                _guardar(conexion, evento, metadatos)
+    return errores
+
+
+def _fila_evento(nombre_evento, ruta):
+    with _conectar(ruta) as conexion:
+        fila = conexion.execute("SELECT gps, snr, masa1, masa2 FROM eventos WHERE nombre = ?",
+                                (nombre_evento,)).fetchone()
+    if fila is None:
+        errores = poblar([nombre_evento], workers=1, ruta=ruta)
+        if nombre_evento in errores:
+            raise KeyError(f"{nombre_evento} no está en el índice y GWOSC falló: {errores[nombre_evento]}")
+        return _fila_evento(nombre_evento, ruta)
+    return fila
+
+
+def gps_evento(nombre_evento, ruta=RUTA_INDICE):
+    """Sustituto offline de gwosc.datasets.event_gps."""
+    return _fila_evento(nombre_evento, ruta)[0]
+
+
+def snr_evento(nombre_evento, ruta=RUTA_INDICE):
+    """SNR de red (network_matched_filter_snr) o None si GWOSC no lo da."""
+    return _fila_evento(nombre_evento, ruta)[1]
+
+
+def masas_evento(nombre_evento, ruta=RUTA_INDICE):
+    """(m1, m2) en el marco de la fuente, en masas solares (o None)."""
+    return tuple(_fila_evento(nombre_evento, ruta)[2:4])
+
+
+def url_evento(nombre_evento, detector, ruta=RUTA_INDICE):
+    """URL del strain de `detector` (la que daba get_event_urls(...)[0]),
+    o None si GWOSC no tiene datos de ese detector."""
+    with _conectar(ruta) as conexion:
+        fila = conexion.execute("SELECT urls.url FROM eventos LEFT JOIN urls ON urls.nombre = eventos.nombre "
+                                "AND urls.detector = ? WHERE eventos.nombre = ?",
+                                (detector, nombre_evento)).fetchone()
+    if fila is None:
+        _fila_evento(nombre_evento, ruta)  # no indexado: se consulta y se guarda
+        return url_evento(nombre_evento, detector, ruta)
+    return fila[0]
+
+
+def snrs_eventos(eventos, ruta=RUTA_INDICE, consultar_faltantes=True):
+    """{evento: snr} de todos los eventos con SNR, en una sola consulta
+    (los que falten en el índice se consultan antes en paralelo, salvo
+    con consultar_faltantes=False: entonces no se toca la red)."""
+    if consultar_faltantes:
+        poblar(eventos, ruta=ruta)
+    with _conectar(ruta) as conexion:
+        filas = dict(conexion.execute("SELECT nombre, snr FROM eventos WHERE snr IS NOT NULL"))
+    return {e: filas[e] for e in eventos if e in filas}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Indexa localmente los metadatos GWOSC de los eventos")
+    parser.add_argument("eventos", nargs="*",
+                        help="nombres de evento (por defecto, los de data/eventos_procesados.json)")
+    parser.add_argument("--workers", type=int, default=8, help="consultas a GWOSC en paralelo")
+    parser.add_argument("--refrescar", action="store_true", help="vuelve a consultar también los ya indexados")
+    args = parser.parse_args()
+
+    eventos = args.eventos
+    if not eventos:
+        with open(os.path.join(DATA_DIR, "eventos_procesados.json")) as f:
+            registro = json.load(f)
+        eventos = registro["eventos_procesados"] + registro.get("eventos_excluidos_por_nan", [])
+
+    inicio = time.time()
+    errores = poblar(eventos, workers=args.workers, refrescar=args.refrescar)
+    print(f"🗃️  {len(eventos_indexados())} eventos en {RUTA_INDICE} ({time.time() - inicio:.1f}s)")
+    for evento, error in errores.items():
+        print(f"  ❌ {evento}: {error}")
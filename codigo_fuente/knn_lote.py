@@ -0,0 +1,147 @@
+"""
+K-NN con normalización min-max ajustada UNA vez y predicción por lotes.
+
+Los predecir() de DeepWaveKNNReal, DeepWaveKNNTotalmenteReal y
+DeepWaveKNNReferencia renormalizaban la matriz de entrenamiento
+completa en cada predicción y ordenaban todas las distancias con
+argsort. Ahora:
+- ajustar(X, y) calcula min/max y guarda la matriz ya normalizada;
+- predecir_lote(X) puntúa muchas consultas a la vez: distancias por
+  bloques de consultas (memoria acotada) y top-k con argpartition.
+
+    clf = KNNMinMax(k=5)
+    clf.ajustar(X_train, y_train)
+    predicciones, confianzas, vecinos = clf.predecir_lote(X_consultas)
+
+Las distancias son las mismas (bit a bit) que las del bucle anterior;
+solo el desempate entre vecinos a distancia IDÉNTICA puede diferir de
+argsort (aquí gana el índice menor).
+"""
+import numpy as np
+
+EPSILON_RANGO = 1e-10  # evita dividir por 0 en features constantes
+FILAS_POR_BLOQUE = 256  # consultas por bloque de distancias
+
+
+def normalizar_minmax(X, X_min, X_max):
+    return (X - X_min) / (X_max - X_min + EPSILON_RANGO)
+
+
+def vecinos_mas_cercanos(X_norm, consultas_norm, k, filas_por_bloque=FILAS_POR_BLOQUE):
+    """Índices (n_consultas, k) de los k vecinos de cada consulta en
+    X_norm, del más cercano al más lejano, y sus distancias euclídeas
+    al cuadrado."""
+    consultas_norm = np.atleast_2d(consultas_norm)
+    k = min(k, len(X_norm))
+    vecinos = np.empty((len(consultas_norm), k), dtype=np.int64)
+    distancias_k = np.empty((len(consultas_norm), k))
+    for i in range(0, len(consultas_norm), filas_por_bloque):
+        bloque = consultas_norm[i:i + filas_por_bloque]
+        vecinos[i:i + len(bloque)], distancias_k[i:i + len(bloque)] = \
+            k_menores(distancias_al_cuadrado(X_norm, bloque), k)
+    return vecinos, distancias_k
+
+
+def sumar_terminos(terminos):
+    """Suma de los arrays de `terminos` (se admite broadcasting) en el
+    mismo orden que np.sum sobre el último eje de su apilado: la suma
+    por pares de numpy es secuencial con menos de 8 términos y usa 8
+    acumuladores hasta 128. Sumar por separado da el mismo resultado,
+    bit a bit, sin construir el tensor apilado."""
+    forma = np.broadcast_shapes(*(np.shape(t) for t in terminos))
+    n = len(terminos)
+    if n > 128:
+        return np.sum(np.stack(np.broadcast_arrays(*terminos), axis=-1), axis=-1)
+    if n < 8:
+        total = np.zeros(forma) + terminos[0]
+        for termino in terminos[1:]:
+            total += termino
+        return total
+    acumulados = [np.zeros(forma) + t for t in terminos[:8]]
+    for i in range(8, n - n % 8, 8):
+        for j in range(8):
+            acumulados[j] += terminos[i + j]
+    a = acumulados
+    total = ((a[0] + a[1]) + (a[2] + a[3])) + ((a[4] + a[5]) + (a[6] + a[7]))
+    for termino in terminos[n - n % 8:]:
+        total += termino
+    return total
+
+
+def distancias_al_cuadrado(X_norm, consultas_norm):
+    """Matriz (n_consultas, n_train) con las mismas operaciones que
+    np.sum((X_norm - f_norm) ** 2, axis=1) consulta a consulta, término
+    a término (sin el tensor (n, n_train, d))."""
+    return sumar_terminos([(X_norm[np.newaxis, :, j] - consultas_norm[:, np.newaxis, j]) ** 2
+                           for j in range(X_norm.shape[1])])
+
+
+def k_menores(distancias, k):
+    """(índices, distancias) de las k columnas más cercanas de cada fila,
+    ordenadas por distancia y, a igual distancia, por índice (como un
+    argsort estable)."""
+    if k < distancias.shape[1]:
+        candidatos = np.argpartition(distancias, k - 1, axis=1)[:, :k]
+    else:
+        candidatos = np.broadcast_to(np.arange(distancias.shape[1]), distancias.shape)
+    d_candidatos = np.take_along_axis(distancias, candidatos, axis=1)
+    orden = np.lexsort((candidatos, d_candidatos), axis=1)
+    candidatos = np.take_along_axis(candidatos, orden, axis=1)
+    d_candidatos = np.take_along_axis(d_candidatos, orden, axis=1)
+    if k < distancias.shape[1]:
+        # argpartition elige cualquiera de las columnas empatadas con la
+        # k-ésima: las filas con empate en el corte se ordenan completas
+        corte = np.sum(distancias <= d_candidatos[:, -1:], axis=1) > k
+        if corte.any():
+            estables = np.argsort(distancias[corte], axis=1, kind="stable")[:, :k]
+            candidatos[corte] = estables
+            d_candidatos[corte] = np.take_along_axis(distancias[corte], estables, axis=1)
+    return candidatos, d_candidatos
+
+
+def votar(y_train, vecinos):
+    """Voto mayoritario binario como argmax(bincount(...)): el empate
+    (k par) va a la clase 0. Devuelve (predicciones, confianzas), con la
+    confianza = fracción de votos de la clase predicha."""
+    k = vecinos.shape[1]
+    votos_positivos = np.asarray(y_train)[vecinos].sum(axis=1)
+    predicciones = (votos_positivos > k - votos_positivos).astype(np.int64)
+    confianzas = np.where(predicciones == 1, votos_positivos, k - votos_positivos) / k
+    return predicciones, confianzas
+
+
+class KNNMinMax:
+    """K-NN con distancia euclídea sobre features normalizadas min-max
+    con el rango del conjunto de entrenamiento."""
+
+    def __init__(self, k=5):
+        self.k = k
+        self.X_train = None
+        self.y_train = None
+        self.X_min = None
+        self.X_max = None
+        self.X_norm = None
+
+    def ajustar(self, X_train, y_train):
+        self.X_train = np.asarray(X_train, dtype=np.float64)
+        self.y_train = np.asarray(y_train)
+        self.X_min = self.X_train.min(axis=0)
+        self.X_max = self.X_train.max(axis=0)
+        self.X_norm = self._normalizar(self.X_train)
+        return self
+
+    def _normalizar(self, X):
+        return normalizar_minmax(X, self.X_min, self.X_max)
+
+    def predecir_lote(self, X):
+        """(predicciones, confianzas, vecinos) para cada fila de X; vecinos
+        son índices de X_train, del más cercano al más lejano."""
+        if self.X_norm is None:
+            raise RuntimeError("Clasificador sin ajustar: llama antes a ajustar()/entrenar()")
+        vecinos, _ = vecinos_mas_cercanos(self.X_norm, self._normalizar(np.atleast_2d(X)), self.k)
+        predicciones, confianzas = votar(self.y_train, vecinos)
+        return predicciones, confianzas, vecinos
+
+    def predecir(self, features):
+        predicciones, confianzas, _ = self.predecir_lote(np.asarray(features)[np.newaxis])
+        return predicciones[0], confianzas[0]
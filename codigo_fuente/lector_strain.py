@@ -0,0 +1,70 @@
+"""
+Lectura parcial de strain GWOSC (.hdf5): en vez de cargar el array
+completo con f["strain"]["Strain"][:] (4096 s x 4096 Hz = 128 MB en
+float64 para GW150914), calcula el rango de muestras a partir de
+GPSstart/Xspacing y lee solo ese tramo (selección hyperslab de h5py).
+
+Los archivos abiertos se mantienen en un pequeño pool LRU, así que
+leer varias ventanas del mismo archivo no vuelve a abrirlo. La clave
+del pool incluye tamaño y fecha de modificación: si el archivo se
+vuelve a descargar, se abre de nuevo automáticamente.
+"""
+import os
+from collections import OrderedDict
+import numpy as np
+import h5py
+
+MAX_ARCHIVOS_ABIERTOS = 8
+_abiertos = OrderedDict()
+
+
+def _abrir(ruta):
+    info = os.stat(ruta)
+    clave = (os.path.abspath(ruta), info.st_size, info.st_mtime_ns)
+    if clave in _abiertos:
+        _abiertos.move_to_end(clave)
+        return _abiertos[clave]
+    for vieja in [c for c in _abiertos if c[0] == clave[0]]:
+        _abiertos.pop(vieja)["archivo"].close()
+
+    f = h5py.File(ruta, "r")
+    strain = f["strain"]["Strain"]
+    dt = strain.attrs.get("Xspacing", 1 / 4096)
+    entrada = {
+        "archivo": f,
+        "strain": strain,
+        "fs": 1.0 / dt,
+        "gps_inicio": f["meta"]["GPSstart"][()] if "meta" in f else None,
+    }
+    _abiertos[clave] = entrada
+    if len(_abiertos) > MAX_ARCHIVOS_ABIERTOS:
+        _abiertos.popitem(last=False)[1]["archivo"].close()
+    return entrada
+
+
+def cerrar_archivos():
+    while _abiertos:
+        _abiertos.popitem()[1]["archivo"].close()
+
+
+def metadatos_strain(ruta):
+    """(fs, gps_inicio, n_muestras) sin leer ningún dato de strain."""
+    entrada = _abrir(ruta)
+    return entrada["fs"], entrada["gps_inicio"], entrada["strain"].shape[0]
+
+
+def leer_muestras(ruta, inicio, fin):
+    """Muestras [inicio, fin) del strain, recortadas a los límites del
+    archivo. Devuelve (segmento, fs, inicio_real)."""
+    entrada = _abrir(ruta)
+    n = entrada["strain"].shape[0]
+    inicio, fin = max(0, int(inicio)), min(n, int(fin))
+    return entrada["strain"][inicio:fin], entrada["fs"], inicio
+
+
+def leer_region(ruta, inicio_s, fin_s):
+    """Tramo [inicio_s, fin_s) en segundos desde el inicio del archivo,
+    recortado a sus límites. Devuelve (segmento, fs, inicio_real_s)."""
+    fs = _abrir(ruta)["fs"]
+    segmento, fs, inicio = leer_muestras(ruta, np.floor(inicio_s * fs), np.ceil(fin_s * fs))
+    return segmento, fs, inicio / fs
@@ -0,0 +1,165 @@
+"""
+Leave-one-out exacto del K-NN min-max sin re-entrenar N veces.
+
+leave_one_out, curva_roc_v6, bootstrap_auc_v1 y auc_condicionado_por_snr
+hacían, para cada una de las N muestras, np.delete + min/max del resto
++ normalización + argsort completo: O(N² log N) y muchas copias.
+
+Con la misma semántica (cada fold normaliza con el min/max de las N-1
+muestras de entrenamiento): quitar la muestra i solo cambia la
+normalización si i es el ÚNICO mínimo o máximo de alguna columna. Para
+el resto de folds la normalización es la global, así que las distancias
+salen de una única matriz de distancias (por bloques de filas, con la
+diagonal excluida); solo los pocos folds "extremos" (como mucho 2 por
+feature) se recalculan con su propio min/max.
+
+    scores = scores_loo(X_todo, y_todo, k=15)         # = score_continuo por fold
+    predicciones, confianzas = predicciones_loo(X_todo, y_todo, k=3)
+
+Los vecinos de cada fold salen ordenados, así que los k primeros de la
+lista hasta max(K) son exactamente los vecinos con K=k: evaluar_ks_loo
+barre K=1..31 por el coste de un solo LOO.
+"""
+import numpy as np
+from codigo_fuente.knn_lote import (FILAS_POR_BLOQUE, normalizar_minmax, distancias_al_cuadrado,
+                                    k_menores, votar)
+
+
+def folds_extremos(X):
+    """Filas cuya exclusión cambia el min o el max de alguna columna."""
+    es_min, es_max = X == X.min(axis=0), X == X.max(axis=0)
+    unico_min, unico_max = es_min.sum(axis=0) == 1, es_max.sum(axis=0) == 1
+    return np.flatnonzero(np.any((es_min & unico_min) | (es_max & unico_max), axis=1))
+
+
+def vecinos_loo(X, k, filas_por_bloque=FILAS_POR_BLOQUE):
+    """(vecinos, distancias), de forma (N, min(k, N-1)): para cada fila
+    i, sus vecinos entre las demás (índices de X) como si el K-NN se
+    hubiera ajustado sin i."""
+    X = np.asarray(X, dtype=np.float64)
+    n = len(X)
+    k = min(k, n - 1)
+    vecinos = np.empty((n, k), dtype=np.int64)
+    distancias_k = np.empty((n, k))
+
+    X_norm = normalizar_minmax(X, X.min(axis=0), X.max(axis=0))
+    for i in range(0, n, filas_por_bloque):
+        filas = np.arange(i, min(i + filas_por_bloque, n))
+        distancias = distancias_al_cuadrado(X_norm, X_norm[filas])
+        distancias[np.arange(len(filas)), filas] = np.inf  # la muestra no es vecina de sí misma
+        vecinos[filas], distancias_k[filas] = k_menores(distancias, k)
+
+    for i in folds_extremos(X):
+        vecinos[i], distancias_k[i] = vecinos_fold(X, i, k)
+    return vecinos, distancias_k
+
+
+def vecinos_fold(X, i, k):
+    """Vecinos de la fila i con la normalización de su propio fold (el
+    min/max de las demás filas): el camino lento, para folds extremos."""
+    entrenamiento = np.delete(X, i, axis=0)
+    X_min, X_max = entrenamiento.min(axis=0), entrenamiento.max(axis=0)
+    distancias = distancias_al_cuadrado(normalizar_minmax(X, X_min, X_max),
+                                        normalizar_minmax(X[i:i + 1], X_min, X_max))
+    distancias[0, i] = np.inf
+    vecinos, distancias_k = k_menores(distancias, k)
+    return vecinos[0], distancias_k[0]
+
+
+def vecinos_loo_incremental(X, claves, k, previo=None):
+    """vecinos_loo(X, k) reutilizando el resultado de una versión anterior
+    del dataset a la que solo se le han AÑADIDO filas.
+
+    `claves` identifica cada fila de X (p.ej. evento|etiqueta|offset) y
+    `previo` es el estado devuelto por una llamada anterior. Si el min/max
+    global no cambió, las distancias entre filas viejas siguen siendo las
+    mismas y una fila nueva solo puede ENTRAR en la lista top-k de una
+    vieja: basta con mezclar cada lista vieja con las distancias a las
+    filas nuevas. Las filas nuevas y los folds extremos (antes o ahora)
+    se calculan completos. Si se quitó alguna fila, cambió el orden
+    relativo de las viejas (los empates se desempatan por índice), cambió
+    k o cambió la normalización, se recalcula todo.
+
+    Devuelve (vecinos, distancias, estado, reutilizado)."""
+    X = np.asarray(X, dtype=np.float64)
+    claves = np.asarray(claves)
+    k = min(k, len(X) - 1)
+    X_min, X_max = X.min(axis=0), X.max(axis=0)
+    extremos = folds_extremos(X)
+
+    posicion = {c: i for i, c in enumerate(claves)}
+    reutilizable = (previo is not None and int(previo["k"]) == k
+                    and np.array_equal(previo["X_min"], X_min) and np.array_equal(previo["X_max"], X_max)
+                    and all(c in posicion for c in previo["claves"])
+                    and np.all(np.diff([posicion[c] for c in previo["claves"]]) > 0))
+    if not reutilizable:
+        vecinos, distancias_k = vecinos_loo(X, k)
+    else:
+        viejas = np.array([posicion[c] for c in previo["claves"]], dtype=np.int64)
+        es_nueva = np.ones(len(X), dtype=bool)
+        es_nueva[viejas] = False
+        nuevas = np.flatnonzero(es_nueva)
+        X_norm = normalizar_minmax(X, X_min, X_max)
+        vecinos = np.empty((len(X), k), dtype=np.int64)
+        distancias_k = np.empty((len(X), k))
+
+        # filas viejas: su top-k anterior (en índices nuevos) + las filas nuevas
+        candidatos = np.hstack([viejas[previo["vecinos"]], np.broadcast_to(nuevas, (len(viejas), len(nuevas)))])
+        d_candidatos = np.hstack([previo["distancias"], distancias_al_cuadrado(X_norm[nuevas], X_norm[viejas])])
+        orden = np.lexsort((candidatos, d_candidatos), axis=1)[:, :k]
+        vecinos[viejas] = np.take_along_axis(candidatos, orden, axis=1)
+        distancias_k[viejas] = np.take_along_axis(d_candidatos, orden, axis=1)
+
+        for i in range(0, len(nuevas), FILAS_POR_BLOQUE):
+            filas = nuevas[i:i + FILAS_POR_BLOQUE]
+            distancias = distancias_al_cuadrado(X_norm, X_norm[filas])
+            distancias[np.arange(len(filas)), filas] = np.inf
+            vecinos[filas], distancias_k[filas] = k_menores(distancias, k)
+
+        for i in np.union1d(extremos, viejas[previo["extremos"]]):
+            vecinos[i], distancias_k[i] = vecinos_fold(X, i, k)
+
+    estado = {"claves": claves, "k": k, "X_min": X_min, "X_max": X_max,
+              "vecinos": vecinos, "distancias": distancias_k, "extremos": extremos}
+    return vecinos, distancias_k, estado, reutilizable
+
+
+def scores_loo(X, y, k):
+    """Proporción de vecinos BBH de cada muestra (el score_continuo de
+    los scripts de ROC/AUC) en leave-one-out."""
+    vecinos, _ = vecinos_loo(X, k)
+    return np.mean(np.asarray(y)[vecinos] == 1, axis=1)
+
+
+def predicciones_loo(X, y, k):
+    """(predicciones, confianzas) de voto mayoritario en leave-one-out."""
+    vecinos, _ = vecinos_loo(X, k)
+    return votar(y, vecinos)
+
+
+def votos_por_k(y, vecinos, ks):
+    """{k: (votos BBH, vecinos usados)} entre los k primeros de cada lista
+    ordenada `vecinos` (como mucho las que tenga la lista)."""
+    acumulados = np.cumsum(np.asarray(y)[vecinos] == 1, axis=1)
+    return {k: (acumulados[:, min(k, vecinos.shape[1]) - 1], min(k, vecinos.shape[1])) for k in ks}
+
+
+def evaluar_ks_loo(X, y, ks):
+    """Leave-one-out para todos los K de `ks` con un único ranking de
+    vecinos. Devuelve {k: dict} con global, recall_pos, recall_neg,
+    predicciones (voto mayoritario; el empate va a la clase 0) y
+    scores (proporción de vecinos BBH)."""
+    y = np.asarray(y)
+    vecinos, _ = vecinos_loo(X, max(ks))
+    resultados = {}
+    for k, (votos, n_vecinos) in votos_por_k(y, vecinos, ks).items():
+        predicciones = (votos > n_vecinos - votos).astype(np.int64)
+        correctos = predicciones == y
+        resultados[k] = {
+            "global": correctos.mean(),
+            "recall_pos": correctos[y == 1].mean(),
+            "recall_neg": correctos[y == 0].mean(),
+            "predicciones": predicciones,
+            "scores": votos / n_vecinos,
+        }
+    return resultados
@@ -30,7 +30,11 @@ if __name__ == "__main__":
     # crudos con el mismo whitening, solo cambia la ventana de búsqueda
     import sys
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import construir_dataset_l1
     from construir_dataset_l1 import procesar_un_detector
+    # el strain blanqueado de cada (evento, detector) se reutiliza entre
+    # las 3 ventanas; con --cache-disco también entre ejecuciones
+    construir_dataset_l1.USAR_CACHE_DISCO = "--cache-disco" in sys.argv
 
     with open(os.path.join(DATA_DIR, "eventos_procesados.json")) as f:
         registro = json.load(f)
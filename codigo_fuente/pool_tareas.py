@@ -0,0 +1,35 @@
+"""
+Reparto de tareas en un pool de procesos con datos comunes enviados UNA
+vez por worker (initializer) en vez de con cada tarea: el dataset, el
+tensor de diferencias o el motor de submuestreo pesan mucho más que la
+descripción de una tarea.
+
+    for tarea, resultado in mapear(evaluar, (X, y), tareas, workers=8):
+        ...  # resultado = evaluar(X, y, *tarea), en el orden de `tareas`
+
+La función tiene que poder importarse desde el worker (definida a nivel
+de módulo o método de una clase de módulo).
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+_worker = {}
+
+
+def _iniciar_worker(funcion, comunes):
+    _worker.update(funcion=funcion, comunes=comunes)
+
+
+def _ejecutar(tarea):
+    return _worker["funcion"](*_worker["comunes"], *tarea)
+
+
+def mapear(funcion, comunes, tareas, workers=1):
+    """Iterador de (tarea, funcion(*comunes, *tarea)) en el orden de
+    `tareas`; con workers <= 1, en este proceso."""
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker,
+                                 initargs=(funcion, tuple(comunes))) as pool:
+            yield from zip(tareas, pool.map(_ejecutar, tareas))
+    else:
+        for tarea in tareas:
+            yield tarea, funcion(*comunes, *tarea)
@@ -0,0 +1,162 @@
+"""
+Registro declarativo de features del espectrograma.
+
+Cada feature declara de qué entradas depende (el tensor de
+espectrogramas, una reducción intermedia compartida o un dato externo
+como la correlación H1-L1). calcular_features(nombres, ...) resuelve
+solo el grafo necesario para esos nombres, y cada intermedio (p.ej.
+energia_por_tiempo, usado por pendiente y num_picos) se calcula una
+única vez por llamada.
+
+Antes, v6 y DeepWaveKNNReferencia llamaban a extraer_features_v2 y
+descartaban 6 de las 8 salidas, incluida la entropía espectral (que
+normaliza el espectrograma completo) y la pendiente. Ahora pedir 2
+features cuesta ~2 features:
+
+    X = calcular_features(["energia_media", "pico_max"], espectrogramas)
+    X = calcular_conjunto("v6", espectrogramas, correlacion_hl=corr)
+
+Todas las features coinciden bit a bit con extraer_features_v2_lote.
+"""
+import numpy as np
+from codigo_fuente.deepwave_features_v2 import pendiente_lote, contar_picos_lote
+
+ESPECTROGRAMAS = "espectrogramas"
+
+# nombre -> (entradas, función(*entradas))
+INTERMEDIOS = {}
+FEATURES = {}
+# entradas que no se calculan: las aporta quien llama (p.ej. correlacion_hl)
+ENTRADAS_EXTERNAS = {"correlacion_hl"}
+
+
+def intermedio(nombre, *entradas):
+    def registrar(funcion):
+        INTERMEDIOS[nombre] = (entradas, funcion)
+        return funcion
+    return registrar
+
+
+def feature(nombre, *entradas):
+    def registrar(funcion):
+        FEATURES[nombre] = (entradas, funcion)
+        return funcion
+    return registrar
+
+
+def _corte_baja(espectrogramas):
+    return min(10, espectrogramas.shape[1])
+
+
+def _corte_media(espectrogramas):
+    return min(30, espectrogramas.shape[1])
+
+
+@intermedio("planos", ESPECTROGRAMAS)
+def _planos(espectrogramas):
+    return espectrogramas.reshape(espectrogramas.shape[0], -1)
+
+
+@intermedio("energia_por_tiempo", ESPECTROGRAMAS)
+def _energia_por_tiempo(espectrogramas):
+    return espectrogramas.mean(axis=1)
+
+
+@feature("energia_baja", ESPECTROGRAMAS)
+def _energia_baja(espectrogramas):
+    return espectrogramas[:, :_corte_baja(espectrogramas), :].mean(axis=(1, 2))
+
+
+@feature("energia_media", ESPECTROGRAMAS)
+def _energia_media(espectrogramas):
+    corte_baja, corte_media = _corte_baja(espectrogramas), _corte_media(espectrogramas)
+    if corte_media <= corte_baja:
+        return np.zeros(espectrogramas.shape[0])
+    return espectrogramas[:, corte_baja:corte_media, :].mean(axis=(1, 2))
+
+
+@feature("energia_alta", ESPECTROGRAMAS)
+def _energia_alta(espectrogramas):
+    corte_media = _corte_media(espectrogramas)
+    if espectrogramas.shape[1] <= corte_media:
+        return np.zeros(espectrogramas.shape[0])
+    return espectrogramas[:, corte_media:, :].mean(axis=(1, 2))
+
+
+@feature("pendiente", "energia_por_tiempo")
+def _pendiente(energia_por_tiempo):
+    return pendiente_lote(energia_por_tiempo)
+
+
+@feature("pico_max", "planos")
+def _pico_max(planos):
+    return planos.max(axis=1)
+
+
+@feature("varianza_total", "planos")
+def _varianza_total(planos):
+    return planos.var(axis=1)
+
+
+@feature("entropia_espectral", "planos")
+def _entropia_espectral(planos):
+    energia_positiva = planos - planos.min(axis=1, keepdims=True) + 1e-10
+    p = energia_positiva / energia_positiva.sum(axis=1, keepdims=True)
+    return -np.sum(p * np.log(p + 1e-10), axis=1)
+
+
+@feature("num_picos", "energia_por_tiempo")
+def _num_picos(energia_por_tiempo):
+    return contar_picos_lote(energia_por_tiempo).astype(float)
+
+
+@feature("correlacion_hl", "correlacion_hl")
+def _correlacion_hl(correlacion_hl):
+    return np.asarray(correlacion_hl, dtype=np.float64).reshape(-1)
+
+
+# Conjuntos con nombre, en el mismo orden de columnas que sus extractores
+CONJUNTOS = {
+    "v1": ["energia_baja", "pendiente", "pico_max"],
+    "v2": ["energia_baja", "energia_media", "energia_alta", "pendiente",
+           "pico_max", "varianza_total", "entropia_espectral", "num_picos"],
+    "v3": ["energia_baja", "energia_media", "energia_alta", "pico_max"],
+    "v4": ["energia_baja", "pendiente", "pico_max", "correlacion_hl"],
+    "pico_y_energia_media": ["energia_media", "pico_max"],
+    "v6": ["energia_media", "pico_max", "correlacion_hl"],
+}
+
+
+def entradas_externas(nombres):
+    """Entradas externas que necesitan las features `nombres`."""
+    return sorted({e for n in nombres for e in FEATURES[n][0] if e in ENTRADAS_EXTERNAS})
+
+
+def calcular_features(nombres, espectrogramas=None, **externas):
+    """Matriz (N, len(nombres)) con solo las features pedidas.
+    `espectrogramas` es el tensor (N, n_freq, n_tiempo); las entradas
+    externas (correlacion_hl=...) se pasan por nombre."""
+    desconocidas = [n for n in nombres if n not in FEATURES]
+    if desconocidas:
+        raise KeyError(f"Features desconocidas: {', '.join(desconocidas)}")
+    valores = dict(externas)
+    if espectrogramas is not None:
+        valores[ESPECTROGRAMAS] = np.asarray(espectrogramas)
+
+    def resolver(nombre):
+        if nombre not in valores:
+            if nombre not in INTERMEDIOS:
+                raise ValueError(f"Falta la entrada '{nombre}'")
+            entradas, funcion = INTERMEDIOS[nombre]
+            valores[nombre] = funcion(*[resolver(e) for e in entradas])
+        return valores[nombre]
+
+    columnas = []
+    for nombre in nombres:
+        entradas, funcion = FEATURES[nombre]
+        columnas.append(funcion(*[resolver(e) for e in entradas]))
+    return np.column_stack(columnas)
+
+
+def calcular_conjunto(conjunto, espectrogramas=None, **externas):
+    return calcular_features(CONJUNTOS[conjunto], espectrogramas, **externas)
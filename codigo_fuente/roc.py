@@ -0,0 +1,48 @@
+"""
+Curva ROC y AUC vectorizadas, compartidas por curva_roc_real.py y
+validacion_completa_v6.py.
+
+Las dos implementaciones manuales reconstruían una lista Python de
+predicciones por cada umbral y contaban TP/FP con generadores:
+O(n * n_umbrales) en Python puro. Aquí las puntuaciones de cada clase
+se ordenan UNA vez y el número de positivos/negativos con score >= u se
+obtiene para todos los umbrales a la vez con searchsorted (los empates
+cruzan el umbral juntos, igual que con `s >= u`).
+
+Misma convención que los scripts (y que data/roc_puntos*.npy): umbrales
+[1.1] + scores únicos en orden descendente + [-0.1], y AUC por la regla
+del trapecio sobre los puntos en ese orden.
+
+    umbrales, fpr, tpr, auc = curva_roc(y_todo, scores)
+"""
+import numpy as np
+
+UMBRAL_SUPERIOR = 1.1  # por encima de cualquier score: punto (0, 0)
+UMBRAL_INFERIOR = -0.1  # por debajo de cualquier score: punto (1, 1)
+
+
+def _tasa_por_encima(scores_clase, umbrales):
+    """Fracción de `scores_clase` con score >= cada umbral (0 si la
+    clase está vacía, como en los scripts originales)."""
+    if len(scores_clase) == 0:
+        return np.zeros(len(umbrales))
+    ordenados = np.sort(scores_clase)
+    return (len(ordenados) - np.searchsorted(ordenados, umbrales, side="left")) / len(ordenados)
+
+
+def auc_trapecio(fpr, tpr):
+    # cumsum acumula en orden, como el bucle `auc += ...` de los scripts,
+    # así que el AUC coincide bit a bit con el de antes
+    terminos = np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2
+    return float(np.cumsum(terminos)[-1]) if len(terminos) else 0.0
+
+
+def curva_roc(y_true, scores, umbral_superior=UMBRAL_SUPERIOR, umbral_inferior=UMBRAL_INFERIOR):
+    """(umbrales, fpr, tpr, auc) con un punto por umbral, de mayor a
+    menor umbral."""
+    y_true = np.asarray(y_true)
+    scores = np.asarray(scores, dtype=np.float64)
+    umbrales = np.concatenate([[umbral_superior], np.unique(scores)[::-1], [umbral_inferior]])
+    tpr = _tasa_por_encima(scores[y_true == 1], umbrales)
+    fpr = _tasa_por_encima(scores[y_true == 0], umbrales)
+    return umbrales, fpr, tpr, auc_trapecio(fpr, tpr)
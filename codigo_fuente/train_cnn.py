@@ -13,7 +13,8 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from codigo_fuente.deepwave_classifier_cnn_real import RealDeepWaveCNN
-from codigo_fuente.deepwave_preprocessing import calcular_espectrograma_stub
+from codigo_fuente.deepwave_preprocessing import calcular_espectrogramas_lote
+from codigo_fuente.almacen_dataset import DATASET_DIR, cargar_dataset_real as cargar_filas_almacen
 from sklearn.model_selection import StratifiedKFold
 from tensorflow.keras.callbacks import EarlyStopping
 
@@ -21,27 +22,14 @@ FS_REAL = 2048
 N_FOLDS = 5
 EPOCHS_MAX = 50
 
-def cargar_dataset_real():
+def cargar_dataset_real(directorio=DATASET_DIR):
     """Carga el dataset real (positivos+negativos) y calcula
     espectrogramas STFT — mismo preprocesamiento que el K-NN."""
-    ruta_pos = os.path.join(os.path.dirname(__file__), "..", "data", "dataset_real_positivos.npy")
-    ruta_neg = os.path.join(os.path.dirname(__file__), "..", "data", "dataset_real_negativos.npy")
-
-    positivos = np.load(ruta_pos)
-    negativos = np.load(ruta_neg)
-
-    X, y = [], []
-    for señal in positivos:
-        spec = calcular_espectrograma_stub(señal, FS_REAL)
-        X.append(spec)
-        y.append(1)
-    for señal in negativos:
-        spec = calcular_espectrograma_stub(señal, FS_REAL)
-        X.append(spec)
-        y.append(0)
-
-    X = np.array(X, dtype=np.float32)
-    y = np.array(y, dtype=np.int32)
+    positivos, negativos = cargar_filas_almacen(directorio)
+
+    # Un solo rfft para todo el dataset, directamente en float32
+    X = calcular_espectrogramas_lote(np.vstack([positivos, negativos]), FS_REAL, dtype=np.float32)
+    y = np.array([1] * len(positivos) + [0] * len(negativos), dtype=np.int32)
     X = np.expand_dims(X, axis=-1)  # canal para Conv2D
     return X, y
 
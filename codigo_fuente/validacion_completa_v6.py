@@ -6,48 +6,25 @@ Validación rigurosa del clasificador de referencia v6 (modo dual):
    la métrica que faltaba desde que se creó v6.
 """
 import numpy as np
-import json
 import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from codigo_fuente.deepwave_preprocessing import calcular_espectrograma_stub
-from codigo_fuente.deepwave_features_v2 import extraer_features_v2
+from codigo_fuente.almacen_features import features_dataset
+from codigo_fuente.indice_filas import cargar_indice_filas, extraer_filas, extraer_correlaciones_hl
+from codigo_fuente.loo_knn import scores_loo
+from codigo_fuente.roc import curva_roc
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
-FS_REAL = 2048
-
-
-def extraer_pico_y_energia_media(espectrograma):
-    full = extraer_features_v2(espectrograma)
-    return np.array([full[1], full[4]])
 
 
 def cargar_dataset_v6():
-    with open(os.path.join(DATA_DIR, "eventos_procesados.json")) as f:
-        registro = json.load(f)
-    eventos_todos = registro["eventos_procesados"]
-    excluidos = ["GW190620_030421-v2", "GW190630_185205-v2", "GW190708_232457-v2",
-                 "GW191216_213338-v1", "GW200112_155838-v1", "GW200202_154313-v1",
-                 "GW200302_015811-v1"]  # GW200202 excluido: su correlación se calculó
-                 # en un reintento aislado que nunca se guardó en el .npy
-    eventos_con_hl = [e for e in eventos_todos if e not in excluidos]
-
-    positivos = np.load(os.path.join(DATA_DIR, "dataset_real_positivos.npy"))
-    negativos = np.load(os.path.join(DATA_DIR, "dataset_real_negativos.npy"))
-
-    indices_con_hl = [i for i, e in enumerate(eventos_todos) if e in eventos_con_hl]
-    positivos_sub = positivos[indices_con_hl]
-    indices_neg = []
-    for i in indices_con_hl:
-        indices_neg.extend([2 * i, 2 * i + 1])
-    negativos_sub = negativos[indices_neg]
-
-    corr_pos = np.load(os.path.join(DATA_DIR, "correlacion_hl_positivos.npy"))
-    corr_neg = np.load(os.path.join(DATA_DIR, "correlacion_hl_negativos.npy"))
-
-    X_pos_sel = np.array([extraer_pico_y_energia_media(calcular_espectrograma_stub(s, FS_REAL)) for s in positivos_sub])
-    X_neg_sel = np.array([extraer_pico_y_energia_media(calcular_espectrograma_stub(s, FS_REAL)) for s in negativos_sub])
+    indice = cargar_indice_filas(DATA_DIR)
+    # energia_media y pico_max, del almacén de features (solo esas 2 columnas)
+    X_pos_sel, X_neg_sel = extraer_filas(indice, indice["tiene_hl"], *features_dataset("pico_y_energia_media"))
+    corr_pos, corr_neg = extraer_correlaciones_hl(indice, indice["tiene_hl"],
+                                                  np.load(os.path.join(DATA_DIR, "correlacion_hl_positivos.npy")),
+                                                  np.load(os.path.join(DATA_DIR, "correlacion_hl_negativos.npy")))
 
     X_pos = np.hstack([X_pos_sel, corr_pos.reshape(-1, 1)])
     X_neg = np.hstack([X_neg_sel, corr_neg.reshape(-1, 1)])
@@ -113,32 +90,9 @@ def curva_roc_v6(X_pos, X_neg, k_score=15):
     X_todo = np.vstack([X_pos, X_neg])
     y_todo = np.array([1] * len(X_pos) + [0] * len(X_neg))
 
-    scores = []
-    for i in range(len(X_todo)):
-        X_train = np.delete(X_todo, i, axis=0)
-        y_train = np.delete(y_todo, i)
-        scores.append(score_continuo(X_train, y_train, X_todo[i], k_score))
-
-    umbrales = sorted(set(scores), reverse=True)
-    umbrales = [1.1] + umbrales + [-0.1]
-    puntos = []
-    total_pos, total_neg = sum(y_todo), len(y_todo) - sum(y_todo)
-
-    for u in umbrales:
-        preds = [1 if s >= u else 0 for s in scores]
-        tp = sum(1 for p, t in zip(preds, y_todo) if p == 1 and t == 1)
-        fp = sum(1 for p, t in zip(preds, y_todo) if p == 1 and t == 0)
-        tpr = tp / total_pos if total_pos > 0 else 0
-        fpr = fp / total_neg if total_neg > 0 else 0
-        puntos.append((fpr, tpr))
-
-    auc = 0.0
-    for i in range(1, len(puntos)):
-        fpr_prev, tpr_prev = puntos[i - 1]
-        fpr_curr, tpr_curr = puntos[i]
-        auc += (fpr_curr - fpr_prev) * (tpr_curr + tpr_prev) / 2
-
-    return puntos, auc
+    scores = scores_loo(X_todo, y_todo, k_score)
+    _, fpr, tpr, auc = curva_roc(y_todo, scores)
+    return list(zip(fpr, tpr)), auc
 
 
 if __name__ == "__main__":
@@ -10,8 +10,7 @@ import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from codigo_fuente.deepwave_preprocessing import calcular_espectrograma_stub
-from codigo_fuente.deepwave_knn_real import extraer_features
+from codigo_fuente.almacen_features import features_dataset
 from codigo_fuente.validacion_completa_v6 import knn_predecir, score_continuo, kfold_estratificado, curva_roc_v6
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
@@ -21,11 +20,7 @@ if __name__ == "__main__":
     print("🌌 VALIDACIÓN COMPLETA DE v1 (K-fold + ROC/AUC) — dataset de 75 eventos")
     print("=" * 75)
 
-    positivos = np.load(os.path.join(DATA_DIR, "dataset_real_positivos.npy"))
-    negativos = np.load(os.path.join(DATA_DIR, "dataset_real_negativos.npy"))
-
-    X_pos = np.array([extraer_features(calcular_espectrograma_stub(s, FS_REAL)) for s in positivos])
-    X_neg = np.array([extraer_features(calcular_espectrograma_stub(s, FS_REAL)) for s in negativos])
+    X_pos, X_neg = features_dataset("v1")
 
     print(f"Dataset: {len(X_pos)} positivos, {len(X_neg)} negativos\n")
 
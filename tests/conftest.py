@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def eventos_sinteticos():
+    """Fábrica de datasets con la forma del real: n_eventos positivos
+    (media `separacion`) y después 2 negativos (media 0) por evento,
+    features normales N(·, 1) multiplicadas por `escalas`. Devuelve
+    (X, y, eventos, rng); cada test transforma las columnas que necesite."""
+    def crear(n_eventos, escalas, separacion=0.8, semilla=0):
+        rng = np.random.default_rng(semilla)
+        d = len(escalas)
+        X = np.vstack([rng.normal(separacion, 1, (n_eventos, d)), rng.normal(0, 1, (2 * n_eventos, d))]) * escalas
+        y = np.array([1] * n_eventos + [0] * 2 * n_eventos)
+        eventos = np.array([f"E{i:03d}" for i in range(n_eventos)] + [f"E{i // 2:03d}" for i in range(2 * n_eventos)])
+        return X, y, eventos, rng
+    return crear
@@ -0,0 +1,30 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.almacen_dataset import AlmacenDataset, cargar_dataset_real
+import numpy as np
+
+def test_agregar_confirmar_y_compactar(tmp_path):
+    directorio = str(tmp_path)
+    base = np.arange(6.0).reshape(3, 2)
+    np.save(os.path.join(directorio, "dataset_real_positivos.npy"), base)
+    np.save(os.path.join(directorio, "dataset_real_negativos.npy"), np.vstack([base, base]))
+
+    almacen = AlmacenDataset(directorio)
+    filas = [np.full(2, float(i)) for i in range(20)]
+    for i, fila in enumerate(filas):
+        almacen.agregar(positivos=[fila], negativos=[fila, -fila])
+        almacen.confirmar([f"EV{j}" for j in range(i + 1)], [])
+    assert len(almacen.manifiesto["fragmentos"]["positivos"]) <= 5  # O(log N)
+
+    # filas pendientes sin confirmar no son visibles
+    almacen.agregar(positivos=[np.ones(2)])
+    positivos, negativos = cargar_dataset_real(directorio)
+    assert np.array_equal(positivos, np.vstack([base] + filas))
+    assert negativos.shape == (6 + 40, 2)
+    assert AlmacenDataset(directorio).registro()[0] == [f"EV{j}" for j in range(20)]
+
+    AlmacenDataset(directorio).compactar()
+    positivos, _ = cargar_dataset_real(directorio)
+    assert isinstance(positivos, np.memmap)
+    assert np.array_equal(positivos, np.vstack([base] + filas))
+    assert np.array_equal(np.load(os.path.join(directorio, "dataset_real_positivos.npy")), positivos)
@@ -0,0 +1,41 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.almacen_dataset import AlmacenDataset
+from codigo_fuente.almacen_features import AlmacenFeatures
+from codigo_fuente.deepwave_preprocessing import calcular_espectrogramas_lote
+from codigo_fuente.deepwave_knn_real import extraer_features_lote
+import numpy as np
+
+
+def test_features_incrementales(tmp_path):
+    directorio = str(tmp_path)
+    rng = np.random.RandomState(0)
+    np.save(os.path.join(directorio, "dataset_real_positivos.npy"), rng.normal(size=(5, 2048)))
+    np.save(os.path.join(directorio, "dataset_real_negativos.npy"), rng.normal(size=(10, 2048)))
+
+    almacen = AlmacenFeatures(os.path.join(directorio, "cache_features"), directorio)
+    calculadas = []
+    calcular = almacen._calcular
+    almacen._calcular = lambda nombre, senales, *a: calculadas.append(len(senales)) or calcular(nombre, senales, *a)
+
+    X = almacen.features("v1", "positivos")
+    positivos = np.load(os.path.join(directorio, "dataset_real_positivos.npy"))
+    np.testing.assert_array_equal(X, extraer_features_lote(calcular_espectrogramas_lote(positivos, 2048)))
+    assert almacen.features("v1", "positivos").shape == (5, 3)
+    assert calculadas == [5]  # segunda vez: sin recalcular
+
+    # el dataset crece: solo se calculan las filas nuevas
+    dataset = AlmacenDataset(directorio)
+    nuevas = rng.normal(size=(2, 2048))
+    dataset.agregar(positivos=list(nuevas))
+    dataset.confirmar(["A"], [])
+    X = almacen.features("v1", "positivos")
+    assert calculadas == [5, 2]
+    todas = np.vstack([positivos, nuevas])
+    np.testing.assert_array_equal(X, extraer_features_lote(calcular_espectrogramas_lote(todas, 2048)))
+
+    # otra versión del dataset (filas distintas): se recalcula todo
+    dataset.compactar()
+    np.save(os.path.join(directorio, "dataset_real_positivos.npy"), todas[::-1].copy())
+    X = AlmacenFeatures(os.path.join(directorio, "cache_features"), directorio).features("v1", "positivos")
+    np.testing.assert_array_equal(X, extraer_features_lote(calcular_espectrogramas_lote(todas[::-1], 2048)))
@@ -0,0 +1,38 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.bootstrap_auc import tablas_por_grupo, aucs_remuestreos, bootstrap_auc, intervalo_confianza
+from codigo_fuente.bootstrap_auc_v1 import auc_mann_whitney
+import numpy as np
+
+
+def _datos():
+    rng = np.random.default_rng(4)
+    n_eventos = 60
+    y = np.array([1] * n_eventos + [0] * (2 * n_eventos))
+    scores = np.clip(rng.integers(0, 16, len(y)) + 4 * y, 0, 15) / 15  # scores K=15 con empates
+    eventos = np.concatenate([np.arange(n_eventos), np.repeat(np.arange(n_eventos), 2)])
+    return scores, y, eventos
+
+
+def test_remuestreos_igual_que_mann_whitney():
+    scores, y, eventos = _datos()
+    rng = np.random.default_rng(0)
+    elegidos = rng.integers(0, len(y), size=(200, len(y)))
+    aucs = aucs_remuestreos(*tablas_por_grupo(scores, y), elegidos)
+    esperado = [auc_mann_whitney(scores[i], y[i]) for i in elegidos]
+    np.testing.assert_allclose(aucs, esperado, rtol=1e-12)
+
+    # por evento: cada evento sorteado aporta su positivo y sus 2 negativos
+    elegidos = rng.integers(0, 60, size=(50, 60))
+    aucs = aucs_remuestreos(*tablas_por_grupo(scores, y, eventos), elegidos)
+    filas = [np.concatenate([np.flatnonzero(eventos == e) for e in fila]) for fila in elegidos]
+    np.testing.assert_allclose(aucs, [auc_mann_whitney(scores[f], y[f]) for f in filas], rtol=1e-12)
+
+
+def test_bootstrap_reproducible_sin_depender_de_workers():
+    scores, y, eventos = _datos()
+    a = bootstrap_auc(scores, y, 5000, semilla=1, grupos=eventos, remuestreos_por_bloque=1000)
+    b = bootstrap_auc(scores, y, 5000, semilla=1, grupos=eventos, remuestreos_por_bloque=1000, workers=2)
+    np.testing.assert_array_equal(a, b)
+    inferior, superior = intervalo_confianza(a)
+    assert inferior < auc_mann_whitney(scores, y) < superior
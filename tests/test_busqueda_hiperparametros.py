@@ -0,0 +1,75 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.busqueda_hiperparametros import buscar, vecinos_loo_configuracion, scores_por_k
+from codigo_fuente.loo_knn import vecinos_loo, evaluar_ks_loo
+from codigo_fuente.bootstrap_auc import auc_puntual
+import numpy as np
+
+
+def _normalizar_fold(entrenamiento, consulta, normalizacion):
+    if normalizacion == "minmax":
+        minimo, maximo = entrenamiento.min(axis=0), entrenamiento.max(axis=0)
+        return (entrenamiento - minimo) / (maximo - minimo + 1e-10), (consulta - minimo) / (maximo - minimo + 1e-10)
+    if normalizacion == "zscore":
+        media, desviacion = entrenamiento.mean(axis=0), entrenamiento.std(axis=0) + 1e-10
+        return (entrenamiento - media) / desviacion, (consulta - media) / desviacion
+    puesto = lambda valores: np.column_stack([np.searchsorted(np.sort(entrenamiento[:, j]), valores[..., j])
+                                              for j in range(entrenamiento.shape[1])])
+    return puesto(entrenamiento) / (len(entrenamiento) - 1), puesto(consulta[np.newaxis])[0] / (len(entrenamiento) - 1)
+
+
+def _vecinos_por_fold(X, k, metrica, normalizacion):
+    """Referencia lenta: re-normaliza y calcula la distancia en cada fold."""
+    vecinos, distancias_k = [], []
+    for i in range(len(X)):
+        otros = np.delete(np.arange(len(X)), i)
+        entrenamiento, consulta = _normalizar_fold(X[otros], X[i], normalizacion)
+        diferencias = entrenamiento - consulta
+        if metrica == "euclidea":
+            distancias = np.sqrt(np.sum(diferencias ** 2, axis=1))
+        elif metrica == "manhattan":
+            distancias = np.sum(np.abs(diferencias), axis=1)
+        else:
+            precision = np.linalg.pinv(np.cov(entrenamiento, rowvar=False))
+            distancias = np.sqrt(np.sum((diferencias @ precision) * diferencias, axis=1))
+        cercanos = np.argsort(distancias, kind="stable")[:k]
+        vecinos.append(otros[cercanos])
+        distancias_k.append(distancias[cercanos])
+    return np.array(vecinos), np.array(distancias_k)
+
+
+def test_vecinos_igual_que_reajustar_cada_fold(eventos_sinteticos):
+    X, _, _, _ = eventos_sinteticos(40, [1, 25, 0.03], semilla=6)
+    X[:, 1] += 0.5 * X[:, 0]  # columnas correladas para Mahalanobis
+    X[:, 2] = np.round(X[:, 2] * 100)  # discreta: valores y distancias empatados
+    np.testing.assert_array_equal(vecinos_loo_configuracion(X, 15)[0], vecinos_loo(X, 15)[0])
+    for metrica in ("euclidea", "manhattan", "mahalanobis"):
+        for normalizacion in ("minmax", "zscore", "rango"):
+            vecinos, distancias = vecinos_loo_configuracion(X, 7, metrica, normalizacion)
+            esperados, esperadas = _vecinos_por_fold(X, 7, metrica, normalizacion)
+            np.testing.assert_array_equal(vecinos, esperados)
+            if metrica != "mahalanobis" and normalizacion != "zscore":
+                # mismas operaciones que la referencia: distancias idénticas
+                np.testing.assert_array_equal(distancias, esperadas)
+            else:
+                # media/desviación en forma cerrada y covarianza por lotes: redondeo distinto
+                np.testing.assert_allclose(distancias, esperadas, rtol=0, atol=1e-13)
+
+
+def test_busqueda_y_cache(tmp_path, eventos_sinteticos):
+    X, y, _, _ = eventos_sinteticos(40, [1, 1, 1], semilla=6)
+    X[:, 2] = np.round(X[:, 2] * 3)  # discreta: empates en los votos
+    ruta = str(tmp_path / "hiper.json")
+    ranking = buscar(X, y, ks=(1, 3, 15), ruta_cache=ruta)
+    assert len(ranking) == 3 * 3 * 3 * 2
+    referencia = evaluar_ks_loo(X, y, [1, 3, 15])
+    for r in ranking:
+        if (r["metrica"], r["normalizacion"], r["ponderacion"]) == ("euclidea", "minmax", "uniforme"):
+            assert r["recall_pos"] == referencia[r["k"]]["recall_pos"]
+            assert r["auc"] == auc_puntual(referencia[r["k"]]["scores"], y)
+    assert buscar(X, y, ks=(1, 3, 15), ruta_cache=ruta) == ranking
+    assert buscar(X, y, ks=(1, 3, 15), workers=2, ruta_cache=None) == ranking
+
+    vecinos, distancias = vecinos_loo_configuracion(X, 3)
+    ponderados = scores_por_k(y, vecinos, distancias, [1, 3], "distancia")
+    np.testing.assert_array_equal(ponderados[1], y[vecinos[:, 0]])
@@ -0,0 +1,39 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.busqueda_subconjuntos import buscar, subconjuntos
+from codigo_fuente.loo_knn import evaluar_ks_loo, vecinos_loo
+from codigo_fuente.distancias_por_feature import diferencias_cuadradas, vecinos_loo_columnas
+from codigo_fuente.bootstrap_auc import auc_puntual
+import numpy as np
+
+
+def test_busqueda_igual_que_loo_de_cada_subconjunto(tmp_path, eventos_sinteticos):
+    X, y, _, rng = eventos_sinteticos(60, [1, 30, 0.02, 5], semilla=4)
+    X[:, 1] = np.round(X[:, 1] / 10)  # discreta, como num_picos: muchos empates
+    X[:, 2] = np.round(X[:, 2], 2)  # redondeada a 0.01 (0.5 en unidades de la columna)
+    X[:, 3] = rng.normal(0, 1, len(X))  # columna de ruido
+    nombres = ["a", "b", "c", "ruido"]
+    ruta = str(tmp_path / "busqueda.json")
+    ranking = buscar(X, y, nombres, k_voto=1, k_score=15, ruta_cache=ruta)
+    assert len(ranking) == len(subconjuntos(4)) == 15
+    assert [r["auc"] for r in ranking] == sorted((r["auc"] for r in ranking), reverse=True)
+
+    for r in ranking:
+        columnas = [nombres.index(f) for f in r["features"]]
+        referencia = evaluar_ks_loo(X[:, columnas], y, [1, 15])
+        assert r["recall_pos"] == referencia[1]["recall_pos"]
+        assert r["global"] == referencia[1]["global"]
+        assert r["auc"] == auc_puntual(referencia[15]["scores"], y)
+
+    # la segunda búsqueda sale entera de la caché; en paralelo da lo mismo
+    assert buscar(X, y, nombres, ruta_cache=ruta) == ranking
+    assert buscar(X, y, nombres, workers=2, ruta_cache=None) == ranking
+
+
+def test_vecinos_columnas_igual_que_loo_con_8_o_mas_features():
+    rng = np.random.default_rng(12)
+    X = np.column_stack([rng.integers(0, 4, 150)] + [np.round(rng.normal(size=150), 1) for _ in range(9)])
+    diferencias = diferencias_cuadradas(X)
+    for columnas in (list(range(10)), [0, 2, 3, 4, 5, 6, 7, 9], [0, 5]):
+        np.testing.assert_array_equal(vecinos_loo_columnas(diferencias, X, 15, columnas),
+                                      vecinos_loo(X[:, columnas], 15)[0])
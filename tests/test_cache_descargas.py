@@ -0,0 +1,87 @@
+import sys, os
+import threading
+import hashlib
+from http.server import HTTPServer, BaseHTTPRequestHandler
+import pytest
+h5py = pytest.importorskip("h5py")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'codigo_fuente'))
+from cache_descargas import descargar_verificado
+import numpy as np
+
+
+class ServidorGwoscFalso(BaseHTTPRequestHandler):
+    """Sirve un único archivo con soporte de Range; puede cortar la
+    conexión a mitad de la primera respuesta para simular una caída."""
+    contenido = b""
+    cortar_tras = None
+    peticiones = []
+
+    def do_GET(self):
+        rango = self.headers.get("Range")
+        self.peticiones.append(rango)
+        inicio = int(rango.split("=")[1].rstrip("-")) if rango else 0
+        cuerpo = self.contenido[inicio:]
+        self.send_response(206 if rango else 200)
+        if rango:
+            self.send_header("Content-Range", f"bytes {inicio}-{len(self.contenido) - 1}/{len(self.contenido)}")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        if type(self).cortar_tras is not None:
+            self.wfile.write(cuerpo[:type(self).cortar_tras])
+            type(self).cortar_tras = None
+            self.close_connection = True
+            return
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    ruta = tmp_path / "origen.hdf5"
+    with h5py.File(ruta, "w") as f:
+        f.create_group("strain").create_dataset("Strain", data=np.random.RandomState(0).normal(size=50000))
+    ServidorGwoscFalso.contenido = ruta.read_bytes()
+    ServidorGwoscFalso.peticiones = []
+    ServidorGwoscFalso.cortar_tras = None
+    httpd = HTTPServer(("127.0.0.1", 0), ServidorGwoscFalso)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}/evento.hdf5"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _leer(ruta):
+    with open(ruta, "rb") as f:
+        return f.read()
+
+
+def test_reanuda_tras_corte(servidor, tmp_path):
+    ServidorGwoscFalso.cortar_tras = 100000
+    destino = str(tmp_path / "descargas" / "evento.hdf5")
+    os.makedirs(os.path.dirname(destino))
+    sha = hashlib.sha256(ServidorGwoscFalso.contenido).hexdigest()
+    descargar_verificado(servidor, destino, sha256=sha)
+    assert _leer(destino) == ServidorGwoscFalso.contenido
+    assert ServidorGwoscFalso.peticiones == [None, "bytes=100000-"]
+    assert not os.path.exists(destino + ".part")
+
+    descargar_verificado(servidor, destino)  # ya verificado: ni red ni relectura
+    assert len(ServidorGwoscFalso.peticiones) == 2
+
+
+def test_archivo_truncado_existente_se_repara(servidor, tmp_path):
+    destino = str(tmp_path / "evento.hdf5")
+    with open(destino, "wb") as f:
+        f.write(ServidorGwoscFalso.contenido[:5000])
+    descargar_verificado(servidor, destino)
+    assert _leer(destino) == ServidorGwoscFalso.contenido
+    assert ServidorGwoscFalso.peticiones == ["bytes=5000-"]
+
+
+def test_checksum_incorrecto_falla(servidor, tmp_path):
+    destino = str(tmp_path / "evento.hdf5")
+    with pytest.raises(IOError):
+        descargar_verificado(servidor, destino, sha256="0" * 64, intentos=2)
+    assert not os.path.exists(destino)
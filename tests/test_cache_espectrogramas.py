@@ -0,0 +1,31 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.cache_espectrogramas import CacheEspectrogramas
+from codigo_fuente.deepwave_preprocessing import generar_senal_bbh, calcular_espectrogramas_lote
+import numpy as np
+
+def test_cache_caliente_y_ampliacion(tmp_path):
+    senales = np.array([generar_senal_bbh()[0] for _ in range(4)])
+    cache = CacheEspectrogramas(directorio=str(tmp_path))
+    frio = np.array(cache.obtener(senales, 2048))
+    assert np.array_equal(frio, calcular_espectrogramas_lote(senales, 2048))
+
+    caliente = CacheEspectrogramas(directorio=str(tmp_path)).obtener(senales, 2048)
+    assert isinstance(caliente, np.memmap)
+    assert np.array_equal(caliente, frio)
+
+    ampliado = np.vstack([senales, generar_senal_bbh()[0]])
+    cache = CacheEspectrogramas(directorio=str(tmp_path))
+    resultado = cache.obtener(ampliado, 2048)
+    assert np.array_equal(resultado, calcular_espectrogramas_lote(ampliado, 2048))
+    assert len(cache.bloques) == 2
+    assert len(cache.bloques[max(cache.bloques, key=lambda b: len(cache.bloques[b]["filas"]))]["filas"]) == 4
+
+def test_cache_expulsion_lru(tmp_path):
+    cache = CacheEspectrogramas(directorio=str(tmp_path), limite_bytes=103 * 19 * 8 * 2)
+    a = np.array([generar_senal_bbh()[0] for _ in range(2)])
+    b = np.array([generar_senal_bbh()[0] for _ in range(2)])
+    cache.obtener(a, 2048)
+    cache.obtener(b, 2048)
+    assert len(cache.bloques) == 1
+    assert len(os.listdir(tmp_path)) == 2  # bloque vigente + indice.json
@@ -0,0 +1,34 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.cache_resultados import version_dataset, cargar_resultados, guardar_resultados
+from codigo_fuente.pool_tareas import mapear
+import numpy as np
+
+
+def test_cache_versionada_por_dataset_y_parametros(tmp_path):
+    ruta = str(tmp_path / "resultados.json")
+    X, y = np.arange(12.0).reshape(6, 2), np.array([1, 1, 0, 0, 0, 0])
+    version = version_dataset(X, y, k=3)
+    assert cargar_resultados(ruta, version) == {}
+    assert cargar_resultados(None, version) == {}
+
+    guardar_resultados(ruta, version, {"0,1": {"auc": 0.5}})
+    assert cargar_resultados(ruta, version) == {"0,1": {"auc": 0.5}}
+    assert version_dataset(X.copy(), y, k=3) == version
+    X_cambiada = X.copy()
+    X_cambiada[0, 0] += 1
+    for otra in (version_dataset(X_cambiada, y, k=3), version_dataset(X, y, k=5), version_dataset(X, y)):
+        assert otra != version and cargar_resultados(ruta, otra) == {}
+    assert not os.path.exists(ruta + ".tmp")
+
+
+def test_mapear_en_orden_con_y_sin_pool():
+    tareas = [(i, 10 * i) for i in range(5)]
+    comunes = (np.arange(5),)
+    esperado = [(t, np.arange(5)[t[0]] * t[1]) for t in tareas]
+    assert list(mapear(_escalar, comunes, tareas)) == esperado
+    assert list(mapear(_escalar, comunes, tareas, workers=3)) == esperado
+
+
+def _escalar(valores, i, factor):
+    return valores[i] * factor
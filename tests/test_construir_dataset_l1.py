@@ -0,0 +1,130 @@
+import sys, os
+from collections import OrderedDict
+import pytest
+h5py = pytest.importorskip("h5py")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'codigo_fuente'))
+import construir_dataset_l1
+from construir_dataset_l1 import procesar_un_detector, strain_blanqueado, FS_OBJETIVO
+from lector_strain import cerrar_archivos
+import numpy as np
+
+GPS_INICIO = 1000000
+
+
+def _archivo_gwosc(ruta, duracion_s, tramos, fs=4096):
+    """Archivo GWOSC de `duracion_s` con ruido solo en los tramos (inicio_s,
+    fin_s) dados (chunks sin reservar fuera de ellos)."""
+    rng = np.random.default_rng(0)
+    with h5py.File(ruta, "w") as f:
+        strain = f.create_group("strain").create_dataset("Strain", shape=(int(duracion_s * fs),), dtype="f8",
+                                                         chunks=(fs,), fillvalue=0.0)
+        strain.attrs["Xspacing"] = 1.0 / fs
+        for inicio, fin in tramos:
+            strain[int(inicio * fs):int(fin * fs)] = rng.normal(size=int((fin - inicio) * fs))
+        f.create_group("meta")["GPSstart"] = GPS_INICIO
+
+
+@pytest.fixture
+def evento_en(tmp_path, monkeypatch):
+    """Prepara data/eventos_reales/{evento}_L1.hdf5 (en tmp_path) con el
+    evento en GPS_INICIO + offset_s; el índice de GPS es un dict."""
+    monkeypatch.setattr(construir_dataset_l1, "_blanqueados", OrderedDict())
+    monkeypatch.setattr(construir_dataset_l1, "USAR_CACHE_DISCO", False)
+    monkeypatch.setattr(construir_dataset_l1, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(construir_dataset_l1, "CACHE_BLANQUEO_DIR", str(tmp_path / "cache_blanqueo"))
+    gps = {}
+    monkeypatch.setattr(construir_dataset_l1, "descargar_evento", construir_dataset_l1._ruta_archivo)
+    monkeypatch.setattr(construir_dataset_l1, "gps_evento", lambda evento: gps[evento])
+
+    def configurar(duracion_s, tramos, offset_s, evento="EV"):
+        cerrar_archivos()  # h5py no deja reescribir un archivo abierto
+        _archivo_gwosc(construir_dataset_l1._ruta_archivo(evento, "L1"), duracion_s, tramos)
+        gps[evento] = GPS_INICIO + offset_s
+    yield configurar
+    cerrar_archivos()
+
+
+@pytest.fixture
+def blanqueos(monkeypatch):
+    """Lista de las longitudes de strain que llegan a blanquear()."""
+    llamadas = []
+    blanquear = construir_dataset_l1.blanquear
+
+    def blanquear_contando(strain, fs):
+        llamadas.append(len(strain))
+        return blanquear(strain, fs)
+    monkeypatch.setattr(construir_dataset_l1, "blanquear", blanquear_contando)
+    return llamadas
+
+
+def test_ventanas_en_archivo_de_4096s(evento_en):
+    evento_en(4096, [(2020, 2076)], 2048)
+    ventanas = [procesar_un_detector("EV", "L1", offset_extra_s=extra) for extra in (-12, 0, 12)]
+    assert [len(v) for v in ventanas] == [FS_OBJETIVO] * 3
+    assert all(np.isfinite(v).all() and np.std(v) > 0 for v in ventanas)
+
+
+def test_ventanas_en_archivo_de_32s(evento_en):
+    evento_en(32, [(0, 32)], 16)
+    ventanas = [procesar_un_detector("EV", "L1", offset_extra_s=extra) for extra in (-12, 0, 12)]
+    assert [len(v) for v in ventanas] == [FS_OBJETIVO] * 3
+
+
+def test_positivo_fuera_del_archivo_no_se_recorta(evento_en):
+    evento_en(32, [(0, 32)], 40)
+    with pytest.raises(ValueError):
+        procesar_un_detector("EV", "L1")
+
+
+def test_cache_en_memoria_reutiliza_y_expulsa_el_mas_antiguo(evento_en, blanqueos, monkeypatch):
+    monkeypatch.setattr(construir_dataset_l1, "MAX_BLANQUEADOS_EN_MEMORIA", 2)
+    for evento in ("EV0", "EV1", "EV2"):
+        evento_en(32, [(0, 32)], 16, evento)
+
+    primera = strain_blanqueado("EV0", "L1")
+    assert strain_blanqueado("EV0", "L1") is primera
+    for extra in (-12, 0, 12):
+        procesar_un_detector("EV0", "L1", offset_extra_s=extra)
+    assert len(blanqueos) == 1
+
+    strain_blanqueado("EV1", "L1")
+    strain_blanqueado("EV0", "L1")  # EV0 pasa a ser el más reciente
+    strain_blanqueado("EV2", "L1")  # expulsa EV1
+    assert list(construir_dataset_l1._blanqueados) == [("EV0", "L1"), ("EV2", "L1")]
+    assert len(blanqueos) == 3
+    strain_blanqueado("EV1", "L1")
+    assert len(blanqueos) == 4
+
+
+def test_cache_en_disco_se_invalida_si_cambia_lo_que_la_produjo(evento_en, blanqueos, monkeypatch):
+    monkeypatch.setattr(construir_dataset_l1, "USAR_CACHE_DISCO", True)
+    evento_en(32, [(0, 32)], 16)
+
+    def desde_disco():
+        construir_dataset_l1._blanqueados.clear()
+        return strain_blanqueado("EV", "L1")
+
+    original = strain_blanqueado("EV", "L1")
+    leida = desde_disco()
+    assert len(blanqueos) == 1
+    np.testing.assert_array_equal(leida[0], original[0])
+    assert leida[1:] == original[1:]
+
+    archivo = construir_dataset_l1._ruta_archivo("EV", "L1")
+    info = os.stat(archivo)
+    os.utime(archivo, ns=(info.st_atime_ns, info.st_mtime_ns + 10 ** 9))  # archivo descargado de nuevo
+    desde_disco()
+    assert len(blanqueos) == 2
+
+    monkeypatch.setattr(construir_dataset_l1, "PADDING_BLANQUEO_S", 3)
+    desde_disco()
+    assert len(blanqueos) == 3
+    desde_disco()
+    assert len(blanqueos) == 3
+
+    monkeypatch.setattr(construir_dataset_l1, "gps_evento", lambda evento: GPS_INICIO + 15)  # GPS corregido
+    assert desde_disco()[2] == 15
+    assert len(blanqueos) == 4
+    monkeypatch.setitem(construir_dataset_l1.PARAMETROS_BLANQUEO, "f_bajo_hz", 30)
+    desde_disco()
+    assert len(blanqueos) == 5
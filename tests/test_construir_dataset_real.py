@@ -0,0 +1,96 @@
+import sys, os
+import pytest
+h5py = pytest.importorskip("h5py")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'codigo_fuente'))
+import time
+import construir_dataset_real
+from construir_dataset_real import extraer_ventanas_evento, resultados_en_orden, ampliar_dataset, FS_OBJETIVO
+from almacen_dataset import AlmacenDataset
+from lector_strain import cerrar_archivos
+import numpy as np
+
+GPS_INICIO = 1000000
+
+
+def _archivo_gwosc(ruta, duracion_s, tramos, fs=4096):
+    """Archivo GWOSC de `duracion_s` con ruido solo en los tramos (inicio_s,
+    fin_s) dados: el resto no se escribe (chunks sin reservar), así un
+    archivo de 4096 s ocupa unos pocos MB."""
+    rng = np.random.default_rng(0)
+    with h5py.File(ruta, "w") as f:
+        strain = f.create_group("strain").create_dataset("Strain", shape=(int(duracion_s * fs),), dtype="f8",
+                                                         chunks=(fs,), fillvalue=0.0)
+        strain.attrs["Xspacing"] = 1.0 / fs
+        for inicio, fin in tramos:
+            strain[int(inicio * fs):int(fin * fs)] = rng.normal(size=int((fin - inicio) * fs))
+        f.create_group("meta")["GPSstart"] = GPS_INICIO
+
+
+def test_ventanas_en_archivo_de_4096s(tmp_path):
+    ruta = str(tmp_path / "H-H1_GWOSC_4KHZ_R1-1000000-4096.hdf5")
+    _archivo_gwosc(ruta, 4096, [(2020, 2076)])
+    ventanas = extraer_ventanas_evento(ruta, GPS_INICIO + 2048)
+    cerrar_archivos()
+    assert [len(v) for v in ventanas] == [FS_OBJETIVO] * 3
+    assert all(np.isfinite(v).all() and np.std(v) > 0 for v in ventanas)
+
+
+def test_ventanas_en_archivo_de_32s(tmp_path):
+    ruta = str(tmp_path / "H-H1_GWOSC_4KHZ_R1-1000000-32.hdf5")
+    _archivo_gwosc(ruta, 32, [(0, 32)])
+    ventanas = extraer_ventanas_evento(ruta, GPS_INICIO + 16)
+    cerrar_archivos()
+    assert [len(v) for v in ventanas] == [FS_OBJETIVO] * 3
+
+    _archivo_gwosc(ruta, 32, [(0, 32)])
+    with pytest.raises(ValueError):
+        extraer_ventanas_evento(ruta, GPS_INICIO + 40)  # evento fuera del archivo
+    cerrar_archivos()
+
+
+def _eventos_desordenados(tmp_path, monkeypatch, fuera_del_archivo=()):
+    """Un archivo de 32 s por evento; las descargas (preparar_evento)
+    terminan en orden inverso. Devuelve (eventos, orden_de_llegada)."""
+    eventos = ["EV0", "EV1", "EV2"]
+    for i, evento in enumerate(eventos):
+        _archivo_gwosc(str(tmp_path / f"{evento}.hdf5"), 32, [(0, 32)])
+    llegadas = []
+
+    def preparar(evento):
+        i = eventos.index(evento)
+        time.sleep(0.4 * (len(eventos) - 1 - i))
+        llegadas.append(evento)
+        gps = GPS_INICIO + (40 if evento in fuera_del_archivo else 14 + i)
+        return str(tmp_path / f"{evento}.hdf5"), gps
+
+    monkeypatch.setattr(construir_dataset_real, "preparar_evento", preparar)
+    return eventos, llegadas
+
+
+def test_pipeline_confirma_en_orden_aunque_lleguen_desordenados(tmp_path, monkeypatch):
+    eventos, llegadas = _eventos_desordenados(tmp_path, monkeypatch)
+    monkeypatch.setattr(construir_dataset_real, "DATASET_DIR", str(tmp_path))
+    monkeypatch.setattr(construir_dataset_real, "REGISTRO_PATH", str(tmp_path / "eventos_procesados.json"))
+    ampliar_dataset(eventos, workers=3)
+    cerrar_archivos()
+    assert llegadas == eventos[::-1]
+
+    almacen = AlmacenDataset(str(tmp_path))
+    assert almacen.registro() == (eventos, [])
+    esperados = [extraer_ventanas_evento(str(tmp_path / f"{e}.hdf5"), GPS_INICIO + 14 + i)
+                 for i, e in enumerate(eventos)]
+    cerrar_archivos()
+    np.testing.assert_array_equal(almacen.cargar("positivos"), [v[0] for v in esperados])
+    np.testing.assert_array_equal(almacen.cargar("negativos"), [v for e in esperados for v in e[1:]])
+
+
+def test_pipeline_error_solo_en_su_evento(tmp_path, monkeypatch):
+    eventos, _ = _eventos_desordenados(tmp_path, monkeypatch, fuera_del_archivo=("EV1",))
+    obtenidos = {}
+    for evento, obtener_resultado in resultados_en_orden(eventos, workers=2):
+        try:
+            obtenidos[evento] = [len(v) for v in obtener_resultado()]
+        except ValueError:
+            obtenidos[evento] = "error"
+    cerrar_archivos()
+    assert obtenidos == {"EV0": [FS_OBJETIVO] * 3, "EV1": "error", "EV2": [FS_OBJETIVO] * 3}
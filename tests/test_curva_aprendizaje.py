@@ -0,0 +1,74 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.loo_knn import vecinos_loo, vecinos_loo_incremental
+from codigo_fuente.curva_aprendizaje import CurvaAprendizaje
+import numpy as np
+
+
+def _dataset(n_eventos, rng):
+    X_pos = rng.normal(0.5, 1, size=(n_eventos, 3))
+    X_neg = rng.normal(0, 1, size=(2 * n_eventos, 3))
+    return X_pos, X_neg
+
+
+def _ordenar(X_pos, X_neg):
+    """Capa como la del dataset real: positivos y luego negativos (2 por evento)."""
+    n = len(X_pos)
+    claves = [f"E{i}|1|0" for i in range(n)] + [f"E{i // 2}|0|{(-12, 12)[i % 2]}" for i in range(2 * n)]
+    eventos = np.array([f"E{i}" for i in range(n)] + [f"E{i // 2}" for i in range(2 * n)])
+    return np.vstack([X_pos, X_neg]), np.array([1] * n + [0] * 2 * n), np.array(claves), eventos
+
+
+def test_vecinos_incrementales_igual_que_recalcular():
+    rng = np.random.default_rng(7)
+    X_pos, X_neg = _dataset(120, rng)
+    X_pos[0], X_neg[0] = 8.0, -8.0  # extremos fijos: la ampliación no cambia min/max
+    X, _, claves, _ = _ordenar(X_pos[:100], X_neg[:200])
+    _, _, previo, _ = vecinos_loo_incremental(X, claves, 15)
+
+    X2, _, claves2, _ = _ordenar(X_pos, X_neg)
+    vecinos, distancias, _, reutilizado = vecinos_loo_incremental(X2, claves2, 15, previo)
+    assert reutilizado
+    esperado_vecinos, esperado_distancias = vecinos_loo(X2, 15)
+    np.testing.assert_array_equal(vecinos, esperado_vecinos)
+    np.testing.assert_array_equal(distancias, esperado_distancias)
+
+    # un nuevo extremo cambia la normalización: se recalcula todo
+    X_pos[110, 2] = 50.0
+    X3, _, claves3, _ = _ordenar(X_pos, X_neg)
+    vecinos, _, _, reutilizado = vecinos_loo_incremental(X3, claves3, 15, previo)
+    assert not reutilizado
+    np.testing.assert_array_equal(vecinos, vecinos_loo(X3, 15)[0])
+
+
+def test_vecinos_incrementales_con_empates():
+    rng = np.random.default_rng(11)
+    X_pos = np.column_stack([rng.integers(0, 5, 120), np.round(rng.normal(0.5, 1, 120), 1)]).astype(float)
+    X_neg = np.column_stack([rng.integers(0, 5, 240), np.round(rng.normal(0, 1, 240), 1)]).astype(float)
+    X_pos[0], X_neg[0] = [9.0, 9.0], [-9.0, -9.0]  # extremos fijos
+    X, _, claves, _ = _ordenar(X_pos[:80], X_neg[:160])
+    _, _, previo, _ = vecinos_loo_incremental(X, claves, 15)
+
+    X2, _, claves2, _ = _ordenar(X_pos, X_neg)
+    vecinos, distancias, _, reutilizado = vecinos_loo_incremental(X2, claves2, 15, previo)
+    assert reutilizado
+    esperado_vecinos, esperado_distancias = vecinos_loo(X2, 15)
+    np.testing.assert_array_equal(vecinos, esperado_vecinos)
+    np.testing.assert_array_equal(distancias, esperado_distancias)
+
+    # filas viejas reordenadas: el desempate por índice ya no vale, se recalcula
+    permutadas = np.concatenate([np.arange(80)[::-1], 80 + np.arange(160)])
+    _, _, _, reutilizado = vecinos_loo_incremental(X[permutadas], claves[permutadas], 15, previo)
+    assert not reutilizado
+
+
+def test_checkpoints_se_acumulan(tmp_path):
+    rng = np.random.default_rng(8)
+    X_pos, X_neg = _dataset(90, rng)
+    snr = rng.uniform(8, 30, 90)
+    curva = CurvaAprendizaje(str(tmp_path / "estado.npz"), str(tmp_path / "curva.json"), n_bootstrap=500)
+    for n in (60, 90, 90):
+        X, y, claves, eventos = _ordenar(X_pos[:n], X_neg[:2 * n])
+        entrada = curva.checkpoint(X, y, claves, eventos, np.concatenate([snr[:n], np.repeat(snr[:n], 2)]))
+        assert entrada["alto"]["ic95"][0] <= entrada["alto"]["auc"] <= entrada["alto"]["ic95"][1]
+    assert [e["n_eventos"] for e in curva.historial()] == [60, 90]
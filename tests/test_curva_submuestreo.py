@@ -0,0 +1,32 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.curva_submuestreo import MotorSubmuestreo, estratos_por_snr
+from codigo_fuente.loo_knn import scores_loo
+from codigo_fuente.bootstrap_auc import auc_puntual
+import numpy as np
+
+
+def test_curva_estratificada_y_reproducible(eventos_sinteticos):
+    X, y, eventos, rng = eventos_sinteticos(80, [1, 40, 0.01], separacion=0.7, semilla=9)
+    motor = MotorSubmuestreo(X, y, eventos)
+    snr = dict(zip(motor.nombres_eventos, rng.uniform(8, 30, len(motor.nombres_eventos))))
+    estratos = estratos_por_snr(motor.nombres_eventos, snr)
+
+    filas = motor.sortear(30, estratos, np.random.default_rng(0))
+    assert len(filas) == 90 and y[filas].sum() == 30
+    elegidos = set(np.unique(motor.evento_de_fila[filas]))
+    assert len(elegidos & set(estratos["alto"])) == 15
+
+    completo = np.arange(len(X))
+    assert motor.auc_loo(completo) == auc_puntual(scores_loo(X, y, 15), y)
+    a = motor.curva([20, 40], estratos, repeticiones=10, semilla=3, repeticiones_por_tarea=3)
+    b = motor.curva([20, 40], estratos, repeticiones=10, semilla=3, workers=2, repeticiones_por_tarea=3)
+    for pa, pb in zip(a, b):
+        assert len(pa["aucs"]) == 10
+        np.testing.assert_array_equal(pa["aucs"], pb["aucs"])
+        assert pa["ic95"][0] <= pa["media"] <= pa["ic95"][1]
+
+    # todos los eventos: una única submuestra posible, se evalúa una vez
+    completo_n = len(estratos["alto"]) + len(estratos["bajo"])
+    [punto] = motor.curva([completo_n], estratos, repeticiones=10)
+    assert len(punto["aucs"]) == 1 and punto["ic95"] is None
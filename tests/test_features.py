@@ -0,0 +1,68 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.deepwave_preprocessing import generar_senal_bbh, generar_senal_glitch, calcular_espectrogramas_lote
+from codigo_fuente.deepwave_knn_real import extraer_features, extraer_features_lote
+from codigo_fuente.deepwave_features_v2 import extraer_features_v2, extraer_features_v2_lote
+from codigo_fuente.deepwave_features_v3 import extraer_features_v3, extraer_features_v3_lote
+import numpy as np
+
+
+def _specs():
+    np.random.seed(0)
+    senales = [generar_senal_bbh()[0] for _ in range(4)] + [generar_senal_glitch()[0] for _ in range(4)]
+    return calcular_espectrogramas_lote(np.array(senales), 4096)
+
+
+def test_features_lote_igual_a_individual():
+    specs = _specs()
+    for escalar, lote in [(extraer_features, extraer_features_lote),
+                          (extraer_features_v2, extraer_features_v2_lote),
+                          (extraer_features_v3, extraer_features_v3_lote)]:
+        esperado = np.array([escalar(s) for s in specs])
+        obtenido = lote(specs)
+        assert obtenido.shape == esperado.shape
+        np.testing.assert_allclose(obtenido, esperado, rtol=1e-12, atol=0)
+
+    # todo salvo la pendiente (forma cerrada vs polyfit) es idéntico bit a bit
+    v2 = extraer_features_v2_lote(specs)
+    esperado = np.array([extraer_features_v2(s) for s in specs])
+    np.testing.assert_array_equal(np.delete(v2, 3, axis=1), np.delete(esperado, 3, axis=1))
+
+
+def test_registro_calcula_solo_lo_pedido(monkeypatch):
+    from codigo_fuente import registro_features
+    from codigo_fuente.registro_features import calcular_features, calcular_conjunto
+    specs = _specs()
+    for conjunto, lote in [("v1", extraer_features_lote), ("v2", extraer_features_v2_lote),
+                           ("v3", extraer_features_v3_lote)]:
+        np.testing.assert_array_equal(calcular_conjunto(conjunto, specs), lote(specs))
+
+    llamadas = []
+    for nombre, (entradas, funcion) in list(registro_features.INTERMEDIOS.items()):
+        monkeypatch.setitem(registro_features.INTERMEDIOS, nombre,
+                            (entradas, lambda *a, n=nombre, f=funcion: llamadas.append(n) or f(*a)))
+    calcular_features(["pendiente", "num_picos"], specs)
+    assert llamadas == ["energia_por_tiempo"]  # compartido, una sola vez
+    llamadas.clear()
+    calcular_features(["energia_media"], specs)
+    assert llamadas == []
+
+    corr = np.arange(len(specs), dtype=float)
+    X = calcular_conjunto("v6", specs, correlacion_hl=corr)
+    np.testing.assert_array_equal(X, np.column_stack([extraer_features_v2_lote(specs)[:, [1, 4]], corr]))
+
+
+def test_features_fusionadas_sin_espectrograma():
+    from codigo_fuente.deepwave_knn_real import extraer_features_fusionadas, escanear_features
+    from codigo_fuente.deepwave_preprocessing import calcular_espectrograma_stub
+    np.random.seed(1)
+    senales = np.array([generar_senal_bbh()[0] for _ in range(3)] + [generar_senal_glitch()[0] for _ in range(3)])
+    esperado = extraer_features_lote(calcular_espectrogramas_lote(senales, 2048))
+    np.testing.assert_allclose(extraer_features_fusionadas(senales, 2048), esperado, rtol=1e-12, atol=0)
+
+    strain = np.concatenate(senales)
+    inicios, X = escanear_features(strain, 2048, paso_tramas=3)
+    assert len(X) == len(inicios) and inicios[-1] + 2048 <= len(strain) < inicios[-1] + 2048 + 3 * 102
+    for j in [0, 1, len(X) // 2, len(X) - 1]:
+        spec = calcular_espectrograma_stub(strain[inicios[j]:inicios[j] + 2048], 2048)
+        np.testing.assert_allclose(X[j], extraer_features(spec), rtol=1e-12, atol=0)
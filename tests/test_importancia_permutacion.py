@@ -0,0 +1,33 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.distancias_por_feature import diferencias_cuadradas
+from codigo_fuente.importancia_permutacion import aucs_permutadas, importancia_permutacion
+from codigo_fuente.loo_knn import scores_loo
+from codigo_fuente.bootstrap_auc import auc_puntual
+import numpy as np
+
+
+def test_permutadas_igual_que_loo_con_la_columna_barajada_al_final(eventos_sinteticos):
+    X, y, _, rng = eventos_sinteticos(50, [1, 20, 0.05], separacion=1.0, semilla=2)
+    X[:, 1] = np.round(X[:, 1])  # columna discreta: hay empates
+    diferencias = diferencias_cuadradas(X)
+    for j in range(X.shape[1]):
+        permutaciones = np.array([rng.permutation(len(X)) for _ in range(5)])
+        esperado = []
+        for p in permutaciones:
+            X_barajada = X.copy()
+            X_barajada[:, j] = X[p, j]
+            X_barajada = X_barajada[:, [c for c in range(X.shape[1]) if c != j] + [j]]  # j se suma la última
+            esperado.append(auc_puntual(scores_loo(X_barajada, y, 15), y))
+        np.testing.assert_array_equal(aucs_permutadas(diferencias, X, y, j, permutaciones), esperado)
+
+
+def test_importancia_reproducible_y_ruido_sin_importancia(eventos_sinteticos):
+    X, y, _, rng = eventos_sinteticos(50, [1, 1, 1], separacion=1.0, semilla=2)
+    X[:, 2] = rng.normal(0, 1, len(X))  # columna de ruido
+    auc_base, caidas = importancia_permutacion(X, y, n_permutaciones=30, semilla=5)
+    assert auc_base == auc_puntual(scores_loo(X, y, 15), y)
+    assert caidas.shape == (3, 30)
+    assert caidas[0].mean() > 0.03 and caidas[0].mean() > 3 * abs(caidas[2].mean())
+    _, en_paralelo = importancia_permutacion(X, y, n_permutaciones=30, semilla=5, workers=2)
+    np.testing.assert_array_equal(caidas, en_paralelo)
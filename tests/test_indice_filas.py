@@ -0,0 +1,46 @@
+import sys, os, json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente import indice_metadatos
+from codigo_fuente.indice_filas import cargar_indice_filas, extraer_filas, extraer_correlaciones_hl
+import numpy as np
+
+
+def test_seleccion_igual_que_bucle_2i(tmp_path):
+    directorio = str(tmp_path)
+    eventos = [f"GW{i:03d}" for i in range(10)]
+    con_hl = [e for i, e in enumerate(eventos) if i not in (2, 7)]
+    with open(os.path.join(directorio, "eventos_procesados.json"), "w") as f:
+        json.dump({"eventos_procesados": eventos, "eventos_excluidos_por_nan": []}, f)
+    with open(os.path.join(directorio, "correlacion_hl_eventos.json"), "w") as f:
+        json.dump(con_hl, f)
+    ruta_metadatos = os.path.join(directorio, "metadatos.sqlite")
+    with indice_metadatos._conectar(ruta_metadatos) as conexion:
+        for i, e in enumerate(eventos[:8]):
+            indice_metadatos._guardar(conexion, e, {"gps": 0.0, "snr": 8.0 + i, "masa1": None, "masa2": None, "urls": {}})
+
+    positivos = np.arange(10 * 4.0).reshape(10, 4)
+    negativos = -np.arange(20 * 4.0).reshape(20, 4)
+    corr_pos = np.arange(len(con_hl)) + 100.0
+    corr_neg = np.arange(2 * len(con_hl)) + 200.0
+
+    indice = cargar_indice_filas(directorio, ruta_metadatos)
+    assert len(indice) == 30
+
+    # referencia: lo que hacía cada script a mano
+    indices_con_hl = [i for i, e in enumerate(eventos) if e in con_hl]
+    indices_neg = [j for i in indices_con_hl for j in (2 * i, 2 * i + 1)]
+    pos_sub, neg_sub = extraer_filas(indice, indice["tiene_hl"], positivos, negativos)
+    np.testing.assert_array_equal(pos_sub, positivos[indices_con_hl])
+    np.testing.assert_array_equal(neg_sub, negativos[indices_neg])
+    cp, cn = extraer_correlaciones_hl(indice, indice["tiene_hl"], corr_pos, corr_neg)
+    np.testing.assert_array_equal(cp, corr_pos)
+    np.testing.assert_array_equal(cn, corr_neg)
+
+    # condición compuesta: H1-L1 y SNR alto; las correlaciones siguen alineadas
+    mascara = indice["tiene_hl"] & (indice["snr"] >= 12)
+    pos_sub, neg_sub = extraer_filas(indice, mascara, positivos, negativos)
+    np.testing.assert_array_equal(pos_sub, positivos[[4, 5, 6]])
+    np.testing.assert_array_equal(neg_sub, negativos[[8, 9, 10, 11, 12, 13]])
+    cp, cn = extraer_correlaciones_hl(indice, mascara, corr_pos, corr_neg)
+    np.testing.assert_array_equal(cp, corr_pos[[3, 4, 5]])
+    assert np.isnan(indice["snr"][indice["evento"] == "GW009"]).all()
@@ -0,0 +1,73 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'codigo_fuente'))
+import sqlite3
+import indice_metadatos
+from indice_metadatos import poblar, gps_evento, url_evento, snr_evento, masas_evento, snrs_eventos
+
+
+def _gwosc_falso(consultados):
+    def consultar(nombre):
+        consultados.append(nombre)
+        if nombre == "GW_ROTO":
+            raise ConnectionError("sin red")
+        n = int(nombre[2:])
+        return {"gps": 1e9 + n, "snr": None if n == 3 else 10.0 + n, "masa1": 30.0, "masa2": 20.0 + n,
+                "urls": {"H1": f"https://gwosc/{nombre}_H1.hdf5"}}
+    return consultar
+
+
+def test_poblar_incremental_y_consultas_offline(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "metadatos.sqlite")
+    consultados = []
+    monkeypatch.setattr(indice_metadatos, "consultar_gwosc", _gwosc_falso(consultados))
+
+    errores = poblar(["GW1", "GW2", "GW3", "GW_ROTO"], workers=4, ruta=ruta)
+    assert list(errores) == ["GW_ROTO"]
+    assert sorted(consultados) == ["GW1", "GW2", "GW3", "GW_ROTO"]
+
+    consultados.clear()
+    poblar(["GW1", "GW2", "GW4"], ruta=ruta)
+    assert consultados == ["GW4"]  # solo lo que falta
+
+    consultados.clear()
+    assert gps_evento("GW2", ruta=ruta) == 1e9 + 2
+    assert snr_evento("GW3", ruta=ruta) is None
+    assert masas_evento("GW1", ruta=ruta) == (30.0, 21.0)
+    assert url_evento("GW1", "H1", ruta=ruta) == "https://gwosc/GW1_H1.hdf5"
+    assert url_evento("GW1", "L1", ruta=ruta) is None
+    assert snrs_eventos(["GW2", "GW1", "GW3"], ruta=ruta) == {"GW2": 12.0, "GW1": 11.0}
+    assert consultados == []  # todo servido desde el índice
+
+    assert gps_evento("GW5", ruta=ruta) == 1e9 + 5  # no indexado: se consulta y se guarda
+    assert consultados == ["GW5"]
+
+
+def test_conexiones_cerradas_y_esquema_una_vez(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "metadatos.sqlite")
+    monkeypatch.setattr(indice_metadatos, "consultar_gwosc", _gwosc_falso([]))
+    abiertas, esquemas = [], []
+
+    class ConexionContada(sqlite3.Connection):
+        def executescript(self, script):
+            esquemas.append(script)
+            return super().executescript(script)
+
+        def close(self):
+            abiertas.remove(self)
+            super().close()
+
+    conectar = sqlite3.connect
+
+    def conectar_contando(*args, **kwargs):
+        conexion = conectar(*args, factory=ConexionContada, **kwargs)
+        abiertas.append(conexion)
+        return conexion
+
+    monkeypatch.setattr(sqlite3, "connect", conectar_contando)
+    poblar(["GW1", "GW2"], ruta=ruta)
+    for _ in range(3):
+        assert gps_evento("GW1", ruta=ruta) == 1e9 + 1
+        assert url_evento("GW2", "H1", ruta=ruta) == "https://gwosc/GW2_H1.hdf5"
+    assert url_evento("GW6", "H1", ruta=ruta) == "https://gwosc/GW6_H1.hdf5"  # se consulta y se guarda
+    assert abiertas == []
+    assert len(esquemas) == 1
@@ -0,0 +1,53 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.knn_lote import KNNMinMax, vecinos_mas_cercanos, k_menores, sumar_terminos
+import numpy as np
+
+
+def _predecir_antiguo(X_train, y_train, features, k):
+    X_min, X_max = X_train.min(axis=0), X_train.max(axis=0)
+    X_norm = (X_train - X_min) / (X_max - X_min + 1e-10)
+    f_norm = (features - X_min) / (X_max - X_min + 1e-10)
+    distancias = np.sum((X_norm - f_norm) ** 2, axis=1)
+    k_cercanos = np.argsort(distancias)[:k]
+    conteo = np.bincount(y_train[k_cercanos], minlength=2)
+    return np.argmax(conteo), conteo[np.argmax(conteo)] / k, k_cercanos
+
+
+def test_predecir_lote_igual_que_bucle():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 3)) * [1, 50, 0.01]
+    y = (X[:, 0] + rng.normal(size=300) > 0).astype(int)
+    consultas = rng.normal(size=(700, 3)) * [1, 50, 0.01]
+    for k in (1, 4, 5, 300):
+        clf = KNNMinMax(k).ajustar(X, y)
+        predicciones, confianzas, vecinos = clf.predecir_lote(consultas)
+        for i in range(0, len(consultas), 37):
+            pred, conf, k_cercanos = _predecir_antiguo(X, y, consultas[i], k)
+            assert predicciones[i] == pred and confianzas[i] == conf
+            np.testing.assert_array_equal(vecinos[i], k_cercanos)
+        assert clf.predecir(consultas[5]) == (predicciones[5], confianzas[5])
+
+
+def test_vecinos_desempata_por_indice():
+    X = np.array([[0.0], [1.0], [1.0], [1.0]])
+    vecinos, distancias = vecinos_mas_cercanos(X, np.array([[0.9]]), 3, filas_por_bloque=1)
+    np.testing.assert_array_equal(vecinos, [[1, 2, 3]])
+    assert distancias[0, 0] == distancias[0, 2]
+
+
+def test_k_menores_empates_en_el_corte_como_argsort_estable():
+    rng = np.random.default_rng(3)
+    distancias = rng.integers(0, 6, size=(2000, 40)).astype(np.float64)
+    for k in (1, 5, 39, 40):
+        vecinos, d_vecinos = k_menores(distancias, k)
+        esperado = np.argsort(distancias, axis=1, kind="stable")[:, :k]
+        np.testing.assert_array_equal(vecinos, esperado)
+        np.testing.assert_array_equal(d_vecinos, np.take_along_axis(distancias, esperado, axis=1))
+
+
+def test_sumar_terminos_igual_que_np_sum():
+    rng = np.random.default_rng(8)
+    for d in (1, 3, 7, 8, 9, 16, 23):
+        A = rng.normal(size=(50, 60, d)) ** 2
+        np.testing.assert_array_equal(sumar_terminos([A[..., j] for j in range(d)]), np.sum(A, axis=2))
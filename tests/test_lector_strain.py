@@ -0,0 +1,31 @@
+import sys, os
+import pytest
+h5py = pytest.importorskip("h5py")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'codigo_fuente'))
+from lector_strain import leer_muestras, leer_region, metadatos_strain, cerrar_archivos
+import numpy as np
+
+def _archivo_gwosc(ruta, strain, fs=4096, gps_inicio=1000000):
+    with h5py.File(ruta, "w") as f:
+        f.create_group("strain").create_dataset("Strain", data=strain).attrs["Xspacing"] = 1.0 / fs
+        f.create_group("meta")["GPSstart"] = gps_inicio
+
+def test_lectura_parcial_igual_a_completa(tmp_path):
+    ruta = str(tmp_path / "H-H1_TEST-1000000-64.hdf5")
+    strain = np.random.RandomState(0).normal(size=64 * 4096)
+    _archivo_gwosc(ruta, strain)
+    assert metadatos_strain(ruta) == (4096.0, 1000000, 64 * 4096)
+    segmento, fs, inicio = leer_muestras(ruta, 10 * 4096, 42 * 4096)
+    assert np.array_equal(segmento, strain[10 * 4096: 42 * 4096])
+    segmento, fs, inicio_s = leer_region(ruta, -3.0, 5.0)
+    assert inicio_s == 0.0 and np.array_equal(segmento, strain[:5 * 4096])
+    cerrar_archivos()
+
+def test_archivo_reemplazado_se_reabre(tmp_path):
+    ruta = str(tmp_path / "evento.hdf5")
+    _archivo_gwosc(ruta, np.zeros(4096))
+    assert leer_muestras(ruta, 0, 10)[0].sum() == 0
+    cerrar_archivos()
+    _archivo_gwosc(ruta, np.ones(8192))
+    assert leer_muestras(ruta, 0, 10)[0].sum() == 10
+    cerrar_archivos()
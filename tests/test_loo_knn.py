@@ -0,0 +1,63 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.loo_knn import folds_extremos, vecinos_loo, scores_loo, predicciones_loo, evaluar_ks_loo
+import numpy as np
+
+
+def _loo_antiguo(X, y, k):
+    scores, predicciones, vecinos = [], [], []
+    for i in range(len(X)):
+        X_train, y_train = np.delete(X, i, axis=0), np.delete(y, i)
+        X_min, X_max = X_train.min(axis=0), X_train.max(axis=0)
+        X_norm = (X_train - X_min) / (X_max - X_min + 1e-10)
+        f_norm = (X[i] - X_min) / (X_max - X_min + 1e-10)
+        k_cercanos = np.argsort(np.sum((X_norm - f_norm) ** 2, axis=1), kind="stable")[:k]
+        scores.append(np.mean(y_train[k_cercanos] == 1))
+        predicciones.append(np.argmax(np.bincount(y_train[k_cercanos], minlength=2)))
+        vecinos.append(np.delete(np.arange(len(X)), i)[k_cercanos])
+    return np.array(scores), np.array(predicciones), np.array(vecinos)
+
+
+def test_loo_igual_que_por_fold():
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(150, 3)) * [1, 30, 0.02]
+    X[7, 1] = 500.0  # outlier: su fold cambia mucho la normalización
+    y = (X[:, 0] + rng.normal(size=150) > 0).astype(int)
+    assert 7 in folds_extremos(X)
+    for k in (1, 3, 15):
+        scores, predicciones, vecinos = _loo_antiguo(X, y, k)
+        np.testing.assert_array_equal(vecinos_loo(X, k, filas_por_bloque=64)[0], vecinos)
+        np.testing.assert_array_equal(scores_loo(X, y, k), scores)
+        np.testing.assert_array_equal(predicciones_loo(X, y, k)[0], predicciones)
+
+
+def test_loo_igual_que_por_fold_con_features_discretas():
+    rng = np.random.default_rng(4)
+    X = np.column_stack([rng.integers(0, 6, 240), np.round(rng.normal(size=240), 1), rng.normal(size=240)])
+    y = (X[:, 0] + rng.normal(size=240) > 2.5).astype(int)
+    for columnas in ([0], [0, 1], [0, 1, 2]):
+        for k in (1, 4, 15):
+            scores, predicciones, vecinos = _loo_antiguo(X[:, columnas], y, k)
+            np.testing.assert_array_equal(vecinos_loo(X[:, columnas], k)[0], vecinos)
+            np.testing.assert_array_equal(scores_loo(X[:, columnas], y, k), scores)
+            np.testing.assert_array_equal(predicciones_loo(X[:, columnas], y, k)[0], predicciones)
+
+
+def test_extremo_repetido_no_es_fold_extremo():
+    X = np.array([[0.0], [0.0], [1.0], [2.0], [2.0], [3.0]])
+    np.testing.assert_array_equal(folds_extremos(X), [5])
+
+
+def test_multi_k_igual_que_un_loo_por_k():
+    rng = np.random.default_rng(5)
+    X = rng.normal(size=(90, 3))
+    y = (X[:, 1] + rng.normal(size=90) > 0.3).astype(int)
+    resultados = evaluar_ks_loo(X, y, range(1, 32))
+    for k in (1, 2, 7, 31):
+        _, predicciones, _ = _loo_antiguo(X, y, k)
+        r = resultados[k]
+        np.testing.assert_array_equal(r["predicciones"], predicciones)
+        np.testing.assert_array_equal(r["scores"], scores_loo(X, y, k))
+        assert r["global"] == np.mean(predicciones == y)
+        assert r["recall_pos"] == np.mean(predicciones[y == 1] == 1)
+        assert r["recall_neg"] == np.mean(predicciones[y == 0] == 0)
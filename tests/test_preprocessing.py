@@ -1,6 +1,9 @@
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'codigo_fuente'))
-from deepwave_preprocessing import generar_senal_bbh, generar_senal_glitch, calcular_espectrograma_stub
+from deepwave_preprocessing import (
+    generar_senal_bbh, generar_senal_glitch, calcular_espectrograma_stub,
+    calcular_espectrogramas_lote, EspectrogramaStreaming
+)
 import numpy as np
 
 def test_generar_senal_bbh_shape():
@@ -16,3 +19,29 @@ def test_espectrograma_shape():
     senal, fs = generar_senal_bbh()
     spec = calcular_espectrograma_stub(senal, fs)
     assert spec.shape == (103, 19)
+
+def test_espectrogramas_lote_igual_a_individual():
+    senales = np.array([generar_senal_bbh()[0] for _ in range(3)] + [generar_senal_glitch()[0] for _ in range(3)])
+    lote = calcular_espectrogramas_lote(senales, 2048)
+    assert lote.shape == (6, 103, 19)
+    for senal, spec in zip(senales, lote):
+        assert np.array_equal(spec, calcular_espectrograma_stub(senal, 2048))
+
+def test_espectrogramas_lote_float32_en_buffer():
+    senales = np.array([generar_senal_bbh()[0] for _ in range(2)])
+    buffer = np.empty((2, 103, 19), dtype=np.float32)
+    resultado = calcular_espectrogramas_lote(senales, 2048, out=buffer)
+    assert resultado is buffer
+    assert np.allclose(buffer, calcular_espectrogramas_lote(senales, 2048), atol=1e-3)
+
+def test_espectrograma_streaming_igual_a_serie_completa():
+    serie = np.concatenate([generar_senal_bbh()[0] for _ in range(3)])
+    stream = EspectrogramaStreaming(2048)
+    rng = np.random.RandomState(0)
+    columnas, inicio = [], 0
+    while inicio < len(serie):
+        fin = inicio + rng.randint(1, 700)
+        columnas.append(stream.agregar(serie[inicio:fin]))
+        inicio = fin
+        assert len(stream._cola) < stream.puntos_ventana
+    assert np.array_equal(np.hstack(columnas), calcular_espectrograma_stub(serie, 2048))
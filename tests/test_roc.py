@@ -0,0 +1,49 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from codigo_fuente.roc import curva_roc
+from fractions import Fraction
+from math import lcm
+import numpy as np
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+def _roc_antigua(y_true, y_scores):
+    umbrales = [1.1] + sorted(set(y_scores), reverse=True) + [-0.1]
+    puntos = []
+    total_pos, total_neg = sum(y_true), len(y_true) - sum(y_true)
+    for u in umbrales:
+        preds = [1 if s >= u else 0 for s in y_scores]
+        tp = sum(1 for p, t in zip(preds, y_true) if p == 1 and t == 1)
+        fp = sum(1 for p, t in zip(preds, y_true) if p == 1 and t == 0)
+        puntos.append((fp / total_neg if total_neg > 0 else 0, tp / total_pos if total_pos > 0 else 0))
+    auc = 0.0
+    for i in range(1, len(puntos)):
+        auc += (puntos[i][0] - puntos[i - 1][0]) * (puntos[i][1] + puntos[i - 1][1]) / 2
+    return puntos, auc
+
+
+def test_roc_igual_que_bucle_con_empates():
+    rng = np.random.default_rng(2)
+    y = rng.integers(0, 2, 400)
+    scores = rng.integers(0, 16, 400) / 15  # scores de K=15: muchos empates
+    umbrales, fpr, tpr, auc = curva_roc(y, scores)
+    puntos, auc_antiguo = _roc_antigua(list(y), list(scores))
+    np.testing.assert_array_equal(np.column_stack([fpr, tpr]), np.array(puntos))
+    assert auc == auc_antiguo
+    assert umbrales[0] == 1.1 and umbrales[-1] == -0.1
+
+
+def test_reproduce_roc_puntos_guardados():
+    for nombre in ["roc_puntos.npy", "roc_puntos_v1_75eventos.npy", "roc_puntos_v6.npy"]:
+        puntos = np.load(os.path.join(DATA_DIR, nombre))
+        # scores con exactamente los TP/FP que añade cada umbral guardado
+        n_pos = lcm(*[Fraction(t).limit_denominator(1000).denominator for t in puntos[:, 1]])
+        n_neg = lcm(*[Fraction(f).limit_denominator(1000).denominator for f in puntos[:, 0]])
+        nuevos_tp = np.rint(np.diff(puntos[:-1, 1]) * n_pos).astype(int)
+        nuevos_fp = np.rint(np.diff(puntos[:-1, 0]) * n_neg).astype(int)
+        valores = 1 - np.arange(1, len(nuevos_tp) + 1) / len(puntos)
+        scores = np.concatenate([np.repeat(valores, nuevos_tp), np.repeat(valores, nuevos_fp)])
+        y = np.concatenate([np.ones(nuevos_tp.sum(), int), np.zeros(nuevos_fp.sum(), int)])
+        _, fpr, tpr, _ = curva_roc(y, scores)
+        np.testing.assert_allclose(np.column_stack([fpr, tpr]), puntos, rtol=0, atol=1e-15)
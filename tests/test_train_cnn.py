@@ -0,0 +1,27 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorflow")
+pytest.importorskip("sklearn")
+from codigo_fuente import train_cnn
+from codigo_fuente.almacen_dataset import AlmacenDataset
+from codigo_fuente.deepwave_preprocessing import calcular_espectrogramas_lote
+
+
+def test_cargar_dataset_real_desde_el_almacen(tmp_path):
+    directorio = str(tmp_path)
+    rng = np.random.default_rng(0)
+    positivos, negativos = rng.normal(size=(2, 2 * train_cnn.FS_REAL)), rng.normal(size=(4, 2 * train_cnn.FS_REAL))
+    np.save(os.path.join(directorio, "dataset_real_positivos.npy"), positivos[:1])
+    np.save(os.path.join(directorio, "dataset_real_negativos.npy"), negativos[:2])
+    almacen = AlmacenDataset(directorio)
+    almacen.agregar(positivos=positivos[1:], negativos=negativos[2:])
+    almacen.confirmar(["EV1"], [])
+
+    X, y = train_cnn.cargar_dataset_real(directorio)
+    esperado = calcular_espectrogramas_lote(np.vstack([positivos, negativos]), train_cnn.FS_REAL, dtype=np.float32)
+    np.testing.assert_array_equal(X[..., 0], esperado)
+    assert X.dtype == np.float32 and X.shape[-1] == 1
+    np.testing.assert_array_equal(y, [1, 1, 0, 0, 0, 0])
@@ -0,0 +1,47 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'codigo_fuente'))
+from deepwave_whitening_real import blanquear, whiten
+import numpy as np
+from scipy.signal import welch, butter, filtfilt
+from scipy.signal.windows import tukey
+from scipy.interpolate import interp1d
+
+def _whitening_completo_antiguo(segmento, fs, filtrar=True):
+    """whitening_completo de construir_dataset_real/_l1 antes de cachear:
+    PSD interpolada con interp1d y Butterworth (b, a) con filtfilt."""
+    nperseg = min(int(fs * 4), len(segmento))
+    freqs, psd = welch(segmento, fs=fs, nperseg=nperseg, window="hann")
+    interp_psd = interp1d(freqs, psd, bounds_error=False, fill_value="extrapolate")
+    n = len(segmento)
+    hf = np.fft.rfft(segmento * tukey(n, alpha=0.2))
+    hf_blanco = hf / np.sqrt(interp_psd(np.fft.rfftfreq(n, 1 / fs))) * (1.0 / np.sqrt(fs / 2))
+    blanco = np.fft.irfft(hf_blanco, n=n)
+    if not filtrar:
+        return blanco
+    b, a = butter(4, [35 / (fs / 2), 350 / (fs / 2)], btype="band")
+    return filtfilt(b, a, blanco)
+
+def test_blanquear_lote_igual_a_individual():
+    rng = np.random.RandomState(0)
+    segmentos = rng.normal(size=(2, 8 * 4096)) * 1e-21
+    lote = blanquear(segmentos, 4096.0)
+    assert lote.shape == segmentos.shape
+    for segmento, blanco in zip(segmentos, lote):
+        assert np.allclose(blanco, blanquear(segmento, 4096.0))
+
+def test_blanquear_normaliza_amplitud():
+    rng = np.random.RandomState(1)
+    blanco = blanquear(rng.normal(size=16 * 4096) * 1e-21, 4096.0)
+    assert 0.05 < blanco[4096:-4096].std() < 20
+
+def test_blanquear_igual_que_el_whitening_antiguo():
+    rng = np.random.RandomState(2)
+    # 32 s (archivos de 32 s), < 4 s (nperseg = n) y una longitud impar
+    for n in (32 * 4096, 3 * 4096, 9 * 4096 + 123):
+        segmento = rng.normal(size=n) * 1e-21
+        antiguo_sin_filtro = _whitening_completo_antiguo(segmento, 4096.0, filtrar=False)
+        antiguo = _whitening_completo_antiguo(segmento, 4096.0)
+        # whitening: misma PSD interpolada, solo redondeo
+        assert np.abs(whiten(segmento, 4096.0) - antiguo_sin_filtro).max() < 1e-10 * np.abs(antiguo_sin_filtro).max()
+        # secciones de segundo orden (sosfiltfilt) frente a (b, a): ~2e-9 relativo
+        assert np.abs(blanquear(segmento, 4096.0) - antiguo).max() < 1e-8 * np.abs(antiguo).max()